@@ -1,74 +1,80 @@
+import os
+import sys
+
 import dash
 from dash import dcc, html
 import plotly.express as px
-import pandas as pd
+
+# Adiciona raiz do projeto ao sys.path (consultas compartilhadas em src/queries.py)
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(project_root)
+
+from src import queries
 
 # Inicializa o app
 app = dash.Dash(__name__)
 app.title = "Dashboard de Filmes e Séries"
 
-# Dados simulados
-dados_top = {
-    "Qtd. Títulos": 8807,
-    "Duração Média Filmes": "99.58 min",
-    "Duração Média Séries": "16.76 temporadas",
-    "Taxa de Crescimento": "22.13%",
-    "Achievement": "3.30%"
-}
-
-lançamentos = pd.DataFrame({
-    "Mês": ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul"],
-    "Filmes": [300, 280, 310, 290, 320, 330, 340],
-    "Séries": [120, 110, 130, 125, 140, 150, 160]
-})
-
-filmes_vs_series = pd.DataFrame({
-    "Tipo": ["Filmes", "Séries"],
-    "Percentual": [69.64, 30.36]
-})
-
-ranking_atores = pd.DataFrame({
-    "Ator": ["Anupam", "Shah", "Naseeruddin", "Om", "Amitabh"],
-    "Títulos": [38, 33, 30, 27, 26]
-})
-
-ranking_paises = pd.DataFrame({
-    "País": ["United States", "India", "United Kingdom", "Canada", "France"],
-    "Títulos": [3190, 1681, 646, 444, 336]
-})
-
-generos = pd.DataFrame({
-    "Gênero": ["International Movies", "Comedies", "Dramas", "Documentaries", "Action & Adventure", "Not_Specified", "Others"],
-    "Títulos": [1500, 1200, 1100, 800, 700, 600, 500]
-})
-
-# Gráficos
-grafico_lancamentos = px.bar(lançamentos, x="Mês", y=["Filmes", "Séries"], barmode="group", title="Evolução por Lançamento")
-grafico_pizza = px.pie(filmes_vs_series, names="Tipo", values="Percentual", title="Filmes vs Séries")
-grafico_atores = px.bar(ranking_atores, x="Títulos", y="Ator", orientation="h", title="Ranking Atores vs Títulos")
-grafico_paises = px.bar(ranking_paises, x="País", y="Títulos", title="Ranking Países vs Títulos")
-grafico_generos = px.treemap(generos, path=["Gênero"], values="Títulos", title="Análise por Gênero")
-
-# Layout
-app.layout = html.Div([
-    html.H1("Dashboard de Filmes e Séries 🎬", style={"textAlign": "center"}),
-
-    html.Div([
-        html.Div([html.H4(f"{k}: {v}")], style={"width": "20%", "display": "inline-block", "padding": "10px"})
-        for k, v in dados_top.items()
-    ], style={"textAlign": "center"}),
-
-    html.Div([
-        dcc.Graph(figure=grafico_lancamentos),
-        dcc.Graph(figure=grafico_pizza),
-    ], style={"display": "flex", "flexWrap": "wrap"}),
-
-    html.Div([
-        dcc.Graph(figure=grafico_atores),
-        dcc.Graph(figure=grafico_generos),
-        dcc.Graph(figure=grafico_paises),
-    ], style={"display": "flex", "flexWrap": "wrap"})
-])
+
+def kpis():
+    """Indicadores do topo (total, durações médias e crescimento do último ano completo)"""
+    summary = queries.catalog_summary().iloc[0]
+    per_year = queries.titles_per_year()
+    growth = "-"
+    if len(per_year) >= 2:
+        last, previous = per_year['total_titles'].iloc[-1], per_year['total_titles'].iloc[-2]
+        growth = f"{(last - previous) / previous * 100:.2f}%"
+    return {
+        "Qtd. Títulos": int(summary['total_titles']),
+        "Duração Média Filmes": f"{summary['avg_movie_minutes']:.2f} min",
+        "Duração Média Séries": f"{summary['avg_show_seasons']:.2f} temporadas",
+        "Taxa de Crescimento": growth,
+    }
+
+
+def build_figures():
+    """Gráficos a partir da camada de consultas (resultados em cache até a próxima versão do dataset)"""
+    lancamentos = queries.monthly_trend_by_type()
+    filmes_vs_series = queries.type_distribution()
+    ranking_atores = queries.top_cast(limit=5)
+    ranking_paises = queries.top_countries(limit=5)
+    generos = queries.genre_distribution()
+
+    return [
+        px.bar(lancamentos, x="month", y="total_titles", color="type", barmode="group",
+               title="Evolução por Lançamento"),
+        px.pie(filmes_vs_series, names="type", values="total", title="Filmes vs Séries"),
+        px.bar(ranking_atores, x="appearances", y="actor", orientation="h", title="Ranking Atores vs Títulos"),
+        px.bar(ranking_paises, x="country", y="total_titles", title="Ranking Países vs Títulos"),
+        px.treemap(generos, path=["genre"], values="total_titles", title="Análise por Gênero"),
+    ]
+
+
+def serve_layout():
+    # layout como função: cada carregamento da página relê o cache de consultas
+    grafico_lancamentos, grafico_pizza, grafico_atores, grafico_paises, grafico_generos = build_figures()
+    return html.Div([
+        html.H1("Dashboard de Filmes e Séries 🎬", style={"textAlign": "center"}),
+
+        html.Div([
+            html.Div([html.H4(f"{k}: {v}")], style={"width": "20%", "display": "inline-block", "padding": "10px"})
+            for k, v in kpis().items()
+        ], style={"textAlign": "center"}),
+
+        html.Div([
+            dcc.Graph(figure=grafico_lancamentos),
+            dcc.Graph(figure=grafico_pizza),
+        ], style={"display": "flex", "flexWrap": "wrap"}),
+
+        html.Div([
+            dcc.Graph(figure=grafico_atores),
+            dcc.Graph(figure=grafico_generos),
+            dcc.Graph(figure=grafico_paises),
+        ], style={"display": "flex", "flexWrap": "wrap"})
+    ])
+
+
+app.layout = serve_layout
 
 # Executa o servidor
 if __name__ == "__main__":
@@ -1,19 +1,37 @@
 # app.py
+import logging
+import os
+import sys
+
 import pandas as pd
-from dash import Dash, html, dcc, Input, Output
+from dash import Dash, html, dcc, Input, Output, ClientsideFunction, ctx, no_update
 import dash_bootstrap_components as dbc
 import plotly.express as px
 import plotly.graph_objects as go
 
-df = pd.read_csv('data.csv', parse_dates=['release_date'])
-df['month_order'] = df['month_num']
+# Adiciona raiz do projeto ao sys.path (consultas compartilhadas em src/queries.py)
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
+sys.path.append(project_root)
+
+from src import cube, queries, timeseries
+
+# DASHBOARD_FILTERING=clientside: os cubos de src/cube.py vão uma vez por sessão para
+# o navegador (dcc.Store) e os filtros são refeitos lá, sem chamadas ao servidor
+CLIENTSIDE = os.getenv("DASHBOARD_FILTERING", "server") == "clientside"
+if CLIENTSIDE:
+    try:
+        cube.build_payload()
+    except cube.PayloadTooLarge as e:
+        logging.warning(f"⚠️ {e}: falling back to server-side filtering")
+        CLIENTSIDE = False
+
 df_months_order = ['January','February','March','April','May','June','July','August','September','October','November','December']
 
 app = Dash(__name__, external_stylesheets=[dbc.themes.CYBORG])
 server = app.server
 
-type_opts = ['All'] + sorted(df['type'].unique().tolist())
-year_opts = sorted(df['year'].unique().tolist())
+type_opts = ['All'] + queries.type_distribution()['type'].tolist()
+year_opts = queries.titles_per_year()['year'].tolist()
 month_opts = ['All'] + df_months_order
 
 sidebar = dbc.Col([
@@ -31,10 +49,42 @@ sidebar = dbc.Col([
     ], style={'padding': '10px'})
 ], width=2)
 
-def aggregate_monthly(dff):
-    # Count titles per month
-    months = dff.groupby('month_num').size().reindex(range(1,13), fill_value=0)
-    return pd.DataFrame({'month_num': months.index, 'count': months.values, 'month': [pd.to_datetime(str(m), format='%m').strftime('%B') for m in months.index]})
+def aggregate_monthly(trend, month_num=None):
+    # Count titles per month (meses sem títulos ou fora do filtro ficam com 0)
+    counts = trend.set_index(pd.to_datetime(trend['month']).dt.month)['total_titles'] if len(trend) else pd.Series(dtype=int)
+    months = counts.reindex(range(1,13), fill_value=0)
+    if month_num:
+        months[months.index != month_num] = 0
+    return pd.DataFrame({'month_num': months.index, 'count': months.values, 'month': df_months_order})
+
+def monthly_figure(f_type, f_year, f_month, window=None):
+    # Ano por mês; com zoom (window do relayoutData, limitada ao ano/mês filtrado) a janela
+    # é re-consultada em resolução mais fina (src/timeseries.py: dia/semana + downsample)
+    if window and window[0] is not None and f_year:
+        period_start = pd.Timestamp(f_year, f_month or 1, 1)
+        period_end = period_start + (pd.DateOffset(months=1) if f_month else pd.DateOffset(years=1))
+        start, end = max(window[0], period_start), min(window[1], period_end)
+        window = (start, end) if start < end else None
+    if window and window[0] is not None and f_year:
+        series, granularity = timeseries.viewport_trend(*window, type=f_type)
+        x, y = 'period', 'total_titles'
+    else:
+        series, granularity = aggregate_monthly(queries.monthly_trend(start_year=f_year, end_year=f_year, type=f_type), f_month), 'month'
+        series['period'] = pd.to_datetime(dict(year=f_year, month=series['month_num'], day=1)) if f_year else series['month']
+        x, y = 'period', 'count'
+
+    # WebGL (scattergl) acima de timeseries.WEBGL_THRESHOLD pontos; spline só no SVG
+    trace = timeseries.line_trace(series, x, y, fill='tozeroy', mode='lines+markers' if len(series) <= 100 else 'lines')
+    if trace['type'] == 'scatter':
+        trace['line'] = {'shape': 'spline'}
+    fig = go.Figure(trace)
+    # uirevision fixo por filtro: a re-consulta não desfaz o zoom do usuário
+    fig.update_layout(title='Evolução por Lançamento', showlegend=False, margin=dict(t=40,l=20,r=20,b=20),
+                      uirevision=f"{f_type}-{f_year}-{f_month}")
+    if granularity == 'month':
+        fig.update_xaxes(tickformat='%B')
+    fig.update_yaxes(range=[0, max(10, series[y].max()+5 if len(series) else 0)])
+    return fig
 
 content = dbc.Col([
     dbc.Row([
@@ -48,62 +98,83 @@ content = dbc.Col([
     ])
 ], width=10)
 
-app.layout = dbc.Container([
-    dbc.Row([sidebar, content], style={'height':'100vh'})
-], fluid=True)
+def serve_layout():
+    # layout por carregamento de página: cada sessão recebe o payload da versão atual
+    # (orçamento de tamanho verificado na subida do app)
+    store = [dcc.Store(id='cube', data=cube.build_payload(budget_bytes=None))] if CLIENTSIDE else []
+    return dbc.Container([
+        dbc.Row([sidebar, content], style={'height':'100vh'}),
+        *store
+    ], fluid=True)
 
-@app.callback(
+app.layout = serve_layout
+
+OUTPUTS = [
     Output('chart-monthly','figure'),
     Output('chart-donut','figure'),
     Output('chart-actors','figure'),
     Output('chart-treemap','figure'),
     Output('chart-countries','figure'),
+]
+FILTERS = [
     Input('filter-type','value'),
     Input('filter-year','value'),
-    Input('filter-month','value')
-)
-def update_all(f_type, f_year, f_month):
-    dff = df.copy()
-    if f_type and f_type != 'All':
-        dff = dff[dff['type'] == f_type]
-    if f_year:
-        dff = dff[dff['year'] == int(f_year)]
-    if f_month and f_month != 'All':
-        dff = dff[dff['month'] == f_month]
+    Input('filter-month','value'),
+]
+
+if CLIENTSIDE:
+    # assets/clientside.js: mesmos gráficos, calculados no navegador
+    app.clientside_callback(ClientsideFunction(namespace='dataset', function_name='update_all'),
+                            *OUTPUTS, Input('cube','data'), *FILTERS)
+
+def update_all(f_type, f_year, f_month, relayout=None):
+
+    # Filtros viram parâmetros das consultas (cache compartilhado em src/queries.py)
+    f_type = f_type if f_type and f_type != 'All' else None
+    f_year = int(f_year) if f_year else None
+    f_month = df_months_order.index(f_month) + 1 if f_month and f_month != 'All' else None
+
+    # Zoom/pan no gráfico mensal: só ele é re-consultado para a janela visível
+    if ctx.triggered_id == 'chart-monthly':
+        window = timeseries.parse_relayout(relayout)
+        if window is None:
+            return (no_update,) * len(OUTPUTS)
+        return (monthly_figure(f_type, f_year, f_month, window),) + (no_update,) * (len(OUTPUTS) - 1)
 
     # Monthly area/line
-    monthly = aggregate_monthly(dff)
-    fig_month = px.area(monthly, x='month', y='count', line_shape='spline', markers=True)
-    fig_month.update_layout(title='Evolução por Lançamento', showlegend=False, margin=dict(t=40,l=20,r=20,b=20))
-    fig_month.update_yaxes(range=[0, max(10, monthly['count'].max()+5)])
+    fig_month = monthly_figure(f_type, f_year, f_month)
 
     # Donut: Movies vs Series
-    donut_df = dff['type'].value_counts().reset_index()
-    donut_df.columns = ['type','count']
+    donut_df = queries.type_distribution(year=f_year, month=f_month).rename(columns={'total':'count'})
+    if f_type:
+        donut_df = donut_df[donut_df['type'] == f_type]
     if donut_df.empty:
-        donut_df = pd.DataFrame({'type':['Movie','Series'],'count':[0,0]})
+        donut_df = pd.DataFrame({'type':['movie','tv show'],'count':[0,0]})
     fig_donut = px.pie(donut_df, names='type', values='count', hole=0.55)
     fig_donut.update_layout(title='Filmes vs Séries', margin=dict(t=40,l=10,r=10,b=10), showlegend=True)
 
     # Actors ranking
-    actors = dff['actor'].value_counts().nlargest(10).reset_index()
+    actors = queries.top_cast(limit=10, year=f_year, type=f_type, month=f_month)
     actors.columns = ['actor','count']
     fig_actors = px.bar(actors.sort_values('count'), x='count', y='actor', orientation='h', text='count')
     fig_actors.update_layout(title='Ranking Atores vs Títulos', margin=dict(t=30,l=10,r=10,b=10))
 
     # Treemap genres
-    genres = dff['genre'].value_counts().reset_index()
+    genres = queries.genre_distribution(year=f_year, type=f_type, month=f_month)
     genres.columns = ['genre','count']
     fig_tree = px.treemap(genres, path=['genre'], values='count')
     fig_tree.update_layout(title='Analise por Gênero', margin=dict(t=30,l=10,r=10,b=10))
 
     # Countries ranking
-    countries = dff['country'].value_counts().nlargest(8).reset_index()
+    countries = queries.top_countries(limit=8, year=f_year, type=f_type, month=f_month)
     countries.columns = ['country','count']
     fig_countries = px.bar(countries.sort_values('count', ascending=True), x='count', y='country', orientation='h', text='count')
     fig_countries.update_layout(title='Ranking Países vs Títulos', margin=dict(t=30,l=10,r=10,b=10))
 
     return fig_month, fig_donut, fig_actors, fig_tree, fig_countries
 
+if not CLIENTSIDE:
+    update_all = app.callback(*OUTPUTS, *FILTERS, Input('chart-monthly','relayoutData'))(update_all)
+
 if __name__ == '__main__':
     app.run_server(debug=True, port=8050)
@@ -0,0 +1,107 @@
+// dashboards/dataset/src/assets/clientside.js
+
+// Modo clientside do dashboard (DASHBOARD_FILTERING=clientside): os filtros e
+// rankings são refeitos no navegador a partir dos cubos de src/cube.py, guardados
+// no dcc.Store 'cube'. Nenhuma interação chama o servidor.
+
+(function () {
+    var MONTHS = ['January', 'February', 'March', 'April', 'May', 'June', 'July',
+                  'August', 'September', 'October', 'November', 'December'];
+
+    // Soma `total` por chave (mês, tipo ou valor) nas linhas que passam no filtro
+    function sumBy(cube, filter, keyOf) {
+        var sums = {};
+        for (var i = 0; i < cube.total.length; i++) {
+            if (!filter(cube, i)) continue;
+            var key = keyOf(cube, i);
+            sums[key] = (sums[key] || 0) + cube.total[i];
+        }
+        return sums;
+    }
+
+    function makeFilter(year, type, month) {
+        return function (cube, i) {
+            if (year !== null && cube.year[i] !== year) return false;
+            if (month !== null && cube.month[i] !== month) return false;
+            if (type !== null && cube.types[cube.type[i]] !== type) return false;
+            return true;
+        };
+    }
+
+    // Ranking com o desempate das consultas (total desc, valor asc)
+    function ranking(cube, filter, limit) {
+        var sums = sumBy(cube, filter, function (c, i) { return c.values[c.value[i]]; });
+        var rows = Object.keys(sums).map(function (k) { return [k, sums[k]]; });
+        rows.sort(function (a, b) { return b[1] - a[1] || (a[0] < b[0] ? -1 : a[0] > b[0] ? 1 : 0); });
+        return limit ? rows.slice(0, limit) : rows;
+    }
+
+    function horizontalBar(rows, title, label) {
+        rows = rows.slice().reverse();  // menor em baixo, como sort_values('count')
+        var counts = rows.map(function (r) { return r[1]; });
+        return {
+            data: [{type: 'bar', orientation: 'h', x: counts, y: rows.map(function (r) { return r[0]; }),
+                    text: counts, textposition: 'auto', name: label}],
+            layout: {title: {text: title}, margin: {t: 30, l: 10, r: 10, b: 10},
+                     xaxis: {title: {text: 'count'}}, yaxis: {title: {text: label}, automargin: true}}
+        };
+    }
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        dataset: {
+            update_all: function (payload, fType, fYear, fMonth) {
+                var type = fType && fType !== 'All' ? fType.trim().toLowerCase() : null;
+                var year = fYear ? parseInt(fYear, 10) : null;
+                var month = fMonth && fMonth !== 'All' ? MONTHS.indexOf(fMonth) + 1 : null;
+                var filter = makeFilter(year, type, month);
+
+                // Monthly area/line (mês filtrado mantém os 12 meses, os demais com 0)
+                var byMonth = sumBy(payload.titles, makeFilter(year, type, null),
+                                    function (c, i) { return c.month[i]; });
+                var counts = MONTHS.map(function (_, m) {
+                    return month === null || month === m + 1 ? (byMonth[m + 1] || 0) : 0;
+                });
+                // eixo de datas do ano filtrado, como monthly_figure no servidor (zoom é local)
+                var dates = MONTHS.map(function (_, m) { return year + '-' + (m < 9 ? '0' : '') + (m + 1) + '-01'; });
+                var figMonth = {
+                    data: [{type: 'scatter', mode: 'lines+markers', fill: 'tozeroy', line: {shape: 'spline'},
+                            x: year !== null ? dates : MONTHS, y: counts}],
+                    layout: {title: {text: 'Evolução por Lançamento'}, showlegend: false,
+                             margin: {t: 40, l: 20, r: 20, b: 20}, xaxis: {tickformat: year !== null ? '%B' : ''},
+                             yaxis: {range: [0, Math.max(10, Math.max.apply(null, counts) + 5)]}}
+                };
+
+                // Donut: Movies vs Series
+                var byType = sumBy(payload.titles, makeFilter(year, null, month),
+                                   function (c, i) { return c.types[c.type[i]]; });
+                var types = Object.keys(byType).sort().filter(function (t) { return type === null || t === type; });
+                if (!types.length) {
+                    byType = {'movie': 0, 'tv show': 0};
+                    types = ['movie', 'tv show'];
+                }
+                var figDonut = {
+                    data: [{type: 'pie', hole: 0.55, labels: types, values: types.map(function (t) { return byType[t]; })}],
+                    layout: {title: {text: 'Filmes vs Séries'}, margin: {t: 40, l: 10, r: 10, b: 10}, showlegend: true}
+                };
+
+                // Actors / countries ranking
+                var figActors = horizontalBar(ranking(payload.cast, filter, payload.limits.cast),
+                                              'Ranking Atores vs Títulos', 'actor');
+                var figCountries = horizontalBar(ranking(payload.country, filter, payload.limits.country),
+                                                 'Ranking Países vs Títulos', 'country');
+
+                // Treemap genres
+                var genres = ranking(payload.genre, filter, payload.limits.genre)
+                    .filter(function (r) { return r[0] !== 'null'; });
+                var figTree = {
+                    data: [{type: 'treemap', labels: genres.map(function (r) { return r[0]; }),
+                            parents: genres.map(function () { return ''; }),
+                            values: genres.map(function (r) { return r[1]; })}],
+                    layout: {title: {text: 'Analise por Gênero'}, margin: {t: 30, l: 10, r: 10, b: 10}}
+                };
+
+                return [figMonth, figDonut, figActors, figTree, figCountries];
+            }
+        }
+    });
+})();
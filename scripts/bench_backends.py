@@ -0,0 +1,126 @@
+# scripts/bench_backends.py
+
+"""
+PostgreSQL x DuckDB embutido nos mesmos passos do pipeline: ingestão do CSV,
+transformação (titles_clean + tabelas ponte) e as consultas de src/queries.py
+usadas pelo run_analysis.py (sem o query_cache).
+
+O lado PostgreSQL roda em um schema próprio (search_path via PGOPTIONS), sem tocar
+nas tabelas do pipeline; o DuckDB usa um arquivo temporário.
+
+Uso:
+    python scripts/bench_backends.py --rows 500000 --repeat 5
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from scripts.bench_csv import SAMPLE_CSV, make_synthetic_csv
+from src import duck, queries
+from src.lazy import lazy_import
+
+sa = lazy_import("sqlalchemy")
+
+BENCH_SCHEMA = "bench_backends"
+
+# (nome, builder de SQL de src/queries.py, argumentos)
+QUERIES = [
+    ("monthly_trend", queries.monthly_trend_sql, {}),
+    ("monthly_trend 2019", queries.monthly_trend_sql, {"start_year": 2019, "end_year": 2019}),
+    ("top_countries", queries.top_countries_sql, {"limit": 10}),
+    ("genre_distribution", queries.genre_distribution_sql, {}),
+    ("type_distribution", queries.type_distribution_sql, {}),
+    ("top_cast", queries.top_cast_sql, {"limit": 20}),
+    ("catalog_summary", queries.catalog_summary_sql, {}),
+]
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    func(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+def median_ms(func, repeat):
+    func()  # aquecimento
+    return 1000 * statistics.median(timed(func) for _ in range(repeat))
+
+
+def bench_postgres(csv_path, repeat):
+    from src.db import get_engine
+    from src.ingest import ingest_to_postgres, load_csv
+    from src.preflight import preflight_csv
+    from src.schema import csv_column_names
+    from src.transform import run_transform
+
+    engine = get_engine()
+
+    def ingest():
+        preflight = preflight_csv(csv_path, csv_column_names("netflix_raw"))
+        df = load_csv(csv_path, **preflight["read_options"])
+        df["source_file"] = os.path.abspath(csv_path)
+        ingest_to_postgres(df, engine, "netflix_raw")
+
+    results = {"ingest": timed(ingest), "transform": timed(run_transform)}
+    for name, builder, kwargs in QUERIES:
+        results[name] = median_ms(lambda: queries._read(*builder(**kwargs), engine), repeat) / 1000
+    return results
+
+
+def bench_duckdb(csv_path, repeat):
+    results = {"ingest": timed(duck.ingest_csv, csv_path), "transform": timed(duck.run_transform)}
+    for name, builder, kwargs in QUERIES:
+        results[name] = median_ms(lambda: duck.read_sql(*builder(**kwargs)), repeat) / 1000
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PostgreSQL x DuckDB: ingest, transform and analysis queries")
+    parser.add_argument("--rows", type=int, default=100_000,
+                        help="Rows of the synthetic CSV (the sample repeated); 0 = use the sample as is")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per query (median)")
+    args = parser.parse_args()
+
+    os.environ["DB_BACKEND"] = "postgres"  # versão do dataset do lado PostgreSQL no schema de benchmark
+    os.environ["PGOPTIONS"] = f"-c search_path={BENCH_SCHEMA}"
+    workdir = tempfile.mkdtemp(prefix="bench_backends_")
+    os.environ["DUCKDB_PATH"] = os.path.join(workdir, "bench.duckdb")
+
+    csv_path = SAMPLE_CSV
+    if args.rows:
+        csv_path = os.path.join(workdir, "titles.csv")
+        make_synthetic_csv(csv_path, args.rows)
+
+    from src.db import get_engine
+
+    engine = get_engine()
+    with engine.begin() as conn:
+        conn.execute(sa.text(f"DROP SCHEMA IF EXISTS {BENCH_SCHEMA} CASCADE"))
+        conn.execute(sa.text(f"CREATE SCHEMA {BENCH_SCHEMA}"))
+    try:
+        postgres = bench_postgres(csv_path, args.repeat)
+        duckdb = bench_duckdb(csv_path, args.repeat)
+    finally:
+        with engine.begin() as conn:
+            conn.execute(sa.text(f"DROP SCHEMA IF EXISTS {BENCH_SCHEMA} CASCADE"))
+        for name in os.listdir(workdir):
+            os.remove(os.path.join(workdir, name))
+        os.rmdir(workdir)
+
+    print(f"\n{args.rows or 'sample'} rows: ingest/transform in s, queries in ms (median of {args.repeat})")
+    print(f"{'step':<20} {'postgres':>10} {'duckdb':>10} {'speedup':>8}")
+    for step in postgres:
+        scale = 1 if step in ("ingest", "transform") else 1000
+        pg, dk = postgres[step] * scale, duckdb[step] * scale
+        print(f"{step:<20} {pg:>10.2f} {dk:>10.2f} {pg / dk:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
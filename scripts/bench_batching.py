@@ -0,0 +1,72 @@
+# scripts/bench_batching.py
+
+"""
+Lote fixo x adaptativo (src/batching.py) na escrita de titles_clean via to_sql:
+a tabela limpa repetida até --rows linhas é gravada em uma tabela de benchmark
+com cada tamanho fixo e com o AdaptiveBatcher (que começa em INITIAL_BATCH_ROWS).
+
+Uso:
+    python scripts/bench_batching.py --rows 100000 --sizes 1000 5000 10000 50000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from src.batching import AdaptiveBatcher, batched_to_sql
+from src.db import get_engine
+from src.lazy import lazy_import
+from src.schema import coerce_frame, sqlalchemy_dtypes
+
+pd = lazy_import("pandas")
+sa = lazy_import("sqlalchemy")
+
+BENCH_TABLE = "bench_batching"
+
+
+def make_frame(n_rows):
+    df = pd.read_sql(sa.text("SELECT * FROM titles_clean"), get_engine())
+    df = pd.concat([df] * (n_rows // len(df) + 1), ignore_index=True).iloc[:n_rows]
+    return coerce_frame(df, "titles_clean")
+
+
+def timed_write(df, write):
+    with get_engine().begin() as conn:
+        conn.execute(sa.text(f"DROP TABLE IF EXISTS {BENCH_TABLE}"))
+    start = time.perf_counter()
+    write(df)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fixed vs adaptive write batch size")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 5000, 10000, 50000])
+    parser.add_argument("--method", choices=["multi"], default=None, help="to_sql insert method")
+    args = parser.parse_args()
+
+    df = make_frame(args.rows)
+    engine, dtype = get_engine(), sqlalchemy_dtypes("titles_clean")
+    print(f"{len(df)} rows of titles_clean, method={args.method}")
+    print(f"{'batch':>12} {'seconds':>8} {'rows/s':>10}")
+    try:
+        for size in args.sizes:
+            seconds = timed_write(df, lambda d: d.to_sql(BENCH_TABLE, engine, index=False, chunksize=size,
+                                                         method=args.method, dtype=dtype))
+            print(f"{size:>12} {seconds:>8.2f} {len(df) / seconds:>10.0f}")
+        batcher = AdaptiveBatcher(BENCH_TABLE)
+        seconds = timed_write(df, lambda d: batched_to_sql(d, BENCH_TABLE, engine, batcher=batcher,
+                                                           method=args.method, dtype=dtype))
+        print(f"{'adaptive':>12} {seconds:>8.2f} {len(df) / seconds:>10.0f}")
+        print(batcher.describe())
+    finally:
+        with engine.begin() as conn:
+            conn.execute(sa.text(f"DROP TABLE IF EXISTS {BENCH_TABLE}"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+# scripts/bench_csv.py
+
+"""
+Tempo de parse do CSV: engine C do pandas x pyarrow multithread com schema explícito.
+Mede o sample (data/netflix_titles.csv) e um arquivo sintético com o corpo repetido.
+
+Uso:
+    python scripts/bench_csv.py --rows 10000000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from src.ingest import load_csv
+
+SAMPLE_CSV = os.path.join(project_root, 'data', 'netflix_titles.csv')
+
+
+def make_synthetic_csv(path, rows, source=SAMPLE_CSV):
+    """Repete as linhas do sample até `rows` linhas (mesma distribuição de valores)"""
+    import pandas as pd
+
+    df = pd.read_csv(source)
+    body = df.to_csv(index=False, header=False).encode("utf-8")
+    repeats, remainder = divmod(rows, len(df))
+    with open(path, "wb") as f:
+        f.write((",".join(df.columns) + "\n").encode("utf-8"))
+        for _ in range(repeats):
+            f.write(body)
+        if remainder:
+            f.write(df.head(remainder).to_csv(index=False, header=False).encode("utf-8"))
+
+
+def timed(csv_path, **kwargs):
+    start = time.perf_counter()
+    df = load_csv(csv_path, **kwargs)
+    elapsed = time.perf_counter() - start
+    memory = df.memory_usage(deep=True).sum()
+    return elapsed, len(df), memory
+
+
+def run(label, csv_path, repeat):
+    size_mb = os.path.getsize(csv_path) / 1024 ** 2
+    print(f"\n{label}: {csv_path} ({size_mb:.1f} MiB)")
+    print(f"{'engine':<22} {'seconds':>8} {'rows':>10} {'MB/s':>8} {'MiB in memory':>14}")
+    variants = [
+        ("pandas C", {}),
+        ("pyarrow", {"engine": "pyarrow"}),
+        ("pyarrow + arrow dtypes", {"engine": "pyarrow", "dtype_backend": "pyarrow"}),
+    ]
+    for name, kwargs in variants:
+        seconds, rows, memory = min(timed(csv_path, **kwargs) for _ in range(repeat))
+        print(f"{name:<22} {seconds:>8.2f} {rows:>10} {size_mb / seconds:>8.1f} {memory / 1024 ** 2:>14.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CSV parse benchmark")
+    parser.add_argument("--rows", type=int, default=10_000_000, help="Rows in the synthetic file")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per engine on the sample (best is kept)")
+    args = parser.parse_args()
+
+    run("sample", SAMPLE_CSV, args.repeat)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "synthetic.csv")
+        make_synthetic_csv(path, args.rows)
+        run(f"synthetic {args.rows} rows", path, 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+# scripts/bench_dedupe.py
+
+"""
+Memória e tempo do StreamingDeduper x set Python para chaves show_id em stream.
+
+Uso:
+    python scripts/bench_dedupe.py --keys 5000000 --chunk-rows 100000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from src.dedupe import StreamingDeduper
+from src.lazy import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+
+def make_chunks(n_keys, chunk_rows, dup_rate, seed=42):
+    """Chunks de show_ids 's<n>' com uma fração de repetidos vindos de qualquer ponto do stream"""
+    rng = np.random.default_rng(seed)
+    ids = np.arange(1, n_keys + 1)
+    repeats = rng.random(n_keys) < dup_rate
+    ids[repeats] = rng.integers(1, n_keys + 1, repeats.sum())
+    for start in range(0, n_keys, chunk_rows):
+        yield pd.DataFrame({"show_id": np.char.add("s", ids[start:start + chunk_rows].astype(str))})
+
+
+def bench_deduper(chunks):
+    deduper = StreamingDeduper()
+    duplicates = 0
+    start = time.perf_counter()
+    for chunk in chunks:
+        duplicates += int(deduper.flag(chunk, "show_id").sum())
+    return time.perf_counter() - start, duplicates, deduper.memory_bytes(), len(deduper)
+
+
+def bench_python_set(chunks):
+    seen = set()
+    duplicates = 0
+    start = time.perf_counter()
+    for chunk in chunks:
+        for key in chunk["show_id"].tolist():
+            if key in seen:
+                duplicates += 1
+            else:
+                seen.add(key)
+    elapsed = time.perf_counter() - start
+    memory = sys.getsizeof(seen) + sum(sys.getsizeof(key) for key in seen)
+    return elapsed, duplicates, memory, len(seen)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming dedupe benchmark")
+    parser.add_argument("--keys", type=int, default=2_000_000)
+    parser.add_argument("--chunk-rows", type=int, default=100_000)
+    parser.add_argument("--dup-rate", type=float, default=0.01)
+    args = parser.parse_args()
+
+    print(f"keys: {args.keys}, chunk rows: {args.chunk_rows}, dup rate: {args.dup_rate}")
+    print(f"{'method':<18} {'seconds':>8} {'duplicates':>11} {'MiB':>8} {'MiB / 1M keys':>14}")
+    for label, bench in [("StreamingDeduper", bench_deduper), ("python set", bench_python_set)]:
+        chunks = list(make_chunks(args.keys, args.chunk_rows, args.dup_rate))
+        seconds, duplicates, memory, unique = bench(chunks)
+        per_million = memory / unique * 1_000_000 / 1024 ** 2
+        print(f"{label:<18} {seconds:>8.2f} {duplicates:>11} {memory / 1024 ** 2:>8.1f} {per_million:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
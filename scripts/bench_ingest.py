@@ -0,0 +1,67 @@
+# scripts/bench_ingest.py
+
+"""
+Throughput da ingestão: caminho síncrono (pandas.to_sql) x assíncrono
+(asyncpg COPY com chunks concorrentes). Usa uma tabela temporária de benchmark.
+
+Uso:
+    python scripts/bench_ingest.py --copies 8 --concurrency 4
+"""
+
+import argparse
+import os
+import sys
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from src.db import get_engine
+from src.ingest import load_csv, ingest_to_postgres
+from src.ingest_async import ingest_to_postgres_async
+from src.lazy import lazy_import
+
+pd = lazy_import("pandas")
+sa = lazy_import("sqlalchemy")
+
+BENCH_TABLE = "bench_ingest"
+
+
+def bench_sync(csv_paths):
+    start = time.perf_counter()
+    df = pd.concat([load_csv(path) for path in csv_paths], ignore_index=True)
+    ingest_to_postgres(df, get_engine(), BENCH_TABLE)
+    return len(df), time.perf_counter() - start
+
+
+def bench_async(csv_paths, concurrency, chunk_rows):
+    stats = ingest_to_postgres_async(csv_paths, BENCH_TABLE, concurrency=concurrency, chunk_rows=chunk_rows)
+    return stats["rows"], stats["seconds"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sync x async ingest throughput")
+    parser.add_argument("--csv", default=os.path.join(project_root, "data", "netflix_titles.csv"))
+    parser.add_argument("--copies", type=int, default=8, help="How many files are ingested per run")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--chunk-rows", type=int, default=5000)
+    args = parser.parse_args()
+
+    engine = get_engine()  # carrega .env antes do caminho asyncpg
+    csv_paths = [args.csv] * args.copies
+
+    results = [
+        ("sync  (to_sql)", *bench_sync(csv_paths)),
+        (f"async (COPY x{args.concurrency})", *bench_async(csv_paths, args.concurrency, args.chunk_rows)),
+    ]
+
+    with engine.begin() as conn:
+        conn.execute(sa.text(f"DROP TABLE IF EXISTS {BENCH_TABLE}"))
+
+    print(f"{'path':<22} {'rows':>9} {'seconds':>9} {'rows/s':>11}")
+    for label, rows, seconds in results:
+        print(f"{label:<22} {rows:>9} {seconds:>9.2f} {rows / seconds:>11.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+# scripts/bench_search.py
+
+"""
+Latência da busca textual (tsvector + GIN, src/search.py) x ILIKE em
+title/director/cast/description de titles_clean.
+
+Uso:
+    python scripts/bench_search.py --repeat 50
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from src.db import get_engine
+from src.lazy import lazy_import
+from src.search import search_titles
+
+sa = lazy_import("sqlalchemy")
+
+TERMS = ["love", "murder mystery", "scorsese", "documentary", "christmas", "zombie"]
+
+ILIKE_SQL = """
+    SELECT show_id, title, COUNT(*) OVER () AS total
+    FROM titles_clean
+    WHERE title ILIKE :pattern OR description ILIKE :pattern
+       OR director ILIKE :pattern OR "cast" ILIKE :pattern
+    ORDER BY show_id
+    LIMIT 20
+"""
+
+
+def median_ms(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Full-text search vs ILIKE benchmark")
+    parser.add_argument("--repeat", type=int, default=30)
+    args = parser.parse_args()
+
+    engine = get_engine()
+    with engine.connect() as conn:
+        rows = conn.execute(sa.text("SELECT COUNT(*) FROM titles_clean")).scalar()
+    print(f"titles_clean: {rows} rows, median of {args.repeat} runs (first page, 20 results)")
+    print(f"{'term':<16} {'ILIKE ms':>9} {'hits':>6} {'FTS ms':>8} {'hits':>6} {'speedup':>8}")
+
+    for term in TERMS:
+        def ilike():
+            with engine.connect() as conn:
+                result = conn.execute(sa.text(ILIKE_SQL), {"pattern": f"%{term}%"}).fetchall()
+            return result[0].total if result else 0
+
+        ilike_ms, ilike_hits = median_ms(ilike, args.repeat)
+        fts_ms, page = median_ms(lambda: search_titles(term, engine=engine), args.repeat)
+        print(f"{term:<16} {ilike_ms:>9.2f} {ilike_hits:>6} {fts_ms:>8.2f} {page['total']:>6} "
+              f"{ilike_ms / fts_ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# scripts/bench_startup.py
+
+"""
+Benchmark de startup: mede o custo de importar os módulos do pipeline com
+`python -X importtime` e falha se algum deles voltar a carregar bibliotecas
+pesadas ou estourar o orçamento de tempo no import.
+
+Uso:
+    python scripts/bench_startup.py
+    python scripts/bench_startup.py --budget-ms 100 --repeat 5
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Módulos importados por CLIs, testes e workers
+TARGETS = {
+    "src.transform": "import src.transform",
+    "src.ingest": "import src.ingest",
+    "src.db": "import src.db",
+    "src.queries": "import src.queries",
+    "scripts/run_analysis.py": "import sys; sys.path.insert(0, 'scripts'); import run_analysis",
+}
+
+# Bibliotecas que não podem ser carregadas só por importar os módulos acima
+HEAVY_MODULES = ["pandas", "numpy", "sqlalchemy", "psycopg2", "matplotlib", "seaborn", "pyarrow"]
+
+
+def measure_import(statement):
+    """Executa o import em um interpretador limpo e retorna (total_us, módulos carregados)"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=project_root,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    total_us = 0
+    loaded = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        if not cumulative_us.strip().isdigit():
+            continue  # cabeçalho
+        module = name[1:]
+        loaded.add(module.strip())
+        # Imports de topo (sem indentação) somados dão o custo total do statement
+        if not module.startswith(" "):
+            total_us += int(cumulative_us)
+    return total_us, loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Startup benchmark for pipeline modules")
+    parser.add_argument("--budget-ms", type=float, default=150.0, help="Maximum import time per module")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per module (best time is reported)")
+    args = parser.parse_args()
+
+    failures = []
+    print(f"{'module':<28} {'best ms':>9}  heavy modules loaded")
+    for label, statement in TARGETS.items():
+        runs = [measure_import(statement) for _ in range(args.repeat)]
+        best_us = min(total for total, _ in runs)
+        heavy = sorted(name for name in runs[0][1] if name in HEAVY_MODULES)
+        print(f"{label:<28} {best_us / 1000:>9.1f}  {', '.join(heavy) or '-'}")
+
+        if heavy:
+            failures.append(f"{label} loads heavy modules at import: {heavy}")
+        if best_us / 1000 > args.budget_ms:
+            failures.append(f"{label} import took {best_us / 1000:.1f} ms (budget {args.budget_ms} ms)")
+
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        sys.exit(1)
+    print("✅ Startup within budget, no heavy imports at module load.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# scripts/bench_string_backend.py
+
+"""
+Compara o caminho atual (strings object) com strings Arrow (dtype_backend='pyarrow')
+em leitura + clean_titles + explode das tabelas ponte. Mede tempo, memória dos
+DataFrames e confere se os resultados são idênticos. Não acessa o banco.
+
+Uso:
+    python scripts/bench_string_backend.py --scale 20
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from src.lazy import lazy_import
+from src.strings import split_explode
+from src.transform import clean_titles
+
+pd = lazy_import("pandas")
+
+
+def _mb(df):
+    return df.memory_usage(deep=True).sum() / 1024 ** 2
+
+
+def _comparable(df):
+    """Normaliza dtypes e nulos para comparar os dois caminhos valor a valor"""
+    out = df.reset_index(drop=True).astype(object)
+    return out.where(out.notna(), None)
+
+
+def run_backend(csv_path, dtype_backend):
+    timings = {}
+    start = time.perf_counter()
+    read_kwargs = {"dtype_backend": dtype_backend} if dtype_backend else {}
+    raw = pd.read_csv(csv_path, **read_kwargs)
+    timings["read"] = time.perf_counter() - start
+    raw_mb = _mb(raw)
+
+    start = time.perf_counter()
+    clean = clean_titles(raw)
+    timings["clean"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    countries = split_explode(clean[["show_id", "country"]], "country", "country")
+    genres = split_explode(clean[["show_id", "listed_in"]], "listed_in", "genre")
+    countries = countries.drop_duplicates(subset=["show_id", "country"])
+    genres = genres.drop_duplicates(subset=["show_id", "genre"])
+    timings["explode"] = time.perf_counter() - start
+
+    memory = {"raw": raw_mb, "clean": _mb(clean), "bridges": _mb(countries) + _mb(genres)}
+    return timings, memory, (clean, countries, genres)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="object x pyarrow string backend benchmark")
+    parser.add_argument("--csv", default=os.path.join(project_root, "data", "netflix_titles.csv"))
+    parser.add_argument("--scale", type=int, default=10, help="Replicate the sample N times")
+    args = parser.parse_args()
+
+    sample = pd.read_csv(args.csv, dtype=str)
+    scaled = pd.concat([sample] * args.scale, ignore_index=True)
+    scaled["show_id"] = "s" + pd.Series(range(1, len(scaled) + 1)).astype(str)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "titles.csv")
+        scaled.to_csv(csv_path, index=False)
+
+        results = {}
+        for label, backend in [("object", None), ("pyarrow", "pyarrow")]:
+            results[label] = run_backend(csv_path, backend)
+
+    print(f"rows: {len(scaled)}")
+    print(f"{'backend':<9} {'read s':>8} {'clean s':>8} {'explode s':>10} {'raw MB':>8} {'clean MB':>9} {'bridges MB':>11}")
+    for label, (timings, memory, _) in results.items():
+        print(f"{label:<9} {timings['read']:>8.2f} {timings['clean']:>8.2f} {timings['explode']:>10.2f} "
+              f"{memory['raw']:>8.1f} {memory['clean']:>9.1f} {memory['bridges']:>11.1f}")
+
+    for name, expected, actual in zip(["titles_clean", "titles_by_country", "titles_by_genre"],
+                                      results["object"][2], results["pyarrow"][2]):
+        pd.testing.assert_frame_equal(_comparable(expected), _comparable(actual), check_dtype=False)
+        print(f"✅ {name}: identical results")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+# scripts/bench_timeseries.py
+
+"""
+Downsample de séries longas (src/timeseries.py): tempo de LTTB e min/max e tamanho
+do JSON da figura plotly com todos os pontos x reduzida, em séries sintéticas por
+segundo com um pico isolado (que os dois métodos devem preservar).
+
+Uso:
+    python scripts/bench_timeseries.py --points 1000000 10000000 --max-points 1000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from src import timeseries
+from src.lazy import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+pio = lazy_import("plotly.io")
+
+
+def make_series(n_points, seed=42):
+    """Passeio aleatório com um pico no meio, um ponto por segundo"""
+    rng = np.random.default_rng(seed)
+    values = rng.normal(size=n_points).cumsum()
+    values[n_points // 2] += 50 * values.std()
+    return pd.DataFrame({"period": pd.date_range("2020-01-01", periods=n_points, freq="s"), "total_titles": values})
+
+
+def figure_bytes(df):
+    trace = timeseries.line_trace(df, "period", "total_titles")
+    return len(pio.to_json({"data": [trace], "layout": {}}, validate=False))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time-series downsampling benchmark")
+    parser.add_argument("--points", type=int, nargs="+", default=[1_000_000])
+    parser.add_argument("--max-points", type=int, default=timeseries.MAX_POINTS)
+    parser.add_argument("--skip-full", action="store_true", help="Do not serialize the full series (slow above ~1M)")
+    args = parser.parse_args()
+
+    print(f"{'points':>12} {'method':>8} {'time s':>8} {'kept':>6} {'spike':>6} {'json kB':>10} {'trace':>10}")
+    for n_points in args.points:
+        df = make_series(n_points)
+        spike = df["total_titles"].idxmax()
+        if not args.skip_full:
+            print(f"{n_points:>12} {'none':>8} {0:>8.3f} {n_points:>6} {'yes':>6} "
+                  f"{figure_bytes(df) / 1e3:>10.0f} {timeseries.trace_type(n_points):>10}")
+        for method in timeseries.DOWNSAMPLE_METHODS:
+            start = time.perf_counter()
+            reduced = timeseries.downsample(df, "period", "total_titles", args.max_points, method)
+            elapsed = time.perf_counter() - start
+            kept = "yes" if spike in reduced.index else "no"
+            print(f"{n_points:>12} {method:>8} {elapsed:>8.3f} {len(reduced):>6} {kept:>6} "
+                  f"{figure_bytes(reduced) / 1e3:>10.0f} {timeseries.trace_type(len(reduced)):>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+# scripts/generate_schema_sql.py
+
+"""
+Regera sql/create_tables.sql a partir do registro de schema (src/schema.py).
+
+Uso:
+    python scripts/generate_schema_sql.py          # grava o arquivo
+    python scripts/generate_schema_sql.py --check  # falha se o arquivo estiver desatualizado
+"""
+
+import argparse
+import os
+import sys
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from src.schema import render_sql
+
+SQL_PATH = os.path.join(project_root, 'sql', 'create_tables.sql')
+
+HEADER = """-- src/sql/create_tables.sql
+
+-- Tabelas do dataset Netflix from Kaggle
+-- Fonte: https://www.kaggle.com/datasets/shivamb/netflix-shows
+-- Arquivo gerado por scripts/generate_schema_sql.py a partir de src/schema.py;
+-- altere os tipos no registro e regenere, não edite à mão.
+
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate sql/create_tables.sql from the schema registry")
+    parser.add_argument("--check", action="store_true", help="Exit 1 when the file is out of date")
+    args = parser.parse_args()
+
+    sql = render_sql(HEADER)
+    if args.check:
+        with open(SQL_PATH, encoding="utf-8") as f:
+            if f.read() != sql:
+                print("❌ sql/create_tables.sql is out of date: run scripts/generate_schema_sql.py")
+                sys.exit(1)
+        print("✅ sql/create_tables.sql matches the schema registry")
+        return
+
+    with open(SQL_PATH, "w", encoding="utf-8") as f:
+        f.write(sql)
+    print(f"✅ {SQL_PATH} written")
+
+
+if __name__ == "__main__":
+    main()
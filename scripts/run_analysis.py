@@ -1,39 +1,96 @@
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-from sqlalchemy import create_engine
-from src.db import create_engine_postgres
-from src.config import load_env
-
-# Inicialização
-load_env()
-engine = create_engine_postgres()
-
-# Função para plotar barra horizontal
-def plot_bar(df, x, y, title, palette='viridis'):
-    sns.barplot(data=df, x=x, y=y, palette=palette)
-    plt.title(title)
-    plt.tight_layout()
+# scripts/run_analysis.py
+
+import sys
+import os
+import argparse
+import logging
+
+# Adiciona raiz do projeto ao sys.path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from src import queries, report
+from src.db import get_engine
+from src.lazy import lazy_import
+
+# Consultas via src/queries.py (parâmetros bind + cache por versão do dataset) e
+# gráficos definidos em src/report.py. Bibliotecas pesadas só são carregadas quando
+# o primeiro gráfico é desenhado (matplotlib.pyplot é importado dentro das funções)
+sa = lazy_import("sqlalchemy")
+
+
+# Mostra um gráfico de src/report.py em janela (modo interativo)
+def show_chart(chart):
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=report.FIGSIZE)
+    report.draw_chart(chart, chart.query(**chart.kwargs), ax)
+    fig.tight_layout()
     plt.show()
 
+
+def _chart(name, **kwargs):
+    return next(c for c in report.analysis_charts(**kwargs) if c.name == name)
+
+
 # 1️⃣ Top países
-df_countries = pd.read_sql("SELECT * FROM view_top_countries;", engine)
-plot_bar(df_countries, x='total_titles', y='country', title="Top 10 Países com Mais Títulos")
+def plot_top_countries(limit=10):
+    show_chart(_chart("top_countries", country_limit=limit))
+
 
 # 2️⃣ Evolução de lançamentos
-df_trends = pd.read_sql("SELECT DATE_TRUNC('month', date_added) AS month, COUNT(*) AS total_titles FROM titles_clean GROUP BY month ORDER BY month;", engine)
-sns.lineplot(data=df_trends, x='month', y='total_titles', marker='o')
-plt.title("Evolução Mensal de Lançamentos")
-plt.xticks(rotation=45)
-plt.tight_layout()
-plt.show()
+def explain_monthly_trend(engine, start_year=None, end_year=None):
+    """Plano de execução da evolução mensal (mostra o partition pruning)"""
+    query, params = queries.monthly_trend_sql(start_year, end_year)
+    with engine.connect() as conn:
+        rows = conn.execute(sa.text("EXPLAIN (ANALYZE, COSTS OFF, TIMING OFF) " + query), params)
+        return "\n".join(row[0] for row in rows)
+
+
+def plot_monthly_trend(start_year=None, end_year=None, granularity="month"):
+    show_chart(_chart("monthly_trend", start_year=start_year, end_year=end_year, granularity=granularity))
+
 
 # 3️⃣ Distribuição filmes x séries
-df_types = pd.read_sql("SELECT type, COUNT(*) AS total FROM titles_clean GROUP BY type;", engine)
-plt.pie(df_types['total'], labels=df_types['type'], autopct='%1.1f%%', startangle=90)
-plt.title("Distribuição Filmes x Séries")
-plt.show()
+def plot_type_distribution():
+    show_chart(_chart("type_distribution"))
+
 
 # 4️⃣ Top atores/atrizes
-df_cast = pd.read_sql("SELECT actor, COUNT(*) AS appearances FROM titles_by_cast GROUP BY actor ORDER BY appearances DESC LIMIT 20;", engine)
-plot_bar(df_cast, x='appearances', y='actor', title="Top 20 Atores/Atrizes")
+def plot_top_cast(limit=20):
+    show_chart(_chart("top_cast", cast_limit=limit))
+
+
+def main(start_year=None, end_year=None, granularity="month"):
+    for chart in report.analysis_charts(start_year, end_year, granularity=granularity):
+        show_chart(chart)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Netflix catalog analysis charts")
+    parser.add_argument("--start-year", type=int, help="First date_added year in the monthly trend")
+    parser.add_argument("--end-year", type=int, help="Last date_added year in the monthly trend")
+    parser.add_argument("--granularity", choices=queries.TREND_GRANULARITIES, default="month",
+                        help="Bucket of the release trend chart (long series are downsampled to the figure width)")
+    parser.add_argument("--explain", action="store_true",
+                        help="Print the monthly trend query plan (partition pruning) instead of plotting")
+    parser.add_argument("--report", metavar="DIR",
+                        help="Render all charts headless (PNG/SVG + report.html) into DIR instead of showing them")
+    parser.add_argument("--formats", default=",".join(report.REPORT_FORMATS),
+                        help="Report image formats, comma separated (default: png,svg)")
+    parser.add_argument("--workers", type=int, help="Report render processes (default: CPU count)")
+    parser.add_argument("--force", action="store_true", help="Re-render charts even if their data did not change")
+    args = parser.parse_args()
+
+    if args.explain:
+        print(explain_monthly_trend(get_engine(), args.start_year, args.end_year))
+    elif args.report:
+        logging.basicConfig(level=logging.INFO)
+        formats = [f.strip() for f in args.formats.split(",") if f.strip()]
+        charts = report.analysis_charts(args.start_year, args.end_year, granularity=args.granularity)
+        stats = report.render_report(args.report, charts,
+                                     formats=formats, workers=args.workers, force=args.force)
+        print(f"Report: {len(stats['rendered'])} rendered, {len(stats['skipped'])} unchanged, "
+              f"total {stats['seconds']}s -> {stats['html']}")
+    else:
+        main(args.start_year, args.end_year, args.granularity)
@@ -0,0 +1,47 @@
+# scripts/run_api.py
+
+"""
+Sobe a API HTTP somente leitura (src/api.py) com os agregados dos dashboards e a
+listagem paginada de títulos. Power BI, o dashboard R e os apps Dash podem
+consumir os endpoints em vez de abrir conexões próprias no PostgreSQL.
+
+Uso:
+    python scripts/run_api.py
+    python scripts/run_api.py --host 0.0.0.0 --port 8080 --pool-size 4
+
+Endpoints:
+    GET /health
+    GET /aggregates/<nome>?year=&type=&month=&limit=   (top-countries, monthly-trend, ...)
+    GET /titles?after=<show_id>&limit=&year=&type=&country=&genre=
+    GET /titles/<show_id>
+"""
+
+import argparse
+import logging
+import os
+import sys
+
+# Adiciona raiz do projeto ao sys.path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from src.api import API_POOL_SIZE, create_app
+from src.config import load_env
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Read-only HTTP API for the Netflix catalog")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--pool-size", type=int, default=API_POOL_SIZE,
+                        help="Máximo de conexões do pool asyncpg")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO)
+    load_env()
+
+    from aiohttp import web
+    web.run_app(create_app(pool_size=args.pool_size), host=args.host, port=args.port)
@@ -0,0 +1,47 @@
+# scripts/run_export.py
+
+"""
+Exporta uma tabela do pipeline (ou uma consulta) em streaming com COPY ... TO STDOUT,
+sem carregar o resultado inteiro em memória (src/export.py).
+
+Uso:
+    python scripts/run_export.py titles_clean -o titles.parquet
+    python scripts/run_export.py titles_by_country -o countries.csv.gz --where "date_added_year >= 2019"
+    python scripts/run_export.py titles_clean -o movies.csv --columns show_id,title,release_year --where "type = 'movie'"
+    python scripts/run_export.py --query "SELECT country, COUNT(*) AS n FROM titles_by_country GROUP BY 1" -o c.csv
+"""
+
+import argparse
+import logging
+import os
+import sys
+
+# Adiciona raiz do projeto ao sys.path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from src.export import EXPORT_FORMATS, export_table
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Stream a warehouse table or query to CSV, gzip CSV or Parquet")
+    parser.add_argument("table", nargs="?", help="Tabela a exportar (ex: titles_clean)")
+    parser.add_argument("-o", "--output", required=True, help="Arquivo de saída (.csv, .csv.gz ou .parquet)")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, help="Formato (padrão: pela extensão da saída)")
+    parser.add_argument("--columns", help="Colunas separadas por vírgula (padrão: todas)")
+    parser.add_argument("--where", help="Filtro SQL aplicado à tabela (ex: \"date_added_year = 2020\")")
+    parser.add_argument("--query", help="Consulta SELECT completa, no lugar de tabela/colunas/filtro")
+    parser.add_argument("--parquet-compression", default="zstd", help="Codec do parquet (zstd, snappy, gzip...)")
+    args = parser.parse_args()
+    if not args.table and not args.query:
+        parser.error("pass a table or --query")
+    return args
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO)
+    columns = [c.strip() for c in args.columns.split(",") if c.strip()] if args.columns else None
+    stats = export_table(args.output, table_name=args.table, columns=columns, where=args.where,
+                         query=args.query, fmt=args.format, parquet_compression=args.parquet_compression)
+    print(stats)
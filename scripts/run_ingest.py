@@ -2,8 +2,9 @@
 
 import sys
 import os
+import argparse
+import glob
 import logging
-from sqlalchemy import text  # ✅ necessário para SQL literal no SQLAlchemy 2.x
 
 # ---------------------------------------------
 # Adiciona a pasta raiz do projeto ao sys.path
@@ -11,13 +12,36 @@ from sqlalchemy import text  # ✅ necessário para SQL literal no SQLAlchemy 2.
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.append(project_root)
 
-from src.config import load_env
+from src.config import get_backend, load_env
 from src.logger import setup_logger
 from src.db import create_engine_postgres
-from src.ingest import load_csv, validate_columns, ingest_to_postgres
+from src.ingest import load_csv, ingest_to_postgres
+from src.ingest_files import INGEST_WORKERS, ingest_catalog_files, record_replace
+from src.preflight import preflight_csv
+from src.schema import csv_column_names
+from src.lazy import lazy_import
 
+sa = lazy_import("sqlalchemy")  # ✅ necessário para SQL literal no SQLAlchemy 2.x
 
-def main(csv_path, table_name='netflix_raw'):
+
+# Colunas esperadas no CSV: as de netflix_raw no registro (src/schema.py), sem linhagem
+EXPECTED_COLUMNS = csv_column_names('netflix_raw')
+
+
+def show_summary(engine, table_name):
+    """Pós-ingestão: mostra contagem e primeiros registros"""
+    with engine.connect() as conn:
+        count = conn.execute(sa.text(f"SELECT COUNT(*) FROM {table_name}")).fetchone()[0]
+        print(f"✅ Total de registros importados: {count}")
+
+        # Mostrar 5 primeiros registros
+        print("✅ Primeiros 5 registros:")
+        result = conn.execute(sa.text(f"SELECT * FROM {table_name} LIMIT 5"))
+        for row in result:
+            print(row)
+
+
+def main(csv_path, table_name='netflix_raw', engine_name=None):
     logger = setup_logger()
     try:
         # Carregar variáveis de ambiente
@@ -25,32 +49,36 @@ def main(csv_path, table_name='netflix_raw'):
         # Criar engine de conexão
         engine = create_engine_postgres()
 
-        # Carregar CSV
-        df = load_csv(csv_path)
+        # Preflight: encoding/BOM, cabeçalho validado e estimativa de linhas
+        # a partir de uma amostra, sem parsear o corpo do arquivo
+        preflight = preflight_csv(csv_path, EXPECTED_COLUMNS)
 
-        # Lista de colunas esperadas
-        expected_columns = [
-            'show_id', 'type', 'title', 'director', 'cast', 'country',
-            'date_added', 'release_year', 'rating', 'duration',
-            'listed_in', 'description'
-        ]
-        # Validar colunas
-        validate_columns(df, expected_columns)
+        # Carregar CSV (leitura única, já com a configuração detectada)
+        df = load_csv(csv_path, engine=engine_name, **preflight["read_options"])
+        df['source_file'] = os.path.abspath(csv_path)
 
-        # Ingestão no PostgreSQL
+        # Ingestão no PostgreSQL (replace: o estado em ingest_files passa a ter só este arquivo)
         ingest_to_postgres(df, engine, table_name)
+        record_replace(os.path.abspath(csv_path), len(df), table_name, engine)
 
         # ✅ Pós-ingestão: mostrar contagem de registros
-        with engine.connect() as conn:
-            count = conn.execute(text(f"SELECT COUNT(*) FROM {table_name}")).fetchone()[0]
-            print(f"✅ Total de registros importados: {count}")
+        show_summary(engine, table_name)
+
+        logger.info("✅Ingestion completed successfully!")
+
+    except Exception as e:
+        logger.error(f"❌Ingestion failed: {e}")
+        sys.exit(1)
+
 
-            # Mostrar 5 primeiros registros
-            print("✅ Primeiros 5 registros:")
-            result = conn.execute(text(f"SELECT * FROM {table_name} LIMIT 5"))
-            for row in result:
-                print(row)
+def main_duckdb(csv_path, table_name='netflix_raw'):
+    """DB_BACKEND=duckdb: carga com o read_csv nativo no arquivo DuckDB (src/duck.py)"""
+    from src import duck
 
+    logger = setup_logger()
+    try:
+        duck.ingest_csv(csv_path, table_name)
+        print(duck.read_sql(f"SELECT * FROM {table_name} LIMIT 5"))
         logger.info("✅Ingestion completed successfully!")
 
     except Exception as e:
@@ -58,7 +86,103 @@ def main(csv_path, table_name='netflix_raw'):
         sys.exit(1)
 
 
+def main_resumable(csv_path, table_name='netflix_raw', chunk_mb=8, restart=False):
+    """Carga em chunks com commit + checkpoint por chunk; retoma do último offset gravado"""
+    from src.ingest_resume import ingest_resumable
+
+    logger = setup_logger()
+    try:
+        load_env()
+        engine = create_engine_postgres()
+        stats = ingest_resumable(csv_path, table_name, chunk_bytes=int(chunk_mb * (1 << 20)),
+                                 restart=restart, engine=engine)
+        show_summary(engine, table_name)
+        if stats["rows_quarantined"]:
+            logger.warning(f"⚠️ {stats['rows_quarantined']} rows quarantined, see table ingest_quarantine")
+        logger.info(f"✅Resumable ingestion completed successfully! {stats}")
+
+    except Exception as e:
+        logger.error(f"❌Resumable ingestion failed (rerun to resume from the last checkpoint): {e}")
+        sys.exit(1)
+
+
+def main_files(sources, table_name='netflix_raw', workers=INGEST_WORKERS, engine_name=None, force=False):
+    """Vários arquivos (diretório, glob ou lista) em fila com pool limitado e estado por arquivo"""
+    logger = setup_logger()
+    try:
+        load_env()
+        engine = create_engine_postgres()
+        stats = ingest_catalog_files(sources, table_name, workers=workers, csv_engine=engine_name,
+                                     force=force, engine=engine)
+        show_summary(engine, table_name)
+        if stats["failed"]:
+            raise RuntimeError(f"{stats['failed']} file(s) failed, see table ingest_files")
+        logger.info(f"✅Multi-file ingestion completed successfully! {stats}")
+
+    except Exception as e:
+        logger.error(f"❌Multi-file ingestion failed: {e}")
+        sys.exit(1)
+
+
+def main_async(csv_paths, table_name='netflix_raw', concurrency=4, chunk_rows=50000, dedupe=False):
+    """Ingestão assíncrona (asyncpg + COPY) de um ou mais arquivos"""
+    from src.ingest_async import ingest_to_postgres_async
+
+    logger = setup_logger()
+    try:
+        load_env()
+        read_options = {path: preflight_csv(path, EXPECTED_COLUMNS)["read_options"] for path in csv_paths}
+        stats = ingest_to_postgres_async(
+            csv_paths, table_name,
+            read_options=read_options,
+            concurrency=concurrency, chunk_rows=chunk_rows,
+            dedupe_on='show_id' if dedupe else None,
+        )
+        show_summary(create_engine_postgres(), table_name)
+        logger.info(f"✅Async ingestion completed successfully! {stats}")
+
+    except Exception as e:
+        logger.error(f"❌Async ingestion failed: {e}")
+        sys.exit(1)
+
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ingest Netflix catalog CSV files into PostgreSQL")
     # Caminho absoluto do CSV baseado na raiz do projeto
-    csv_path = os.path.join(project_root, 'data', 'netflix_titles.csv')
-    main(csv_path=csv_path)
+    # Aceita arquivos, diretórios (*.csv) e globs (ex: "data/regional/*.csv")
+    parser.add_argument("csv_paths", nargs="*", default=[os.path.join(project_root, 'data', 'netflix_titles.csv')])
+    parser.add_argument("--table", default="netflix_raw")
+    parser.add_argument("--async", dest="use_async", action="store_true",
+                        help="Use the asyncpg COPY path with concurrent chunks")
+    parser.add_argument("--concurrency", type=int, default=4, help="Concurrent COPY streams (--async)")
+    parser.add_argument("--chunk-rows", type=int, default=50000, help="Rows per COPY chunk (--async)")
+    parser.add_argument("--engine", choices=["c", "pyarrow"], default=None,
+                        help="CSV parser: pandas C engine (default) or multithreaded pyarrow with typed columns")
+    parser.add_argument("--dedupe", action="store_true",
+                        help="Drop show_ids already seen earlier in the stream (--async)")
+    parser.add_argument("--workers", type=int, default=INGEST_WORKERS,
+                        help="Files loaded at the same time (directory/glob/multiple files)")
+    parser.add_argument("--force", action="store_true",
+                        help="Reload files even if ingest_files already has them as loaded")
+    parser.add_argument("--resumable", action="store_true",
+                        help="Commit per chunk with checkpoints in ingest_checkpoints; bad rows go to ingest_quarantine")
+    parser.add_argument("--chunk-mb", type=float, default=8, help="File MB per committed chunk (--resumable)")
+    parser.add_argument("--restart", action="store_true", help="Ignore the checkpoint and reload the file (--resumable)")
+    args = parser.parse_args()
+    multi_file = len(args.csv_paths) > 1 or any(os.path.isdir(p) or glob.has_magic(p) for p in args.csv_paths)
+
+    if get_backend() == "duckdb":
+        if multi_file or args.use_async or args.resumable:
+            parser.error("DB_BACKEND=duckdb ingests a single file (no --async/--resumable/multi-file)")
+        main_duckdb(args.csv_paths[0], args.table)
+    elif args.use_async:
+        main_async(args.csv_paths, args.table, concurrency=args.concurrency, chunk_rows=args.chunk_rows,
+                   dedupe=args.dedupe)
+    elif args.resumable:
+        if multi_file:
+            parser.error("--resumable ingests a single file")
+        main_resumable(args.csv_paths[0], args.table, chunk_mb=args.chunk_mb, restart=args.restart)
+    elif multi_file:
+        main_files(args.csv_paths, args.table, workers=args.workers, engine_name=args.engine, force=args.force)
+    else:
+        main(csv_path=args.csv_paths[0], table_name=args.table, engine_name=args.engine)
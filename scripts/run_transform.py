@@ -2,12 +2,36 @@
 
 import sys
 import os
+import argparse
 
 # Adiciona raiz do projeto ao sys.path
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.append(project_root)
 
-from src.transform import run_transform
+from src.config import get_backend
+from src.transform import TRANSFORM_WRITE_WORKERS, chunk_size, run_incremental_transform, run_transform
 
 if __name__ == "__main__":
-    run_transform()
+    parser = argparse.ArgumentParser(description="Transform netflix_raw into titles_clean and the bridge tables")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Rebuild only the titles whose raw rows changed since the last transform")
+    parser.add_argument("--sequential", action="store_true",
+                        help="Load, clean and save titles_clean one step after the other (no pipeline)")
+    parser.add_argument("--chunk-rows", type=int, default=chunk_size, help="Rows per pipeline chunk")
+    parser.add_argument("--clean-workers", type=int, help="Processes running clean_titles (default: CPUs - 1)")
+    parser.add_argument("--write-workers", type=int, default=TRANSFORM_WRITE_WORKERS,
+                        help="Threads writing titles_clean")
+    args = parser.parse_args()
+
+    if get_backend() == "duckdb":
+        from src import duck
+        from src.logger import setup_logger
+
+        setup_logger()
+        duck.run_transform()
+    elif args.incremental:
+        run_incremental_transform()
+    elif args.sequential:
+        run_transform(pipelined=False)
+    else:
+        run_transform(chunk_rows=args.chunk_rows, clean_workers=args.clean_workers, write_workers=args.write_workers)
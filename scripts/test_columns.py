@@ -1,30 +1,31 @@
 import os
-import pandas as pd
+import sys
 
-# Caminho absoluto do CSV
-csv_path = r"C:\Users\gabri\.project\project_soutag_case\data\netflix_titles.csv"
+# Adiciona raiz do projeto ao sys.path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
 
-# Verifica se o arquivo existe
-if not os.path.exists(csv_path):
-    raise FileNotFoundError(f"CSV não encontrado no caminho: {csv_path}")
+from src.preflight import preflight_csv
+from src.schema import csv_column_names
 
-# Ler o CSV
-df = pd.read_csv(csv_path)
+# Caminho do CSV (argumento opcional; padrão: data/netflix_titles.csv)
+csv_path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(project_root, 'data', 'netflix_titles.csv')
+
+# Lê só o cabeçalho e uma amostra (não parseia o arquivo inteiro)
+preflight = preflight_csv(csv_path)
+columns = preflight['columns']
 
 # Imprimir as colunas
-print("Colunas do CSV:")
-for col in df.columns:
+print(f"Colunas do CSV (encoding: {preflight['encoding']}, ~{preflight['estimated_rows']} linhas):")
+for col in columns:
     print(f"- {col}")
 
-# Lista esperada de colunas
-expected_columns = [
-    'show_id','type','title','director','cast','country',
-    'date_added','release_year','rating','duration','listed_in','description'
-]
+# Lista esperada de colunas (registro de schema)
+expected_columns = csv_column_names('netflix_raw')
 
 # Comparar com as colunas do CSV
-missing_columns = [col for col in expected_columns if col not in df.columns]
-extra_columns = [col for col in df.columns if col not in expected_columns]
+missing_columns = [col for col in expected_columns if col not in columns]
+extra_columns = [col for col in columns if col not in expected_columns]
 
 if not missing_columns and not extra_columns:
     print("\n✅ Todas as colunas estão corretas!")
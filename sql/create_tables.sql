@@ -1,42 +1,248 @@
--- Criação da tabela inicial bruta do dataset Netflix from Kaggle
--- Fonte: https://www.kaggle.com/datasets/shivamb/netflix-shows
-
 -- src/sql/create_tables.sql
 
-CREATE TABLE netflix_raw (
-    show_id VARCHAR(10) PRIMARY KEY,
-    type VARCHAR(20),
-    title VARCHAR(255),
-    director VARCHAR(255),
-    cast TEXT,
-    country TEXT,
-    date_added DATE,
-    release_year INT,
-    rating VARCHAR(10),
-    duration VARCHAR(50),
-    listed_in TEXT,
-    description TEXT
-);
-
--- Fim do arquivo create_tables.sql
--- Data de criação: 2024-06-10
--- Autor: Gabriel Santos
--- Última modificação: 2024-06-10
--- Modificador: Gabriel Santos
--- Descrição: Criação da tabela inicial bruta do dataset Netflix from Kaggle
+-- Tabelas do dataset Netflix from Kaggle
 -- Fonte: https://www.kaggle.com/datasets/shivamb/netflix-shows
--- Versão: 1.0
--- Histórico de modificações:
--- 2024-06-10: Criação do arquivo e definição da estrutura inicial da
--- tabela netflix_raw.
--- 2024-06-10: Adição de comentários e metadados ao arquivo.
--- 2024-06-10: Revisão final e validação da estrutura da tabela.
--- Observações:
--- A tabela netflix_raw é a estrutura inicial para armazenar os dados
--- brutos do dataset Netflix from Kaggle. Ela pode ser expandida ou
--- modificada conforme necessário para atender aos requisitos do projeto.
--- Certifique-se de que os tipos de dados e tamanhos das colunas sejam
--- adequados para os dados que serão inseridos.
--- Recomenda-se a criação de índices adicionais para otimizar consultas
--- frequentes, dependendo dos padrões de uso.
--- Fim do arquivo create_tables.sql
+-- Arquivo gerado por scripts/generate_schema_sql.py a partir de src/schema.py;
+-- altere os tipos no registro e regenere, não edite à mão.
+
+CREATE TABLE "netflix_raw" (
+    "show_id" VARCHAR(10) NOT NULL,
+    "type" VARCHAR(16),
+    "title" TEXT,
+    "director" TEXT,
+    "cast" TEXT,
+    "country" TEXT,
+    "date_added" DATE,
+    "release_year" SMALLINT,
+    "rating" VARCHAR(16),
+    "duration" VARCHAR(16),
+    "listed_in" TEXT,
+    "description" TEXT,
+    "source_file" TEXT,
+    "ingested_at" TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS "idx_netflix_raw_ingested_at" ON "netflix_raw" USING BTREE ("ingested_at");
+CREATE INDEX IF NOT EXISTS "idx_netflix_raw_show_id" ON "netflix_raw" USING BTREE ("show_id");
+
+CREATE TABLE "titles_clean" (
+    "show_id" VARCHAR(10) NOT NULL,
+    "type" VARCHAR(16),
+    "title" TEXT,
+    "director" TEXT,
+    "cast" TEXT,
+    "country" TEXT,
+    "date_added" DATE,
+    "release_year" SMALLINT,
+    "rating" VARCHAR(16),
+    "duration" VARCHAR(16),
+    "listed_in" TEXT,
+    "description" TEXT,
+    "duration_value" SMALLINT,
+    "duration_unit" VARCHAR(16),
+    "date_added_year" SMALLINT NOT NULL,
+    "source_file" TEXT,
+    "search_vector" TSVECTOR GENERATED ALWAYS AS (setweight(to_tsvector('english', coalesce("title", '')), 'A') || setweight(to_tsvector('english', coalesce("director", '') || ' ' || coalesce("cast", '')), 'B') || setweight(to_tsvector('english', coalesce("description", '')), 'C')) STORED,
+    PRIMARY KEY ("show_id", "date_added_year")
+) PARTITION BY RANGE ("date_added_year");
+
+CREATE TABLE "titles_clean_undated" PARTITION OF "titles_clean" FOR VALUES FROM (0) TO (1);
+CREATE TABLE "titles_clean_pre2000" PARTITION OF "titles_clean" FOR VALUES FROM (1) TO (2000);
+CREATE TABLE "titles_clean_y2000" PARTITION OF "titles_clean" FOR VALUES FROM (2000) TO (2001);
+CREATE TABLE "titles_clean_y2001" PARTITION OF "titles_clean" FOR VALUES FROM (2001) TO (2002);
+CREATE TABLE "titles_clean_y2002" PARTITION OF "titles_clean" FOR VALUES FROM (2002) TO (2003);
+CREATE TABLE "titles_clean_y2003" PARTITION OF "titles_clean" FOR VALUES FROM (2003) TO (2004);
+CREATE TABLE "titles_clean_y2004" PARTITION OF "titles_clean" FOR VALUES FROM (2004) TO (2005);
+CREATE TABLE "titles_clean_y2005" PARTITION OF "titles_clean" FOR VALUES FROM (2005) TO (2006);
+CREATE TABLE "titles_clean_y2006" PARTITION OF "titles_clean" FOR VALUES FROM (2006) TO (2007);
+CREATE TABLE "titles_clean_y2007" PARTITION OF "titles_clean" FOR VALUES FROM (2007) TO (2008);
+CREATE TABLE "titles_clean_y2008" PARTITION OF "titles_clean" FOR VALUES FROM (2008) TO (2009);
+CREATE TABLE "titles_clean_y2009" PARTITION OF "titles_clean" FOR VALUES FROM (2009) TO (2010);
+CREATE TABLE "titles_clean_y2010" PARTITION OF "titles_clean" FOR VALUES FROM (2010) TO (2011);
+CREATE TABLE "titles_clean_y2011" PARTITION OF "titles_clean" FOR VALUES FROM (2011) TO (2012);
+CREATE TABLE "titles_clean_y2012" PARTITION OF "titles_clean" FOR VALUES FROM (2012) TO (2013);
+CREATE TABLE "titles_clean_y2013" PARTITION OF "titles_clean" FOR VALUES FROM (2013) TO (2014);
+CREATE TABLE "titles_clean_y2014" PARTITION OF "titles_clean" FOR VALUES FROM (2014) TO (2015);
+CREATE TABLE "titles_clean_y2015" PARTITION OF "titles_clean" FOR VALUES FROM (2015) TO (2016);
+CREATE TABLE "titles_clean_y2016" PARTITION OF "titles_clean" FOR VALUES FROM (2016) TO (2017);
+CREATE TABLE "titles_clean_y2017" PARTITION OF "titles_clean" FOR VALUES FROM (2017) TO (2018);
+CREATE TABLE "titles_clean_y2018" PARTITION OF "titles_clean" FOR VALUES FROM (2018) TO (2019);
+CREATE TABLE "titles_clean_y2019" PARTITION OF "titles_clean" FOR VALUES FROM (2019) TO (2020);
+CREATE TABLE "titles_clean_y2020" PARTITION OF "titles_clean" FOR VALUES FROM (2020) TO (2021);
+CREATE TABLE "titles_clean_y2021" PARTITION OF "titles_clean" FOR VALUES FROM (2021) TO (2022);
+CREATE TABLE "titles_clean_y2022" PARTITION OF "titles_clean" FOR VALUES FROM (2022) TO (2023);
+CREATE TABLE "titles_clean_y2023" PARTITION OF "titles_clean" FOR VALUES FROM (2023) TO (2024);
+CREATE TABLE "titles_clean_y2024" PARTITION OF "titles_clean" FOR VALUES FROM (2024) TO (2025);
+CREATE TABLE "titles_clean_y2025" PARTITION OF "titles_clean" FOR VALUES FROM (2025) TO (2026);
+CREATE TABLE "titles_clean_y2026" PARTITION OF "titles_clean" FOR VALUES FROM (2026) TO (2027);
+CREATE TABLE "titles_clean_y2027" PARTITION OF "titles_clean" FOR VALUES FROM (2027) TO (2028);
+CREATE TABLE "titles_clean_y2028" PARTITION OF "titles_clean" FOR VALUES FROM (2028) TO (2029);
+CREATE TABLE "titles_clean_y2029" PARTITION OF "titles_clean" FOR VALUES FROM (2029) TO (2030);
+CREATE TABLE "titles_clean_y2030" PARTITION OF "titles_clean" FOR VALUES FROM (2030) TO (2031);
+CREATE TABLE "titles_clean_default" PARTITION OF "titles_clean" DEFAULT;
+
+CREATE INDEX IF NOT EXISTS "idx_titles_clean_search_vector" ON "titles_clean" USING GIN ("search_vector");
+
+CREATE TABLE "titles_by_country" (
+    "show_id" VARCHAR(10) NOT NULL,
+    "date_added_year" SMALLINT NOT NULL,
+    "country" TEXT
+) PARTITION BY RANGE ("date_added_year");
+
+CREATE TABLE "titles_by_country_undated" PARTITION OF "titles_by_country" FOR VALUES FROM (0) TO (1);
+CREATE TABLE "titles_by_country_pre2000" PARTITION OF "titles_by_country" FOR VALUES FROM (1) TO (2000);
+CREATE TABLE "titles_by_country_y2000" PARTITION OF "titles_by_country" FOR VALUES FROM (2000) TO (2001);
+CREATE TABLE "titles_by_country_y2001" PARTITION OF "titles_by_country" FOR VALUES FROM (2001) TO (2002);
+CREATE TABLE "titles_by_country_y2002" PARTITION OF "titles_by_country" FOR VALUES FROM (2002) TO (2003);
+CREATE TABLE "titles_by_country_y2003" PARTITION OF "titles_by_country" FOR VALUES FROM (2003) TO (2004);
+CREATE TABLE "titles_by_country_y2004" PARTITION OF "titles_by_country" FOR VALUES FROM (2004) TO (2005);
+CREATE TABLE "titles_by_country_y2005" PARTITION OF "titles_by_country" FOR VALUES FROM (2005) TO (2006);
+CREATE TABLE "titles_by_country_y2006" PARTITION OF "titles_by_country" FOR VALUES FROM (2006) TO (2007);
+CREATE TABLE "titles_by_country_y2007" PARTITION OF "titles_by_country" FOR VALUES FROM (2007) TO (2008);
+CREATE TABLE "titles_by_country_y2008" PARTITION OF "titles_by_country" FOR VALUES FROM (2008) TO (2009);
+CREATE TABLE "titles_by_country_y2009" PARTITION OF "titles_by_country" FOR VALUES FROM (2009) TO (2010);
+CREATE TABLE "titles_by_country_y2010" PARTITION OF "titles_by_country" FOR VALUES FROM (2010) TO (2011);
+CREATE TABLE "titles_by_country_y2011" PARTITION OF "titles_by_country" FOR VALUES FROM (2011) TO (2012);
+CREATE TABLE "titles_by_country_y2012" PARTITION OF "titles_by_country" FOR VALUES FROM (2012) TO (2013);
+CREATE TABLE "titles_by_country_y2013" PARTITION OF "titles_by_country" FOR VALUES FROM (2013) TO (2014);
+CREATE TABLE "titles_by_country_y2014" PARTITION OF "titles_by_country" FOR VALUES FROM (2014) TO (2015);
+CREATE TABLE "titles_by_country_y2015" PARTITION OF "titles_by_country" FOR VALUES FROM (2015) TO (2016);
+CREATE TABLE "titles_by_country_y2016" PARTITION OF "titles_by_country" FOR VALUES FROM (2016) TO (2017);
+CREATE TABLE "titles_by_country_y2017" PARTITION OF "titles_by_country" FOR VALUES FROM (2017) TO (2018);
+CREATE TABLE "titles_by_country_y2018" PARTITION OF "titles_by_country" FOR VALUES FROM (2018) TO (2019);
+CREATE TABLE "titles_by_country_y2019" PARTITION OF "titles_by_country" FOR VALUES FROM (2019) TO (2020);
+CREATE TABLE "titles_by_country_y2020" PARTITION OF "titles_by_country" FOR VALUES FROM (2020) TO (2021);
+CREATE TABLE "titles_by_country_y2021" PARTITION OF "titles_by_country" FOR VALUES FROM (2021) TO (2022);
+CREATE TABLE "titles_by_country_y2022" PARTITION OF "titles_by_country" FOR VALUES FROM (2022) TO (2023);
+CREATE TABLE "titles_by_country_y2023" PARTITION OF "titles_by_country" FOR VALUES FROM (2023) TO (2024);
+CREATE TABLE "titles_by_country_y2024" PARTITION OF "titles_by_country" FOR VALUES FROM (2024) TO (2025);
+CREATE TABLE "titles_by_country_y2025" PARTITION OF "titles_by_country" FOR VALUES FROM (2025) TO (2026);
+CREATE TABLE "titles_by_country_y2026" PARTITION OF "titles_by_country" FOR VALUES FROM (2026) TO (2027);
+CREATE TABLE "titles_by_country_y2027" PARTITION OF "titles_by_country" FOR VALUES FROM (2027) TO (2028);
+CREATE TABLE "titles_by_country_y2028" PARTITION OF "titles_by_country" FOR VALUES FROM (2028) TO (2029);
+CREATE TABLE "titles_by_country_y2029" PARTITION OF "titles_by_country" FOR VALUES FROM (2029) TO (2030);
+CREATE TABLE "titles_by_country_y2030" PARTITION OF "titles_by_country" FOR VALUES FROM (2030) TO (2031);
+CREATE TABLE "titles_by_country_default" PARTITION OF "titles_by_country" DEFAULT;
+
+CREATE INDEX IF NOT EXISTS "idx_titles_by_country_country_show_id" ON "titles_by_country" USING BTREE ("country", "show_id");
+CREATE INDEX IF NOT EXISTS "idx_titles_by_country_show_id" ON "titles_by_country" USING BTREE ("show_id");
+
+CREATE TABLE "titles_by_genre" (
+    "show_id" VARCHAR(10) NOT NULL,
+    "date_added_year" SMALLINT NOT NULL,
+    "listed_in" TEXT,
+    "genre" TEXT
+) PARTITION BY RANGE ("date_added_year");
+
+CREATE TABLE "titles_by_genre_undated" PARTITION OF "titles_by_genre" FOR VALUES FROM (0) TO (1);
+CREATE TABLE "titles_by_genre_pre2000" PARTITION OF "titles_by_genre" FOR VALUES FROM (1) TO (2000);
+CREATE TABLE "titles_by_genre_y2000" PARTITION OF "titles_by_genre" FOR VALUES FROM (2000) TO (2001);
+CREATE TABLE "titles_by_genre_y2001" PARTITION OF "titles_by_genre" FOR VALUES FROM (2001) TO (2002);
+CREATE TABLE "titles_by_genre_y2002" PARTITION OF "titles_by_genre" FOR VALUES FROM (2002) TO (2003);
+CREATE TABLE "titles_by_genre_y2003" PARTITION OF "titles_by_genre" FOR VALUES FROM (2003) TO (2004);
+CREATE TABLE "titles_by_genre_y2004" PARTITION OF "titles_by_genre" FOR VALUES FROM (2004) TO (2005);
+CREATE TABLE "titles_by_genre_y2005" PARTITION OF "titles_by_genre" FOR VALUES FROM (2005) TO (2006);
+CREATE TABLE "titles_by_genre_y2006" PARTITION OF "titles_by_genre" FOR VALUES FROM (2006) TO (2007);
+CREATE TABLE "titles_by_genre_y2007" PARTITION OF "titles_by_genre" FOR VALUES FROM (2007) TO (2008);
+CREATE TABLE "titles_by_genre_y2008" PARTITION OF "titles_by_genre" FOR VALUES FROM (2008) TO (2009);
+CREATE TABLE "titles_by_genre_y2009" PARTITION OF "titles_by_genre" FOR VALUES FROM (2009) TO (2010);
+CREATE TABLE "titles_by_genre_y2010" PARTITION OF "titles_by_genre" FOR VALUES FROM (2010) TO (2011);
+CREATE TABLE "titles_by_genre_y2011" PARTITION OF "titles_by_genre" FOR VALUES FROM (2011) TO (2012);
+CREATE TABLE "titles_by_genre_y2012" PARTITION OF "titles_by_genre" FOR VALUES FROM (2012) TO (2013);
+CREATE TABLE "titles_by_genre_y2013" PARTITION OF "titles_by_genre" FOR VALUES FROM (2013) TO (2014);
+CREATE TABLE "titles_by_genre_y2014" PARTITION OF "titles_by_genre" FOR VALUES FROM (2014) TO (2015);
+CREATE TABLE "titles_by_genre_y2015" PARTITION OF "titles_by_genre" FOR VALUES FROM (2015) TO (2016);
+CREATE TABLE "titles_by_genre_y2016" PARTITION OF "titles_by_genre" FOR VALUES FROM (2016) TO (2017);
+CREATE TABLE "titles_by_genre_y2017" PARTITION OF "titles_by_genre" FOR VALUES FROM (2017) TO (2018);
+CREATE TABLE "titles_by_genre_y2018" PARTITION OF "titles_by_genre" FOR VALUES FROM (2018) TO (2019);
+CREATE TABLE "titles_by_genre_y2019" PARTITION OF "titles_by_genre" FOR VALUES FROM (2019) TO (2020);
+CREATE TABLE "titles_by_genre_y2020" PARTITION OF "titles_by_genre" FOR VALUES FROM (2020) TO (2021);
+CREATE TABLE "titles_by_genre_y2021" PARTITION OF "titles_by_genre" FOR VALUES FROM (2021) TO (2022);
+CREATE TABLE "titles_by_genre_y2022" PARTITION OF "titles_by_genre" FOR VALUES FROM (2022) TO (2023);
+CREATE TABLE "titles_by_genre_y2023" PARTITION OF "titles_by_genre" FOR VALUES FROM (2023) TO (2024);
+CREATE TABLE "titles_by_genre_y2024" PARTITION OF "titles_by_genre" FOR VALUES FROM (2024) TO (2025);
+CREATE TABLE "titles_by_genre_y2025" PARTITION OF "titles_by_genre" FOR VALUES FROM (2025) TO (2026);
+CREATE TABLE "titles_by_genre_y2026" PARTITION OF "titles_by_genre" FOR VALUES FROM (2026) TO (2027);
+CREATE TABLE "titles_by_genre_y2027" PARTITION OF "titles_by_genre" FOR VALUES FROM (2027) TO (2028);
+CREATE TABLE "titles_by_genre_y2028" PARTITION OF "titles_by_genre" FOR VALUES FROM (2028) TO (2029);
+CREATE TABLE "titles_by_genre_y2029" PARTITION OF "titles_by_genre" FOR VALUES FROM (2029) TO (2030);
+CREATE TABLE "titles_by_genre_y2030" PARTITION OF "titles_by_genre" FOR VALUES FROM (2030) TO (2031);
+CREATE TABLE "titles_by_genre_default" PARTITION OF "titles_by_genre" DEFAULT;
+
+CREATE INDEX IF NOT EXISTS "idx_titles_by_genre_genre_show_id" ON "titles_by_genre" USING BTREE ("genre", "show_id");
+CREATE INDEX IF NOT EXISTS "idx_titles_by_genre_show_id" ON "titles_by_genre" USING BTREE ("show_id");
+
+CREATE TABLE "value_mapping" (
+    "domain" VARCHAR(32) NOT NULL,
+    "raw_value" TEXT NOT NULL,
+    "canonical" TEXT,
+    PRIMARY KEY ("domain", "raw_value")
+);
+
+CREATE TABLE "dataset_version" (
+    "id" SMALLINT NOT NULL,
+    "version" INTEGER NOT NULL,
+    "updated_at" TIMESTAMPTZ NOT NULL,
+    PRIMARY KEY ("id")
+);
+
+CREATE TABLE "ingest_files" (
+    "source_file" TEXT NOT NULL,
+    "content_hash" VARCHAR(64) NOT NULL,
+    "size_bytes" BIGINT,
+    "status" VARCHAR(16) NOT NULL,
+    "rows" INTEGER,
+    "error" TEXT,
+    "updated_at" TIMESTAMPTZ NOT NULL,
+    PRIMARY KEY ("source_file")
+);
+
+CREATE TABLE "ingest_checkpoints" (
+    "source_file" TEXT NOT NULL,
+    "table_name" VARCHAR(63) NOT NULL,
+    "fingerprint" VARCHAR(64) NOT NULL,
+    "byte_offset" BIGINT NOT NULL,
+    "line_number" BIGINT NOT NULL,
+    "rows_loaded" BIGINT NOT NULL,
+    "rows_quarantined" BIGINT NOT NULL,
+    "status" VARCHAR(16) NOT NULL,
+    "updated_at" TIMESTAMPTZ NOT NULL,
+    PRIMARY KEY ("source_file", "table_name")
+);
+
+CREATE TABLE "transform_state" (
+    "table_name" VARCHAR(63) NOT NULL,
+    "watermark" TIMESTAMPTZ,
+    "updated_at" TIMESTAMPTZ NOT NULL,
+    PRIMARY KEY ("table_name")
+);
+
+CREATE TABLE "raw_deletions" (
+    "table_name" VARCHAR(63) NOT NULL,
+    "show_id" VARCHAR(10) NOT NULL,
+    "deleted_at" TIMESTAMPTZ NOT NULL
+);
+
+CREATE TABLE "dq_results" (
+    "run_id" VARCHAR(32) NOT NULL,
+    "checked_at" TIMESTAMPTZ NOT NULL,
+    "table_name" VARCHAR(63) NOT NULL,
+    "rule" VARCHAR(32) NOT NULL,
+    "columns" TEXT NOT NULL,
+    "checked_rows" BIGINT,
+    "failed_rows" BIGINT,
+    "failure_rate" DOUBLE PRECISION,
+    "sampled" BOOLEAN,
+    "passed" BOOLEAN,
+    PRIMARY KEY ("run_id", "table_name", "rule", "columns")
+);
+
+CREATE TABLE "ingest_quarantine" (
+    "source_file" TEXT NOT NULL,
+    "table_name" VARCHAR(63) NOT NULL,
+    "byte_offset" BIGINT NOT NULL,
+    "line_number" BIGINT,
+    "raw_row" TEXT,
+    "reason" TEXT,
+    "created_at" TIMESTAMPTZ NOT NULL
+);
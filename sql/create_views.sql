@@ -0,0 +1,31 @@
+-- src/sql/create_views.sql
+
+-- Views de análise (README, "Consultas SQL Principais"). Recriadas ao fim de
+-- run_transform, pois titles_clean e as tabelas ponte são recriadas com
+-- DROP ... CASCADE. view_top_cast depende de titles_by_cast, carregada fora
+-- do pipeline, e não está aqui.
+
+CREATE OR REPLACE VIEW view_top_countries AS
+SELECT country, COUNT(*) AS total_titles
+FROM titles_by_country
+GROUP BY country
+ORDER BY total_titles DESC;
+
+CREATE OR REPLACE VIEW view_monthly_trends AS
+SELECT DATE_TRUNC('month', date_added) AS month,
+       COUNT(*) AS total_titles
+FROM titles_clean
+WHERE date_added IS NOT NULL
+GROUP BY month
+ORDER BY month;
+
+CREATE OR REPLACE VIEW view_type_distribution AS
+SELECT type, COUNT(*) AS total
+FROM titles_clean
+GROUP BY type;
+
+CREATE OR REPLACE VIEW view_titles_by_genre AS
+SELECT genre, COUNT(*) AS total_titles
+FROM titles_by_genre
+GROUP BY genre
+ORDER BY total_titles DESC;
@@ -0,0 +1,258 @@
+# src/api.py
+
+import asyncio
+import email.utils
+import functools
+import hashlib
+import json
+import logging
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Optional
+
+from src import queries
+from src.db import postgres_dsn
+from src.lazy import lazy_import
+
+asyncpg = lazy_import("asyncpg")
+web = lazy_import("aiohttp.web")
+
+logger = logging.getLogger(__name__)
+
+API_POOL_SIZE = 4            # conexões do pool asyncpg (poucas: as respostas 304 não usam o banco)
+VERSION_POLL_SECONDS = queries.VERSION_POLL_SECONDS
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+GZIP_MIN_BYTES = 1024        # respostas menores vão sem compressão
+
+# Agregados servidos em /aggregates/<nome>: (builder SQL de src/queries.py, parâmetros aceitos)
+AGGREGATES = {
+    "top-countries": (queries.top_countries_sql, ("limit", "year", "type", "month")),
+    "genre-distribution": (queries.genre_distribution_sql, ("limit", "year", "type", "month")),
+    "type-distribution": (queries.type_distribution_sql, ("year", "month")),
+    "top-cast": (queries.top_cast_sql, ("limit", "year", "type", "month")),
+    "monthly-trend": (queries.monthly_trend_sql, ("start_year", "end_year", "type")),
+    "monthly-trend-by-type": (queries.monthly_trend_by_type_sql, ("year",)),
+    "catalog-summary": (queries.catalog_summary_sql, ("year",)),
+    "titles-per-year": (queries.titles_per_year_sql, ()),
+}
+_INT_PARAMS = {"limit", "year", "month", "start_year", "end_year"}
+
+
+@dataclass
+class ApiState:
+    """Estado da API, guardado uma vez no app: depois do start só os campos mudam"""
+    dsn: Optional[str] = None
+    pool_size: int = API_POOL_SIZE
+    version_poll: float = VERSION_POLL_SECONDS
+    version: tuple = (0, None)
+    pool: Any = None
+    version_task: Any = None
+
+
+@functools.lru_cache(maxsize=None)
+def state_key():
+    """web.AppKey do ApiState (criada no primeiro uso: importar src.api não carrega o aiohttp)"""
+    return web.AppKey("state", ApiState)
+
+
+# -----------------------------
+# VERSION & CONDITIONAL GET
+# -----------------------------
+
+async def _read_version(pool):
+    try:
+        row = await pool.fetchrow(f"SELECT version, updated_at FROM {queries.VERSION_TABLE} WHERE id = 1")
+    except asyncpg.exceptions.UndefinedTableError:
+        return 0, None
+    return (row["version"], row["updated_at"]) if row else (0, None)
+
+
+async def _poll_version(state):
+    """Relê dataset_version em segundo plano; é a única consulta ligada às respostas 304"""
+    while True:
+        await asyncio.sleep(state.version_poll)
+        try:
+            version = await _read_version(state.pool)
+        except (OSError, asyncpg.PostgresError) as e:
+            logger.warning(f"⚠️ Could not read dataset version: {e}")
+            continue
+        if version != state.version:
+            logger.info(f"Dataset version changed: {state.version[0]} -> {version[0]}")
+            state.version = version
+
+
+def _accepts_gzip(request):
+    return "gzip" in request.headers.get("Accept-Encoding", "")
+
+
+def _etag(version, request):
+    # mesma URL + mesma versão do dataset + mesma codificação = mesma resposta
+    digest = hashlib.sha1(request.path_qs.encode()).hexdigest()[:16]
+    encoding = "-gzip" if _accepts_gzip(request) else ""
+    return f'W/"v{version}-{digest}{encoding}"'
+
+
+def _not_modified(request, etag, updated_at):
+    if_none_match = request.headers.get("If-None-Match")
+    if if_none_match is not None:
+        return etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*"
+    if_modified_since = request.if_modified_since
+    return bool(updated_at and if_modified_since and updated_at.replace(microsecond=0) <= if_modified_since)
+
+
+async def conditional_get(request, handler):
+    """
+    ETag/Last-Modified derivados da versão do dataset. Quem já tem a versão atual
+    recebe 304 antes do handler, sem tocar no banco.
+    """
+    if request.method not in ("GET", "HEAD") or request.path == "/health":
+        return await handler(request)
+
+    version, updated_at = request.app[state_key()].version
+    headers = {"ETag": _etag(version, request), "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    if updated_at is not None:
+        headers["Last-Modified"] = email.utils.format_datetime(updated_at, usegmt=True)
+    if _not_modified(request, headers["ETag"], updated_at):
+        return web.Response(status=304, headers=headers)
+
+    response = await handler(request)
+    if response.status == 200:
+        response.headers.update(headers)
+    return response
+
+
+# -----------------------------
+# RESPONSES
+# -----------------------------
+
+def _default(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def json_response(request, payload):
+    """JSON com gzip quando o cliente aceita e o corpo passa de GZIP_MIN_BYTES"""
+    body = json.dumps(payload, default=_default, ensure_ascii=False).encode()
+    # a codificação depende do Accept-Encoding: caches precisam separar as variantes
+    response = web.Response(body=body, content_type="application/json", headers={"Vary": "Accept-Encoding"})
+    if len(body) >= GZIP_MIN_BYTES and _accepts_gzip(request):
+        response.enable_compression(web.ContentCoding.gzip)
+    return response
+
+
+def _int_param(request, name, default=None, minimum=None, maximum=None):
+    raw = request.query.get(name)
+    if raw in (None, ""):
+        return default
+    try:
+        value = int(raw)
+    except ValueError:
+        raise web.HTTPBadRequest(text=f"'{name}' must be an integer") from None
+    if minimum is not None:
+        value = max(value, minimum)
+    return min(value, maximum) if maximum is not None else value
+
+
+# -----------------------------
+# HANDLERS
+# -----------------------------
+
+async def health(request):
+    version, updated_at = request.app[state_key()].version
+    return json_response(request, {"status": "ok", "dataset_version": version, "updated_at": updated_at})
+
+
+async def aggregate(request):
+    """GET /aggregates/{name}: mesmas consultas de src/queries.py, via pool asyncpg"""
+    name = request.match_info["name"]
+    if name not in AGGREGATES:
+        raise web.HTTPNotFound(text=f"Unknown aggregate '{name}'. Available: {', '.join(AGGREGATES)}")
+    builder, accepted = AGGREGATES[name]
+    kwargs = {}
+    for param in accepted:
+        if param in _INT_PARAMS:
+            value = _int_param(request, param, minimum=0, maximum=MAX_PAGE_SIZE if param == "limit" else None)
+        else:
+            value = request.query.get(param) or None
+        if value is not None:
+            kwargs[param] = value
+
+    sql, params = queries.to_positional(*builder(**kwargs))
+    rows = await request.app[state_key()].pool.fetch(sql, *params)
+    return json_response(request, {"aggregate": name, "params": kwargs, "rows": [dict(row) for row in rows]})
+
+
+async def titles(request):
+    """GET /titles?after=<show_id>&limit=&year=&type=&country=&genre="""
+    limit = _int_param(request, "limit", DEFAULT_PAGE_SIZE, minimum=1, maximum=MAX_PAGE_SIZE)
+    filters = {
+        "after": request.query.get("after") or None,
+        "year": _int_param(request, "year"),
+        "type": request.query.get("type") or None,
+        "country": request.query.get("country") or None,
+        "genre": request.query.get("genre") or None,
+    }
+    sql, params = queries.to_positional(*queries.titles_page_sql(limit=limit, **filters))
+    rows = await request.app[state_key()].pool.fetch(sql, *params)
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = rows[-1]["show_id"] if has_more else None
+    return json_response(request, {"limit": limit, "next_cursor": next_cursor,
+                                   "results": [dict(row) for row in rows]})
+
+
+async def title_detail(request):
+    """GET /titles/{show_id}: título + países e gêneros das tabelas ponte"""
+    show_id = request.match_info["show_id"]
+    pool = request.app[state_key()].pool
+    columns = ", ".join(f'"{c}"' for c in queries.TITLE_COLUMNS)
+    row = await pool.fetchrow(f"SELECT {columns} FROM titles_clean WHERE show_id = $1", show_id)
+    if row is None:
+        raise web.HTTPNotFound(text=f"Title '{show_id}' not found")
+    countries = await pool.fetch("SELECT country FROM titles_by_country WHERE show_id = $1 ORDER BY country", show_id)
+    genres = await pool.fetch("SELECT genre FROM titles_by_genre WHERE show_id = $1 ORDER BY genre", show_id)
+    payload = dict(row)
+    payload["countries"] = [r["country"] for r in countries]
+    payload["genres"] = [r["genre"] for r in genres]
+    return json_response(request, payload)
+
+
+# -----------------------------
+# APP
+# -----------------------------
+
+async def _on_startup(app):
+    state = app[state_key()]
+    state.pool = await asyncpg.create_pool(state.dsn or postgres_dsn(), min_size=1, max_size=state.pool_size)
+    state.version = await _read_version(state.pool)
+    state.version_task = asyncio.create_task(_poll_version(state))
+    logger.info(f"✅ API ready (dataset version {state.version[0]}, pool size {state.pool_size})")
+
+
+async def _on_cleanup(app):
+    state = app[state_key()]
+    state.version_task.cancel()
+    await asyncio.gather(state.version_task, return_exceptions=True)
+    await state.pool.close()
+
+
+def create_app(dsn=None, pool_size=API_POOL_SIZE, version_poll=VERSION_POLL_SECONDS):
+    """
+    API HTTP somente leitura (aiohttp) com os agregados dos dashboards e a listagem
+    paginada de títulos. dsn padrão: variáveis do .env (carregue com load_env antes).
+    """
+    app = web.Application(middlewares=[web.middleware(conditional_get)])
+    app[state_key()] = ApiState(dsn=dsn, pool_size=pool_size, version_poll=version_poll)
+    app.on_startup.append(_on_startup)
+    app.on_cleanup.append(_on_cleanup)
+    app.router.add_get("/health", health)
+    app.router.add_get("/aggregates/{name}", aggregate)
+    app.router.add_get("/titles", titles)
+    app.router.add_get("/titles/{show_id}", title_detail)
+    return app
@@ -0,0 +1,215 @@
+# src/batching.py
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+from src.config import get_batch_bounds
+
+logger = logging.getLogger(__name__)
+
+INITIAL_BATCH_ROWS = 1000
+GROWTH_FACTOR = 2          # crescimento do lote enquanto há poucas medições
+MIN_SAMPLES = 3            # medições antes de ajustar o modelo de custo
+SAMPLE_WINDOW = 20         # medições recentes usadas no ajuste
+OVERHEAD_SHARE = 0.05      # fração do tempo aceitável com custo fixo por lote
+CONVERGENCE = 0.1          # variação relativa abaixo da qual o tamanho é dado como estável
+SLOWDOWN = 0.1             # queda de vazão nos lotes maiores que indica custo superlinear
+BATCH_MEMORY_FRACTION = 0.05  # memória disponível por lote (to_sql/COPY fazem cópias do mesmo porte)
+BYTES_SAMPLE_ROWS = 1000   # linhas amostradas para estimar bytes por linha
+PG_MAX_PARAMS = 65535      # parâmetros por comando no protocolo do PostgreSQL (INSERT method='multi')
+
+_batchers = {}  # tabela -> AdaptiveBatcher (o tamanho aprendido vale para as próximas cargas do processo)
+_registry_lock = threading.Lock()
+
+
+def available_memory():
+    """Memória disponível em bytes (MemAvailable no Linux, sysconf nos demais); None se desconhecida"""
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def frame_bytes(df):
+    """Bytes do DataFrame em memória, estimados por uma amostra das primeiras linhas"""
+    if not len(df):
+        return 0
+    sample = df.iloc[:BYTES_SAMPLE_ROWS]
+    return int(sample.memory_usage(deep=True, index=False).sum() * len(df) / len(sample))
+
+
+def _rate(samples):
+    """Linhas por segundo de um grupo de medições (linhas, segundos)"""
+    return sum(rows for rows, _ in samples) / sum(seconds for _, seconds in samples)
+
+
+# -----------------------------
+# ADAPTIVE BATCHER
+# -----------------------------
+
+class AdaptiveBatcher:
+    """
+    Tamanho de lote de escrita de uma tabela, ajustado pelas escritas medidas.
+
+    Cada lote gravado vira uma medição (linhas, segundos), e o tempo é modelado como
+    custo fixo por lote + custo por linha (mínimos quadrados nas medições recentes).
+    O tamanho escolhido é o menor em que o custo fixo pesa no máximo OVERHEAD_SHARE
+    do tempo, ou seja ~95% da vazão máxima: lotes maiores só gastariam memória.
+    Fica entre os limites configurados (src/config.py), a memória disponível dividida
+    pelos bytes por linha observados e o limite de parâmetros do INSERT 'multi'.
+    Seguro para uso por várias threads de escrita da mesma tabela.
+    """
+
+    def __init__(self, name, min_rows=None, max_rows=None, initial_rows=INITIAL_BATCH_ROWS,
+                 memory_fraction=BATCH_MEMORY_FRACTION):
+        default_min, default_max = get_batch_bounds()
+        self.name = name
+        self.min_rows = min_rows or default_min
+        self.max_rows = max_rows or default_max
+        self.memory_fraction = memory_fraction
+        self.max_statement_rows = None  # limite de parâmetros (limit_params)
+        self.bytes_per_row = None
+        self.samples = deque(maxlen=SAMPLE_WINDOW)
+        self.converged = False
+        self._lock = threading.Lock()
+        self.size = self._clamp(initial_rows)
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Zera os totais da carga atual (o tamanho aprendido é mantido)"""
+        self.batches, self.rows, self.seconds, self.bytes = 0, 0, 0.0, 0
+
+    # --- limites ---
+    def upper_bound(self):
+        """Maior lote permitido agora: limite configurado, memória disponível e parâmetros por comando"""
+        bound = self.max_rows
+        memory = available_memory()
+        if memory and self.bytes_per_row:
+            bound = min(bound, int(memory * self.memory_fraction / self.bytes_per_row))
+        if self.max_statement_rows:
+            bound = min(bound, self.max_statement_rows)
+        return max(self.min_rows, bound)
+
+    def _clamp(self, rows):
+        return max(self.min_rows, min(int(rows), self.upper_bound()))
+
+    def limit_params(self, n_columns, max_params=PG_MAX_PARAMS):
+        """INSERT com várias linhas (method='multi') usa linhas x colunas parâmetros por comando"""
+        with self._lock:
+            self.max_statement_rows = max(1, max_params // max(1, n_columns))
+            self.size = self._clamp(self.size)
+
+    # --- ajuste ---
+    def next_size(self):
+        with self._lock:
+            return self.size
+
+    def _fit_target(self):
+        """Tamanho pelo modelo segundos = fixo + por_linha * linhas; None se as medições não bastam"""
+        n = len(self.samples)
+        mean_rows = sum(rows for rows, _ in self.samples) / n
+        mean_seconds = sum(seconds for _, seconds in self.samples) / n
+        spread = sum((rows - mean_rows) ** 2 for rows, _ in self.samples)
+        if spread == 0:
+            return None
+        per_row = sum((rows - mean_rows) * (seconds - mean_seconds) for rows, seconds in self.samples) / spread
+        fixed = mean_seconds - per_row * mean_rows
+        if per_row <= 0:
+            target = self.max_rows  # custo dominado pelo lote: quanto maior, melhor
+        elif fixed <= 0:
+            target = self.size  # sem custo fixo mensurável: qualquer tamanho serve
+        else:
+            target = fixed * (1 - OVERHEAD_SHARE) / (OVERHEAD_SHARE * per_row)
+        # custo superlinear (ex: INSERT 'multi' enorme): se a metade maior dos lotes medidos
+        # teve vazão claramente pior que a menor, não passa do maior lote da metade menor
+        ordered = sorted(self.samples)
+        small, large = ordered[:n // 2], ordered[n // 2:]
+        if small and large[0][0] > small[-1][0] and _rate(large) < _rate(small) * (1 - SLOWDOWN):
+            target = min(target, small[-1][0])
+        return target
+
+    def record(self, rows, seconds, nbytes=None):
+        """Registra um lote gravado e recalcula o tamanho dos próximos"""
+        with self._lock:
+            self.batches += 1
+            self.rows += rows
+            self.seconds += seconds
+            if nbytes:
+                self.bytes += nbytes
+                self.bytes_per_row = self.bytes / self.rows
+            if rows and seconds > 0:
+                self.samples.append((rows, seconds))
+            target = self._fit_target() if len(self.samples) >= MIN_SAMPLES else None
+            if target is None:
+                target = self.size * GROWTH_FACTOR
+            new_size = self._clamp(target)
+            self.converged = len(self.samples) >= MIN_SAMPLES and abs(new_size - self.size) <= CONVERGENCE * self.size
+            self.size = new_size
+
+    def iter_batches(self, df):
+        """
+        Fatias de `df` no tamanho atual; o intervalo até o pedido da próxima fatia
+        (a escrita do lote pelo consumidor) é a medição registrada.
+        """
+        start = 0
+        while start < len(df):
+            batch = df.iloc[start:start + self.next_size()]
+            nbytes = frame_bytes(batch)
+            began = time.perf_counter()
+            yield batch
+            self.record(len(batch), time.perf_counter() - began, nbytes)
+            start += len(batch)
+
+    def describe(self):
+        rate = self.rows / self.seconds if self.seconds else 0
+        state = "converged" if self.converged else "still adjusting"
+        row_bytes = f", {self.bytes_per_row:.0f} B/row" if self.bytes_per_row else ""
+        return (f"'{self.name}': batch size {self.size} rows ({state}; {self.batches} batches, "
+                f"{self.rows} rows at {rate:.0f} rows/s{row_bytes}, bounds {self.min_rows}-{self.upper_bound()})")
+
+
+# -----------------------------
+# REGISTRY / WRITERS
+# -----------------------------
+
+def get_batcher(name, **options):
+    """AdaptiveBatcher compartilhado da tabela (criado com `options` no primeiro uso)"""
+    with _registry_lock:
+        if name not in _batchers:
+            _batchers[name] = AdaptiveBatcher(name, **options)
+        return _batchers[name]
+
+
+def log_batch_sizes():
+    """Loga o tamanho de lote a que cada tabela chegou nesta carga e zera os totais"""
+    for batcher in list(_batchers.values()):
+        if batcher.batches:
+            logger.info(f"📦 {batcher.describe()}")
+            batcher.reset_stats()
+
+
+def batched_to_sql(df, table_name, con, if_exists="append", batcher=None, **to_sql_kwargs):
+    """
+    DataFrame.to_sql em lotes de tamanho adaptativo (get_batcher da tabela).
+    Com if_exists='replace' só o primeiro lote recria a tabela. Retorna as linhas gravadas.
+    """
+    batcher = batcher or get_batcher(table_name)
+    if to_sql_kwargs.get("method") == "multi":
+        batcher.limit_params(len(df.columns))
+    if not len(df):
+        df.to_sql(table_name, con, if_exists=if_exists, index=False, **to_sql_kwargs)
+        return 0
+    for batch in batcher.iter_batches(df):
+        batch.to_sql(table_name, con, if_exists=if_exists, index=False, **to_sql_kwargs)
+        if_exists = "append"
+    return len(df)
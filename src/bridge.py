@@ -0,0 +1,154 @@
+# src/bridge.py
+
+import logging
+
+from src.batching import AdaptiveBatcher, get_batcher
+from src.db import get_engine
+from src.lazy import lazy_import
+from src.schema import TABLES, create_table_ddl, partition_ddl
+from src.strings import split_flatten
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+pa = lazy_import("pyarrow")
+pc = lazy_import("pyarrow.compute")
+pa_csv = lazy_import("pyarrow.csv")
+
+logger = logging.getLogger(__name__)
+
+BRIDGE_BATCH_ROWS = 50000  # lote inicial de COPY, em linhas de origem (depois ajustado por src/batching.py)
+
+
+# -----------------------------
+# BATCHES
+# -----------------------------
+
+def _dedupe_pairs(parents, flat):
+    """Remove valores repetidos dentro da mesma linha, mantendo a primeira ocorrência"""
+    encoded = pc.dictionary_encode(flat)
+    codes = encoded.indices.fill_null(-1).to_numpy().astype(np.int64) + 1
+    keys = parents.astype(np.int64) * (len(encoded.dictionary) + 1) + codes
+    _, first_idx = np.unique(keys, return_index=True)
+    keep = np.sort(first_idx)
+    return parents[keep], flat.take(pa.array(keep))
+
+
+def _canonicalize(parents, flat, mapping):
+    """
+    Troca cada valor pelo canônico de `mapping` (um lookup por valor distinto) e
+    descarta vazios e valores mapeados para None. Linhas nulas continuam como nulo.
+    """
+    encoded = pc.dictionary_encode(flat)
+    canonical = pa.array([mapping.get(v, v) if v.strip() else None for v in encoded.dictionary.to_pylist()],
+                         type=pa.string())
+    keep = pc.fill_null(pc.take(pc.is_valid(canonical), encoded.indices), True)
+    mapped = pc.take(canonical, encoded.indices).filter(keep)
+    return parents[keep.to_numpy(zero_copy_only=False)], mapped
+
+
+def _as_array(values):
+    # colunas Arrow de um pd.concat (ex: transform em pipeline) viram ChunkedArray
+    return values.combine_chunks() if isinstance(values, pa.ChunkedArray) else values
+
+
+def _column_array(series):
+    # texto sempre como string; colunas inteiras (ex: date_added_year) mantêm o tipo
+    if pd.api.types.is_integer_dtype(series.dtype):
+        return _as_array(pa.array(series, from_pandas=True))
+    return _as_array(pa.array(series, type=pa.string(), from_pandas=True))
+
+
+def iter_bridge_batches(df, column, value_name=None, key="show_id", sep=",",
+                        batch_rows=BRIDGE_BATCH_ROWS, carry_columns=(), mapping=None):
+    """
+    Gera lotes Arrow (key, [carry_columns...], value_name) de uma coluna multivalorada
+    (country, listed_in, cast, director...), sem criar listas Python nem o
+    DataFrame explodido inteiro: cada lote cobre no máximo `batch_rows` linhas de origem
+    (ou o tamanho corrente, se `batch_rows` for um AdaptiveBatcher).
+    mapping: {valor: canônico} de src/resolve.py; vazios são descartados.
+    """
+    value_name = value_name or column
+    if isinstance(batch_rows, AdaptiveBatcher):
+        # só as colunas gravadas entram na estimativa de bytes por linha
+        batches = batch_rows.iter_batches(df[list(dict.fromkeys([key, *carry_columns, column]))])
+    else:
+        batches = (df.iloc[start:start + batch_rows] for start in range(0, len(df), batch_rows))
+    for batch in batches:
+        values = _as_array(pa.array(batch[column], type=pa.string(), from_pandas=True))
+        parents, flat = split_flatten(values, sep)
+        if mapping is not None:
+            parents, flat = _canonicalize(parents, flat, mapping)
+        parents, flat = _dedupe_pairs(parents, flat)
+
+        take = pa.array(parents)
+        arrays = {key: _column_array(batch[key]).take(take)}
+        for name in carry_columns:
+            arrays[name] = _column_array(batch[name]).take(take)
+        arrays[value_name] = flat
+        yield pa.table(arrays)
+
+
+# -----------------------------
+# COPY WRITER
+# -----------------------------
+
+def copy_bridge_batches(cur, df, column, table_name, value_name=None, key="show_id", sep=",",
+                        batch_rows=None, carry_columns=(), on_batch=None, mapping=None):
+    """
+    Grava os lotes de iter_bridge_batches via COPY em uma tabela existente usando o
+    cursor (psycopg2) recebido, sem commit. batch_rows=None ajusta o lote pela vazão
+    medida (get_batcher da tabela). Retorna o número de linhas gravadas.
+    """
+    value_name = value_name or column
+    if batch_rows is None:
+        batch_rows = get_batcher(table_name, initial_rows=BRIDGE_BATCH_ROWS)
+    column_list = ", ".join(f'"{c}"' for c in [key, *carry_columns, value_name])
+    options = pa_csv.WriteOptions(include_header=False)
+    rows = 0
+    for table in iter_bridge_batches(df, column, value_name, key, sep, batch_rows, carry_columns, mapping):
+        buffer = pa.BufferOutputStream()
+        pa_csv.write_csv(table, buffer, write_options=options)
+        cur.copy_expert(f'COPY "{table_name}" ({column_list}) FROM STDIN WITH (FORMAT csv)',
+                        pa.BufferReader(buffer.getvalue()))
+        rows += table.num_rows
+        if on_batch is not None:
+            on_batch(table.to_pandas())
+    return rows
+
+
+def write_bridge_table(df, column, table_name, value_name=None, key="show_id", sep=",",
+                       batch_rows=None, carry_columns=(), on_batch=None, mapping=None,
+                       engine=None):
+    """
+    (Re)cria `table_name` (com partições, se registrada em src/schema.py) e grava os
+    pares (key, valor) via COPY em lotes limitados, em uma única transação.
+    `df`: DataFrame ou iterável de chunks (ex: tabela relida do banco em partes).
+    `on_batch` recebe cada lote como DataFrame (ex: validações de DQ incrementais);
+    `mapping` canonicaliza os valores (src/resolve.py). Retorna o número de linhas gravadas.
+    """
+    value_name = value_name or column
+    if table_name in TABLES:
+        statements = [create_table_ddl(table_name), *partition_ddl(table_name)]
+    else:
+        columns = [key, *carry_columns, value_name]
+        statements = [f'CREATE TABLE "{table_name}" (' + ", ".join(f'"{c}" TEXT' for c in columns) + ")"]
+
+    conn = (engine or get_engine()).raw_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(f'DROP TABLE IF EXISTS "{table_name}" CASCADE')
+            for ddl in statements:
+                cur.execute(ddl)
+            rows = 0
+            for chunk in [df] if isinstance(df, pd.DataFrame) else df:
+                rows += copy_bridge_batches(cur, chunk, column, table_name, value_name, key, sep,
+                                            batch_rows, carry_columns, on_batch, mapping)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+    logger.info(f"✅ '{table_name}' saved in PostgreSQL with {rows} records")
+    return rows
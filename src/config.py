@@ -1,12 +1,13 @@
 # src/config.py
 
 import os
-from dotenv import load_dotenv
 
 def load_env():
     """
     Carrega variáveis de ambiente do arquivo .env e valida se todas estão presentes.
     """
+    from dotenv import load_dotenv  # import tardio: mantém `import src.config` barato
+
     # Caminho absoluto relativo ao arquivo atual
     dotenv_path = os.path.join(os.path.dirname(__file__), '../env/.env')
     if not os.path.exists(dotenv_path):
@@ -23,6 +24,50 @@ def load_env():
     # Retorna as variáveis carregadas
     return {var: os.getenv(var) for var in required_vars}
 
+def get_dtype_backend():
+    """
+    Backend de dtypes do pipeline, lido de DTYPE_BACKEND no ambiente.
+    None (padrão) mantém colunas de texto como object; 'pyarrow' usa strings Arrow.
+    """
+    backend = os.getenv("DTYPE_BACKEND") or None
+    if backend not in (None, "numpy_nullable", "pyarrow"):
+        raise ValueError(f"Invalid DTYPE_BACKEND: {backend!r} (expected 'numpy_nullable' or 'pyarrow')")
+    return backend
+
+DB_BACKENDS = ("postgres", "duckdb")
+DEFAULT_DUCKDB_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'netflix.duckdb')
+
+def get_backend():
+    """
+    Armazenamento do pipeline, lido de DB_BACKEND no ambiente.
+    'postgres' (padrão) usa o servidor do .env; 'duckdb' usa o arquivo embutido de get_duckdb_path().
+    """
+    backend = os.getenv("DB_BACKEND") or "postgres"
+    if backend not in DB_BACKENDS:
+        raise ValueError(f"Invalid DB_BACKEND: {backend!r} (expected one of {DB_BACKENDS})")
+    return backend
+
+def get_duckdb_path():
+    """Arquivo do DuckDB (DUCKDB_PATH; padrão data/netflix.duckdb)"""
+    return os.getenv("DUCKDB_PATH") or DEFAULT_DUCKDB_PATH
+
+DEFAULT_BATCH_BOUNDS = (500, 200000)
+
+def get_batch_bounds():
+    """
+    Limites (mín, máx) em linhas do lote de escrita ajustado por src/batching.py,
+    lidos de WRITE_BATCH_MIN_ROWS / WRITE_BATCH_MAX_ROWS (padrão 500 e 200000).
+    """
+    bounds = []
+    for var, default in zip(("WRITE_BATCH_MIN_ROWS", "WRITE_BATCH_MAX_ROWS"), DEFAULT_BATCH_BOUNDS):
+        value = os.getenv(var) or str(default)
+        if not value.isdigit() or int(value) < 1:
+            raise ValueError(f"Invalid {var}: {value!r} (expected a positive integer)")
+        bounds.append(int(value))
+    if bounds[0] > bounds[1]:
+        raise ValueError(f"WRITE_BATCH_MIN_ROWS ({bounds[0]}) is above WRITE_BATCH_MAX_ROWS ({bounds[1]})")
+    return tuple(bounds)
+
 def test_env():
     """
     Testa se todas as variáveis de ambiente estão carregadas corretamente.
@@ -0,0 +1,94 @@
+# src/cube.py
+
+import json
+import logging
+import time
+
+from src import queries
+from src.lazy import lazy_import
+
+pd = lazy_import("pandas")
+
+logger = logging.getLogger(__name__)
+
+# Tamanho de cada ranking do dashboard (chart-actors / chart-countries); None = todos os valores
+CUBE_LIMITS = {"cast": 10, "country": 8, "genre": None}
+CLIENTSIDE_BUDGET_BYTES = 1_000_000  # JSON enviado uma vez por sessão ao navegador
+
+_payloads = {}  # (versão do dataset, limites, orçamento) -> payload já montado
+
+
+class PayloadTooLarge(ValueError):
+    pass
+
+
+# -----------------------------
+# RANKINGS
+# -----------------------------
+
+def ranked_values(df, limit):
+    """
+    Valores que entram no top `limit` de alguma combinação de filtros do dashboard
+    (ano; mês ou todos; tipo ou todos), com o desempate de src/queries.py (total desc,
+    valor asc). Só esses valores vão para o navegador: o ranking refeito lá é exato.
+    """
+    keep = set()
+    for keys in (["year", "month", "type"], ["year", "month"], ["year", "type"], ["year"]):
+        grouped = df.groupby(keys + ["value"], dropna=False, as_index=False)["total"].sum()
+        grouped = grouped.sort_values(keys + ["total", "value"], ascending=[True] * len(keys) + [False, True])
+        keep.update(grouped.groupby(keys, dropna=False).head(limit)["value"])
+    return keep
+
+
+def _encode(values):
+    """Dicionário: (lista de valores distintos, códigos por linha)"""
+    codes, uniques = pd.factorize(values, use_na_sentinel=True)
+    return [None if pd.isna(v) else v for v in uniques], codes.tolist()
+
+
+def _columns(df, with_value):
+    """Colunas do cubo como listas (formato colunar compacto no JSON)"""
+    columns = {
+        "year": df["year"].astype(int).tolist(),
+        "month": [None if pd.isna(m) else int(m) for m in df["month"]],
+        "total": df["total"].astype(int).tolist(),
+    }
+    columns["types"], columns["type"] = _encode(df["type"])
+    if with_value:
+        columns["values"], columns["value"] = _encode(df["value"])
+    return columns
+
+
+# -----------------------------
+# PAYLOAD
+# -----------------------------
+
+def build_payload(limits=None, budget_bytes=CLIENTSIDE_BUDGET_BYTES):
+    """
+    Payload do modo clientside do dashboard: cubos de contagem (queries.cube) por
+    ano/mês/tipo para títulos, países, gêneros e elenco, em colunas com valores
+    codificados em dicionário. Os fatos com ranking ficam só com os valores que
+    algum filtro pode mostrar (ranked_values). Levanta PayloadTooLarge acima de
+    `budget_bytes` de JSON.
+    """
+    start = time.perf_counter()
+    limits = {**CUBE_LIMITS, **(limits or {})}
+    version, _ = queries.get_dataset_version()
+    key = (version, tuple(limits.items()), budget_bytes)
+    if key in _payloads:
+        return _payloads[key]
+    payload = {"version": version, "limits": limits, "titles": _columns(queries.cube("titles"), False)}
+    for dimension, limit in limits.items():
+        df = queries.cube(dimension)
+        if limit is not None:
+            df = df[df["value"].isin(ranked_values(df, limit))]
+        payload[dimension] = _columns(df, True)
+
+    size = len(json.dumps(payload, separators=(",", ":")))
+    if budget_bytes and size > budget_bytes:
+        raise PayloadTooLarge(f"Clientside payload is {size / 1e3:.0f} kB, over the {budget_bytes / 1e3:.0f} kB budget")
+    _payloads.clear()  # só a versão atual do dataset fica em memória
+    _payloads[key] = payload
+    logger.info(f"✅ Clientside payload built: {size / 1e3:.0f} kB in {time.perf_counter() - start:.2f}s "
+                f"(dataset version {version})")
+    return payload
@@ -1,18 +1,39 @@
 # src/db.py
 
-from sqlalchemy import create_engine
-from sqlalchemy.exc import SQLAlchemyError
 import os
 import logging
+from functools import lru_cache
+
+from src.config import load_env
+from src.lazy import lazy_import
+
+sa = lazy_import("sqlalchemy")
+
+
+def postgres_dsn(driver=None):
+    """Monta a DSN do PostgreSQL a partir das variáveis de ambiente (driver opcional, ex: 'psycopg2')"""
+    scheme = f"postgresql+{driver}" if driver else "postgresql"
+    return (
+        f"{scheme}://{os.getenv('DB_USER')}:{os.getenv('DB_PASSWORD')}@"
+        f"{os.getenv('DB_HOST')}:{os.getenv('DB_PORT')}/{os.getenv('DB_NAME')}"
+    )
+
 
 def create_engine_postgres():
     try:
-        engine = create_engine(
-            f"postgresql+psycopg2://{os.getenv('DB_USER')}:{os.getenv('DB_PASSWORD')}@"
-            f"{os.getenv('DB_HOST')}:{os.getenv('DB_PORT')}/{os.getenv('DB_NAME')}"
-        )
+        engine = sa.create_engine(postgres_dsn("psycopg2"))
         logging.info("Database engine created successfully.")
         return engine
-    except SQLAlchemyError as e:
+    except sa.exc.SQLAlchemyError as e:
         logging.error(f"Error creating database engine: {e}")
         raise
+
+
+@lru_cache(maxsize=None)
+def get_engine():
+    """
+    Engine compartilhada do processo, criada na primeira chamada.
+    Carrega o .env nesse momento, e não no import do módulo.
+    """
+    load_env()
+    return create_engine_postgres()
@@ -0,0 +1,112 @@
+# src/dedupe.py
+
+import functools
+
+from src.lazy import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+
+# hash_array faz str() dos nulos: sem a sentinela, None colide com "None", NaN com "nan" etc.
+_NULL_KEY = "\x00<null>"
+_NULL_STRINGS = ("None", "nan", "<NA>", "NaT")
+
+
+@functools.lru_cache(maxsize=None)
+def _null_string_hashes():
+    return pd.util.hash_array(np.array(_NULL_STRINGS, dtype=object), categorize=False)
+
+
+@functools.lru_cache(maxsize=None)
+def _null_hash():
+    return pd.util.hash_array(np.array([_NULL_KEY], dtype=object), categorize=False)[0]
+
+
+def hash_keys(df, columns):
+    """
+    Hash uint64 por linha das colunas-chave (vetorizado; independe do backend de strings).
+    Nulos (None/NaN) viram uma única chave, distinta de qualquer string comum.
+    """
+    columns = [columns] if isinstance(columns, str) else list(columns)
+    if len(columns) == 1:
+        values = df[columns[0]].to_numpy(dtype=object)
+        # categorize=False: chaves são quase todas distintas, fatorizar antes só custa tempo
+        hashes = pd.util.hash_array(values, categorize=False)
+        # só linhas com o hash de str(nulo) podem ser nulas: corrige essas sem varrer o chunk todo
+        suspects = np.flatnonzero(np.isin(hashes, _null_string_hashes()))
+        nulls = suspects[pd.isna(values[suspects])]
+        if nulls.size:
+            hashes[nulls] = _null_hash()
+        return hashes
+    keys = df[columns].astype(object)
+    return pd.util.hash_pandas_object(keys.where(keys.notna(), _NULL_KEY), index=False).to_numpy()
+
+
+class StreamingDeduper:
+    """
+    Conjunto compacto de chaves já vistas em um stream de chunks.
+
+    As chaves são guardadas como hashes uint64 em runs ordenadas (estilo LSM):
+    cada chunk vira uma run nova e runs de tamanho parecido são fundidas, então
+    há no máximo ~log2(n) runs e cada chave custa 8 bytes (~7.6 MiB por milhão),
+    contra ~100 bytes por chave em um set de strings Python.
+    Colisões de hash de 64 bits são a única fonte de falso positivo
+    (probabilidade ~ n² / 2^65: desprezível até bilhões de chaves).
+    """
+
+    def __init__(self):
+        self._runs = []
+
+    def __len__(self):
+        return int(sum(run.size for run in self._runs))
+
+    def contains(self, hashes):
+        """Máscara booleana: hash já visto em chunks anteriores"""
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        found = np.zeros(hashes.shape, dtype=bool)
+        for run in self._runs:
+            idx = np.searchsorted(run, hashes)
+            idx[idx == run.size] = run.size - 1
+            found |= run[idx] == hashes
+        return found
+
+    def add(self, hashes):
+        """Registra hashes (ignora os já presentes) e retorna a máscara de duplicados"""
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        uniques, first_idx = np.unique(hashes, return_index=True)
+
+        # duplicado = repetido dentro do chunk ou já visto antes
+        duplicated = np.ones(hashes.shape, dtype=bool)
+        duplicated[first_idx] = False
+        seen_before = self.contains(uniques)
+        duplicated[first_idx[seen_before]] = True
+
+        new = uniques[~seen_before]
+        if new.size:
+            self._runs.append(new)
+            self._compact()
+        return duplicated
+
+    def _compact(self):
+        # Funde a run mais nova enquanto ela tiver pelo menos metade do tamanho da anterior
+        while len(self._runs) > 1 and self._runs[-1].size * 2 >= self._runs[-2].size:
+            newest = self._runs.pop()
+            merged = np.concatenate([self._runs.pop(), newest])
+            merged.sort(kind="stable")  # timsort: duas runs ordenadas -> merge linear
+            self._runs.append(merged)
+
+    def flag(self, df, columns):
+        """Máscara de duplicados (no chunk ou em chunks anteriores) e registra as chaves"""
+        return self.add(hash_keys(df, columns))
+
+    def drop(self, df, columns):
+        """Remove linhas cuja chave já apareceu no stream"""
+        return df[~self.flag(df, columns)]
+
+    def memory_bytes(self):
+        return int(sum(run.nbytes for run in self._runs))
+
+    def bytes_per_million_keys(self):
+        keys = len(self)
+        return self.memory_bytes() / keys * 1_000_000 if keys else 0.0
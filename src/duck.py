@@ -0,0 +1,242 @@
+# src/duck.py
+
+import logging
+import os
+import re
+import time
+from datetime import timezone
+from functools import lru_cache
+
+from src.config import get_duckdb_path
+from src.lazy import lazy_import
+from src.resolve import MAPPING_TABLE, cluster_values
+from src.schema import DATE_ADDED_FORMAT, TABLES, UNDATED_YEAR, get_columns
+
+duckdb = lazy_import("duckdb")
+
+logger = logging.getLogger(__name__)
+
+# Backend embutido (DB_BACKEND=duckdb): mesmos nomes de tabela do PostgreSQL, em um
+# arquivo local. A leitura do CSV usa o read_csv nativo e a limpeza/explosões são
+# SQL vetorizado, sem DataFrame no meio. Sem partições, busca textual (tsvector) e
+# API asyncpg, que continuam exclusivas do PostgreSQL.
+
+_DUCKDB_TYPES = {"varchar": "VARCHAR", "text": "VARCHAR", "smallint": "SMALLINT", "integer": "INTEGER",
+                 "bigint": "BIGINT", "double": "DOUBLE", "boolean": "BOOLEAN", "date": "DATE",
+                 "timestamptz": "TIMESTAMPTZ"}
+_NAMED_PARAM = re.compile(r"(?<!:):(\w+)")  # :name (não pega casts ::tipo)
+_DURATION_PATTERN = r"(\d+)\s*(\w+)"
+
+
+# -----------------------------
+# CONNECTION
+# -----------------------------
+
+@lru_cache(maxsize=None)
+def get_connection(path=None):
+    """Conexão compartilhada do processo com o arquivo DuckDB (um cursor por chamada)"""
+    path = path or get_duckdb_path()
+    logger.info(f"DuckDB database: {path}")
+    return duckdb.connect(path)
+
+
+def table_ddl(table_name, with_primary_key=True):
+    """CREATE OR REPLACE TABLE do registro em tipos DuckDB (sem colunas geradas e partições)"""
+    columns = [col for col in get_columns(table_name) if not col.generated]
+    lines = [f'"{col.name}" {_DUCKDB_TYPES[col.kind]}' + ("" if col.nullable else " NOT NULL")
+             + (f" DEFAULT {col.default}" if col.default else "") for col in columns]
+    primary_key = TABLES[table_name]["primary_key"]
+    if with_primary_key and primary_key:
+        lines.append("PRIMARY KEY (" + ", ".join(f'"{c}"' for c in primary_key) + ")")
+    return f'CREATE OR REPLACE TABLE "{table_name}" (\n    ' + ",\n    ".join(lines) + "\n)"
+
+
+def _has_table(cur, table_name):
+    return cur.execute("SELECT COUNT(*) FROM information_schema.tables WHERE table_name = ?",
+                       [table_name]).fetchone()[0] > 0
+
+
+def read_sql(sql, params=None, path=None):
+    """
+    Executa uma consulta de src/queries.py (parâmetros :name) e devolve DataFrame.
+    Os parâmetros viram $name; os que a consulta não usa são descartados.
+    """
+    names = set(_NAMED_PARAM.findall(sql))
+    sql = _NAMED_PARAM.sub(r"$\1", sql)
+    params = {name: value for name, value in (params or {}).items() if name in names}
+    return get_connection(path).cursor().execute(sql, params).df()
+
+
+# -----------------------------
+# DATASET VERSION
+# -----------------------------
+
+def get_dataset_version(path=None):
+    """(version, updated_at) publicados no arquivo DuckDB; (0, None) antes do primeiro transform"""
+    cur = get_connection(path).cursor()
+    if not _has_table(cur, "dataset_version"):
+        return 0, None
+    # TIMESTAMPTZ -> datetime no Python exige pytz; lê em UTC sem fuso e anexa o fuso aqui
+    row = cur.execute("SELECT version, timezone('UTC', updated_at) FROM dataset_version WHERE id = 1").fetchone()
+    return (row[0], row[1].replace(tzinfo=timezone.utc)) if row else (0, None)
+
+
+def bump_dataset_version(cur):
+    if not _has_table(cur, "dataset_version"):
+        cur.execute(table_ddl("dataset_version"))
+    return cur.execute("""
+        INSERT INTO dataset_version (id, version, updated_at) VALUES (1, 1, now())
+        ON CONFLICT (id) DO UPDATE SET version = dataset_version.version + 1, updated_at = now()
+        RETURNING version
+    """).fetchone()[0]
+
+
+# -----------------------------
+# INGEST
+# -----------------------------
+
+def _raw_select(col):
+    """Expressão que converte a coluna do CSV (lida como texto) para o tipo do registro"""
+    name = f'"{col.name}"'
+    if col.kind == "date":
+        return f"try_strptime(trim({name}), '{col.date_format or DATE_ADDED_FORMAT}')::DATE AS {name}"
+    if col.kind in ("smallint", "integer", "bigint"):
+        return f"TRY_CAST({name} AS {_DUCKDB_TYPES[col.kind]}) AS {name}"
+    return name
+
+
+def ingest_csv(csv_path, table_name="netflix_raw", path=None):
+    """
+    Carrega o CSV em `table_name` (replace) com o read_csv nativo do DuckDB (paralelo,
+    sem pandas): tudo é lido como texto e convertido aos tipos do registro em SQL,
+    e source_file recebe o caminho do arquivo. Retorna o número de linhas.
+    """
+    start = time.perf_counter()
+    csv_path = os.path.abspath(csv_path)
+    columns = [col for col in get_columns(table_name) if col.name != "source_file" and not col.default]
+    select = ", ".join(_raw_select(col) for col in columns)
+    cur = get_connection(path).cursor()
+    cur.execute("BEGIN")
+    try:
+        cur.execute(table_ddl(table_name, with_primary_key=False))
+        cur.execute(f'INSERT INTO "{table_name}" BY NAME SELECT {select}, $path AS source_file '
+                    f"FROM read_csv($path, header = true, all_varchar = true)", {"path": csv_path})
+        rows = cur.execute(f'SELECT COUNT(*) FROM "{table_name}"').fetchone()[0]
+        cur.execute("COMMIT")
+    except Exception:
+        cur.execute("ROLLBACK")
+        raise
+    logger.info(f"✅ '{table_name}' loaded into DuckDB with {rows} rows in {time.perf_counter() - start:.2f}s")
+    return rows
+
+
+# -----------------------------
+# TRANSFORM
+# -----------------------------
+
+# Mesmas regras de clean_titles (src/transform.py), em SQL, com uma linha por show_id
+# (a carregada por último, como raw_select_sql)
+CLEAN_SELECT = f"""
+    SELECT show_id,
+           lower(trim(type)) AS type,
+           title, director, "cast",
+           lower(trim(coalesce(country, 'not_specified'))) AS country,
+           date_added,
+           release_year,
+           lower(trim(coalesce(rating, 'not_rated'))) AS rating,
+           duration,
+           lower(trim(listed_in)) AS listed_in,
+           description,
+           TRY_CAST(nullif(regexp_extract(duration, '{_DURATION_PATTERN}', 1), '') AS SMALLINT) AS duration_value,
+           nullif(regexp_extract(duration, '{_DURATION_PATTERN}', 2), '') AS duration_unit,
+           coalesce(year(date_added), {UNDATED_YEAR})::SMALLINT AS date_added_year,
+           source_file
+    FROM {{raw_table}}
+    QUALIFY row_number() OVER (PARTITION BY show_id ORDER BY ingested_at DESC, source_file DESC NULLS LAST) = 1
+"""
+
+# tabela ponte: (coluna de origem, domínio/coluna do valor, colunas extras), como BRIDGE_TABLES
+BRIDGE_TABLES = {
+    "titles_by_country": ("country", "country", ["date_added_year"]),
+    "titles_by_genre": ("listed_in", "genre", ["date_added_year", "listed_in"]),
+}
+
+
+def _explode_sql(column, carry_columns):
+    # linhas nulas geram um único valor nulo, como split_flatten
+    carry = "".join(f', "{c}"' for c in carry_columns)
+    return (f"SELECT show_id{carry}, trim(unnest(coalesce(string_split(\"{column}\", ','), [NULL]))) AS value "
+            f"FROM titles_clean")
+
+
+def _resolve_mapping(cur, column, domain):
+    """
+    Canonicalização dos valores (cluster_values de src/resolve.py) com o mapeamento
+    persistido na tabela value_mapping do próprio arquivo DuckDB; só os novos
+    valores distintos passam pelo agrupamento.
+    """
+    if not _has_table(cur, MAPPING_TABLE):
+        cur.execute(table_ddl(MAPPING_TABLE))
+    counts = dict(cur.execute(f"SELECT value, COUNT(*) FROM ({_explode_sql(column, [])}) "
+                              f"WHERE value IS NOT NULL GROUP BY value").fetchall())
+    existing = dict(cur.execute(f"SELECT raw_value, canonical FROM {MAPPING_TABLE} WHERE domain = ?",
+                                [domain]).fetchall())
+    new_mapping = cluster_values(counts, existing)
+    if new_mapping:
+        cur.executemany(f"INSERT OR REPLACE INTO {MAPPING_TABLE} (domain, raw_value, canonical) VALUES (?, ?, ?)",
+                        [(domain, raw, canonical) for raw, canonical in new_mapping.items()])
+    logger.info(f"✅ '{domain}' resolved: {len(counts)} distinct values ({len(new_mapping)} new mappings saved)")
+
+
+def _write_bridge(cur, table_name):
+    """Explode + canonicaliza + dedupe por título em um único INSERT ... SELECT"""
+    column, value_name, carry_columns = BRIDGE_TABLES[table_name]
+    carry = "".join(f', "{c}"' for c in carry_columns)
+    cur.execute(table_ddl(table_name, with_primary_key=False))
+    cur.execute(f"""
+        INSERT INTO "{table_name}" BY NAME
+        SELECT DISTINCT show_id{carry}, "{value_name}" FROM (
+            SELECT e.*,
+                   CASE WHEN m.raw_value IS NULL THEN e.value ELSE m.canonical END AS "{value_name}"
+            FROM ({_explode_sql(column, carry_columns)}) e
+            LEFT JOIN {MAPPING_TABLE} m ON m.domain = '{value_name}' AND m.raw_value = e.value
+        ) WHERE value IS NULL OR (value <> '' AND "{value_name}" IS NOT NULL)
+    """)
+    return cur.execute(f'SELECT COUNT(*) FROM "{table_name}"').fetchone()[0]
+
+
+def run_transform(raw_table="netflix_raw", views_sql_path=None, path=None):
+    """
+    Equivalente de run_transform (src/transform.py) no DuckDB, em uma transação:
+    titles_clean via CREATE + INSERT ... SELECT com as regras de clean_titles,
+    tabelas ponte via unnest(string_split(...)) com o mapeamento de value_mapping,
+    views de sql/create_views.sql e nova versão do dataset.
+    Retorna {tabela: linhas}.
+    """
+    from src.transform import VIEWS_SQL_PATH
+
+    start = time.perf_counter()
+    logger.info("🚀 Starting ETL: Transformation & Modeling (DuckDB)")
+    cur = get_connection(path).cursor()
+    counts = {}
+    cur.execute("BEGIN")
+    try:
+        cur.execute(table_ddl("titles_clean", with_primary_key=False))
+        cur.execute(f"INSERT INTO titles_clean BY NAME {CLEAN_SELECT.format(raw_table=raw_table)}")
+        counts["titles_clean"] = cur.execute("SELECT COUNT(*) FROM titles_clean").fetchone()[0]
+        for table_name, (column, value_name, _) in BRIDGE_TABLES.items():
+            _resolve_mapping(cur, column, value_name)
+            counts[table_name] = _write_bridge(cur, table_name)
+
+        with open(views_sql_path or VIEWS_SQL_PATH, encoding="utf-8") as f:
+            for statement in f.read().split(";"):
+                if "CREATE" in statement.upper():
+                    cur.execute(statement)
+        version = bump_dataset_version(cur)
+        cur.execute("COMMIT")
+    except Exception:
+        cur.execute("ROLLBACK")
+        raise
+
+    logger.info(f"✅ DuckDB transform finished in {time.perf_counter() - start:.2f}s: {counts} (dataset version {version})")
+    return counts
@@ -0,0 +1,204 @@
+# src/export.py
+
+import gzip
+import logging
+import os
+import threading
+import time
+
+from src.db import get_engine
+from src.lazy import lazy_import
+from src.schema import TABLES
+
+pa = lazy_import("pyarrow")
+pa_csv = lazy_import("pyarrow.csv")
+pq = lazy_import("pyarrow.parquet")
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = ("csv", "csv.gz", "parquet")
+READ_BLOCK_BYTES = 4 << 20      # bloco do leitor CSV em streaming (parquet)
+ROW_GROUP_ROWS = 128_000        # linhas por row group do parquet
+
+# OIDs do PostgreSQL -> tipos Arrow (demais tipos ficam string)
+_ARROW_TYPES = {
+    16: "bool", 20: "int64", 21: "int16", 23: "int32", 700: "float32", 701: "float64",
+    1700: "float64", 1082: "date32", 1114: "timestamp", 1184: "timestamptz",
+}
+
+
+# -----------------------------
+# AUXILIARY FUNCTIONS
+# -----------------------------
+
+def export_format(output):
+    """Formato pela extensão do arquivo de saída"""
+    name = os.fspath(output).lower()
+    for fmt in ("csv.gz", "parquet", "csv"):
+        if name.endswith("." + fmt):
+            return fmt
+    raise ValueError(f"Cannot infer export format from '{output}'. Use one of: {', '.join(EXPORT_FORMATS)}")
+
+
+def build_select(table_name=None, columns=None, where=None, query=None):
+    """
+    SELECT exportado: uma consulta pronta (`query`) ou colunas de uma tabela com filtro
+    opcional. Sem `columns`, tabelas registradas exportam todas menos a tsvector da busca.
+    """
+    if query:
+        return query.strip().rstrip(";")
+    if not table_name:
+        raise ValueError("Pass a table name or a query")
+    if not columns and table_name in TABLES:
+        columns = [col.name for col in TABLES[table_name]["columns"] if col.kind != "tsvector"]
+    column_list = ", ".join(f'"{c}"' for c in columns) if columns else "*"
+    sql = f'SELECT {column_list} FROM "{table_name}"'
+    return sql + f" WHERE {where}" if where else sql
+
+
+def _arrow_type(type_code):
+    name = _ARROW_TYPES.get(type_code)
+    if name == "timestamp":
+        return pa.timestamp("us")
+    if name == "timestamptz":
+        return pa.timestamp("us", tz="UTC")
+    return getattr(pa, name)() if name else pa.string()
+
+
+def _arrow_schema(cur, select_sql):
+    """Colunas e tipos do resultado sem ler linhas (LIMIT 0)"""
+    cur.execute(f"SELECT * FROM ({select_sql}) AS q LIMIT 0")
+    return pa.schema([(desc.name, _arrow_type(desc.type_code)) for desc in cur.description])
+
+
+class _CountingWriter:
+    """File-like que repassa os bytes do COPY e conta quantos passaram"""
+
+    def __init__(self, target):
+        self.target = target
+        self.bytes = 0
+
+    def write(self, data):
+        self.bytes += len(data)
+        return self.target.write(data)
+
+
+# -----------------------------
+# WRITERS
+# -----------------------------
+
+def _copy_to_file(cur, copy_sql, path, compress):
+    opener = (lambda p: gzip.open(p, "wb", compresslevel=6)) if compress else (lambda p: open(p, "wb"))
+    with opener(path) as fh:
+        writer = _CountingWriter(fh)
+        cur.copy_expert(copy_sql, writer)
+    return cur.rowcount, writer.bytes
+
+
+def _copy_to_parquet(cur, copy_sql, schema, path, compression, row_group_rows):
+    """
+    COPY -> pipe -> leitor CSV em streaming (pyarrow) -> ParquetWriter. O COPY roda em
+    uma thread escrevendo no pipe; a memória fica limitada a um bloco de leitura mais
+    um row group, independente do tamanho da tabela.
+    """
+    read_fd, write_fd = os.pipe()
+    reader_file = os.fdopen(read_fd, "rb")
+    state = {"bytes": 0, "error": None}
+
+    def produce():
+        try:
+            with os.fdopen(write_fd, "wb") as pipe:
+                writer = _CountingWriter(pipe)
+                cur.copy_expert(copy_sql, writer)
+                state["bytes"] = writer.bytes
+        except Exception as e:  # BrokenPipe se o leitor falhar; erro do banco é propagado abaixo
+            state["error"] = e
+
+    producer = threading.Thread(target=produce, name="copy-to-stdout", daemon=True)
+    producer.start()
+
+    rows = 0
+    try:
+        stream = pa_csv.open_csv(
+            reader_file,
+            read_options=pa_csv.ReadOptions(column_names=schema.names, block_size=READ_BLOCK_BYTES),
+            parse_options=pa_csv.ParseOptions(newlines_in_values=True),
+            convert_options=pa_csv.ConvertOptions(
+                column_types=schema, strings_can_be_null=True, quoted_strings_can_be_null=False,
+                true_values=["t"], false_values=["f"]),
+        )
+        pending, pending_rows = [], 0
+        with pq.ParquetWriter(path, schema, compression=compression) as writer:
+            for batch in stream:
+                pending.append(batch)
+                pending_rows += batch.num_rows
+                if pending_rows >= row_group_rows:
+                    writer.write_table(pa.Table.from_batches(pending, schema), row_group_size=row_group_rows)
+                    rows += pending_rows
+                    pending, pending_rows = [], 0
+            if pending:
+                writer.write_table(pa.Table.from_batches(pending, schema), row_group_size=row_group_rows)
+                rows += pending_rows
+    except Exception:
+        if state["error"] is not None:
+            raise state["error"]
+        raise
+    finally:
+        reader_file.close()
+        producer.join()
+
+    if state["error"] is not None:
+        raise state["error"]
+    return rows, state["bytes"]
+
+
+# -----------------------------
+# EXPORT
+# -----------------------------
+
+def export_table(output, table_name=None, columns=None, where=None, query=None, fmt=None,
+                 parquet_compression="zstd", row_group_rows=ROW_GROUP_ROWS, engine=None):
+    """
+    Exporta uma tabela (ou consulta) com COPY ... TO STDOUT direto para CSV, CSV gzip
+    ou Parquet, em streaming e sem DataFrame. A sessão é somente leitura, então
+    `where`/`query` não alteram dados. Retorna as estatísticas (linhas, MB, MB/s).
+    """
+    fmt = fmt or export_format(output)
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format '{fmt}'. Use one of: {', '.join(EXPORT_FORMATS)}")
+    select_sql = build_select(table_name, columns, where, query)
+    header = "false" if fmt == "parquet" else "true"
+    copy_sql = f"COPY ({select_sql}) TO STDOUT WITH (FORMAT csv, HEADER {header})"
+
+    conn = (engine or get_engine()).raw_connection()
+    start = time.perf_counter()
+    try:
+        conn.set_session(readonly=True)
+        with conn.cursor() as cur:
+            cur.execute("SET TIME ZONE 'UTC'")
+            if fmt == "parquet":
+                schema = _arrow_schema(cur, select_sql)
+                rows, copied = _copy_to_parquet(cur, copy_sql, schema, output, parquet_compression, row_group_rows)
+            else:
+                rows, copied = _copy_to_file(cur, copy_sql, output, compress=fmt == "csv.gz")
+        conn.rollback()
+    except Exception:
+        # não deixa arquivo parcial para trás
+        if os.path.exists(output):
+            os.remove(output)
+        raise
+    finally:
+        conn.close()
+
+    seconds = time.perf_counter() - start
+    stats = {
+        "rows": rows,
+        "format": fmt,
+        "copied_mb": round(copied / 1e6, 2),
+        "file_mb": round(os.path.getsize(output) / 1e6, 2),
+        "seconds": round(seconds, 3),
+        "mb_per_sec": round(copied / 1e6 / seconds, 1) if seconds else None,
+    }
+    logger.info(f"✅ Exported {rows} rows to '{output}' ({stats['copied_mb']} MB streamed, "
+                f"{stats['file_mb']} MB on disk) in {stats['seconds']}s - {stats['mb_per_sec']} MB/s")
+    return stats
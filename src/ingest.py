@@ -1,24 +1,87 @@
 # src/ingest.py
 
-import pandas as pd
 import logging
-from sqlalchemy.exc import SQLAlchemyError
+from src.batching import batched_to_sql, log_batch_sizes
+from src.config import get_dtype_backend
+from src.lazy import lazy_import
+from src.schema import TABLES, arrow_csv_types, coerce_frame, date_formats, index_ddl, recreate_table, sqlalchemy_dtypes
 
-def load_csv(csv_path):
-    df = pd.read_csv(csv_path)
+pd = lazy_import("pandas")
+pa = lazy_import("pyarrow")
+pa_csv = lazy_import("pyarrow.csv")
+pc = lazy_import("pyarrow.compute")
+sa = lazy_import("sqlalchemy")
+
+
+def _read_csv_pyarrow(csv_path, encoding, sep, usecols, dtype_backend, table_name="netflix_raw"):
+    """
+    Leitura multithread (pyarrow.csv) com os tipos do registro (src/schema.py):
+    baixa cardinalidade como dictionary (Categorical), anos int16 e datas convertidas
+    após o parse (os valores vêm com espaços à esquerda).
+    """
+    read_options = pa_csv.ReadOptions(
+        use_threads=True,
+        # pyarrow já ignora o BOM UTF-8; outros encodings são transcodificados
+        encoding="utf8" if encoding in (None, "utf-8", "utf-8-sig") else encoding,
+    )
+    parse_options = pa_csv.ParseOptions(delimiter=sep, newlines_in_values=True)
+    convert_options = pa_csv.ConvertOptions(
+        column_types=arrow_csv_types(table_name),
+        include_columns=list(usecols) if usecols else None,
+        strings_can_be_null=True,
+    )
+    table = pa_csv.read_csv(csv_path, read_options=read_options,
+                            parse_options=parse_options, convert_options=convert_options)
+
+    for col, fmt in date_formats(table_name).items():
+        if col in table.column_names:
+            parsed = pc.strptime(pc.utf8_trim_whitespace(table[col]), format=fmt, unit='s', error_is_null=True)
+            table = table.set_column(table.column_names.index(col), col, parsed)
+
+    if dtype_backend == "pyarrow":
+        # dictionary continua Categorical (com categorias Arrow) para manter o .str/.cat
+        return table.to_pandas(types_mapper=lambda t: None if pa.types.is_dictionary(t) else pd.ArrowDtype(t))
+    return table.to_pandas()
+
+
+def load_csv(csv_path, dtype_backend=None, encoding=None, sep=",", engine=None, usecols=None):
+    """
+    Lê o CSV bruto.
+    - encoding/sep: normalmente vêm de preflight_csv(...)["read_options"]
+    - engine='pyarrow': leitor multithread com os tipos de netflix_raw no registro (src/schema.py)
+    - usecols: projeção para quem só precisa de algumas colunas
+    """
+    dtype_backend = dtype_backend or get_dtype_backend()
+    if engine == "pyarrow":
+        df = _read_csv_pyarrow(csv_path, encoding, sep, usecols, dtype_backend)
+    else:
+        read_kwargs = {"dtype_backend": dtype_backend} if dtype_backend else {}
+        df = pd.read_csv(csv_path, encoding=encoding, sep=sep, usecols=usecols, **read_kwargs)
     logging.info(f"CSV loaded: {df.shape[0]} rows, {df.shape[1]} columns")
     return df
 
-def validate_columns(df, expected_columns):
-    missing = [col for col in expected_columns if col not in df.columns]
+def validate_columns(df_or_columns, expected_columns):
+    # aceita DataFrame ou lista de colunas (ex: cabeçalho lido pelo preflight)
+    columns = df_or_columns.columns if hasattr(df_or_columns, "columns") else list(df_or_columns)
+    missing = [col for col in expected_columns if col not in columns]
     if missing:
         raise ValueError(f"Missing columns: {missing}")
     logging.info("All expected columns are present.")
 
 def ingest_to_postgres(df, engine, table_name):
     try:
-        df.to_sql(table_name, engine, if_exists='replace', index=False)
+        if table_name in TABLES:
+            # tabela com tipos do registro (DATE, SMALLINT, VARCHAR(n)) em vez dos inferidos
+            with engine.begin() as conn:
+                recreate_table(conn, table_name)
+            batched_to_sql(coerce_frame(df, table_name), table_name, engine, dtype=sqlalchemy_dtypes(table_name))
+            with engine.begin() as conn:  # índices depois da carga (mais rápido que mantê-los a cada lote)
+                for ddl in index_ddl(table_name):
+                    conn.execute(sa.text(ddl))
+            log_batch_sizes()
+        else:
+            df.to_sql(table_name, engine, if_exists='replace', index=False)
         logging.info(f"Data ingested into table '{table_name}'")
-    except SQLAlchemyError as e:
+    except sa.exc.SQLAlchemyError as e:
         logging.error(f"Error ingesting data: {e}")
         raise
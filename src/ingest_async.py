@@ -0,0 +1,178 @@
+# src/ingest_async.py
+
+import asyncio
+import logging
+import os
+import time
+
+from src.db import postgres_dsn
+from src.dedupe import StreamingDeduper
+from src.ingest import validate_columns
+from src.lazy import lazy_import
+from src.schema import TABLES, coerce_frame, create_table_ddl, partition_ddl
+
+pd = lazy_import("pandas")
+asyncpg = lazy_import("asyncpg")
+
+logger = logging.getLogger(__name__)
+
+
+# -----------------------------
+# AUXILIARY FUNCTIONS
+# -----------------------------
+
+def _iter_chunks(csv_paths, chunk_rows, read_options=None):
+    """Lê os arquivos em sequência e gera (arquivo, chunk) na ordem de leitura"""
+    read_options = read_options or {}
+    for csv_path in csv_paths:
+        for chunk in pd.read_csv(csv_path, chunksize=chunk_rows, **read_options.get(csv_path, {})):
+            # dtypes nullable: inteiros com NaN continuam inteiros no COPY
+            yield csv_path, chunk.convert_dtypes()
+
+
+def _to_records(df, table_name=None):
+    """Converte o chunk em tuplas de tipos nativos (NaN -> None) para o COPY do asyncpg"""
+    if table_name in TABLES:
+        df = coerce_frame(df, table_name)
+    df = df.astype(object).where(df.notna(), None)
+    return [tuple(row) for row in df.to_dict("split", index=False)["data"]]
+
+
+async def _prepare_table(pool, df, table_name, if_exists):
+    """
+    Cria (ou recria) a tabela de destino: tipos do registro (src/schema.py) quando a
+    tabela está registrada, senão o schema inferido do primeiro chunk
+    """
+    if table_name in TABLES:
+        statements = [create_table_ddl(table_name, if_not_exists=True),
+                      *partition_ddl(table_name, if_not_exists=True)]
+    else:
+        statements = [pd.io.sql.get_schema(df, table_name).replace("CREATE TABLE", "CREATE TABLE IF NOT EXISTS", 1)]
+    async with pool.acquire() as conn:
+        async with conn.transaction():
+            if if_exists == "replace":
+                await conn.execute(f'DROP TABLE IF EXISTS "{table_name}" CASCADE')
+            for ddl in statements:
+                await conn.execute(ddl)
+
+
+async def _copy_chunk(pool, table_name, columns, records, seq, turns, state):
+    """
+    Copia um chunk em transação própria e só faz commit na vez dele:
+    os COPY rodam em paralelo, mas os commits seguem a ordem de leitura.
+    """
+    try:
+        async with pool.acquire() as conn:
+            tr = conn.transaction()
+            await tr.start()
+            try:
+                await conn.copy_records_to_table(table_name, records=records, columns=columns)
+                await turns[seq].wait()
+                if state["error"] is not None:
+                    raise RuntimeError(f"chunk {seq} aborted: a previous chunk failed")
+                await tr.commit()
+            except BaseException:
+                await tr.rollback()
+                raise
+        state["rows"] += len(records)
+    except BaseException as e:
+        if state["error"] is None:
+            state["error"] = e
+        raise
+    finally:
+        turns[seq + 1].set()
+
+
+# -----------------------------
+# ASYNC INGEST
+# -----------------------------
+
+async def ingest_files_async(csv_paths, table_name, dsn=None, concurrency=4, chunk_rows=50000,
+                             if_exists="replace", expected_columns=None, dedupe_on=None,
+                             read_options=None):
+    """
+    Ingestão assíncrona de um ou mais CSVs via COPY (asyncpg).
+    - concurrency: número máximo de chunks em COPY ao mesmo tempo (e de conexões no pool)
+    - chunk_rows: linhas por chunk; cada chunk é uma transação
+    - commits são feitos na ordem dos arquivos/chunks; uma falha aborta os chunks seguintes
+    - dedupe_on: coluna(s) chave; linhas repetidas em qualquer ponto do stream são descartadas
+    - read_options: {csv_path: kwargs do read_csv}, ex: preflight_csv(...)["read_options"]
+    Retorna dict com rows, chunks, duplicates, seconds e rows_per_sec.
+    """
+    if isinstance(csv_paths, str):
+        csv_paths = [csv_paths]
+
+    start = time.perf_counter()
+    pool = await asyncpg.create_pool(dsn or postgres_dsn(), min_size=1, max_size=concurrency)
+    slots = asyncio.Semaphore(concurrency)
+    turns = {0: asyncio.Event()}
+    turns[0].set()
+    state = {"rows": 0, "error": None}
+    deduper = StreamingDeduper() if dedupe_on else None
+    duplicates = 0
+    tasks = []
+
+    try:
+        try:
+            chunks = _iter_chunks(csv_paths, chunk_rows, read_options)
+            columns = None
+            seq = 0
+            while state["error"] is None:
+                # O slot é reservado antes da leitura: limita COPYs simultâneos e chunks em memória
+                await slots.acquire()
+                item = await asyncio.to_thread(next, chunks, None)
+                if item is None:
+                    slots.release()
+                    break
+                csv_path, chunk = item
+                chunk["source_file"] = os.path.abspath(csv_path)
+
+                if columns is None:
+                    if expected_columns:
+                        validate_columns(chunk, expected_columns)
+                    columns = list(chunk.columns)
+                    await _prepare_table(pool, chunk, table_name, if_exists)
+                elif list(chunk.columns) != columns:
+                    raise ValueError(f"Columns of '{csv_path}' do not match the first file: {list(chunk.columns)}")
+
+                if deduper is not None:
+                    # a leitura é sequencial, então o dedupe vê o stream na ordem dos commits
+                    size = len(chunk)
+                    chunk = deduper.drop(chunk, dedupe_on)
+                    duplicates += size - len(chunk)
+
+                records = await asyncio.to_thread(_to_records, chunk, table_name)
+                turns[seq + 1] = asyncio.Event()
+                task = asyncio.create_task(_copy_chunk(pool, table_name, columns, records, seq, turns, state))
+                task.add_done_callback(lambda _t: slots.release())
+                tasks.append(task)
+                logger.info(f"Chunk {seq} from '{csv_path}' scheduled ({len(records)} rows)")
+                seq += 1
+        except BaseException as e:
+            # Chunks já agendados fazem rollback em vez de commit
+            if state["error"] is None:
+                state["error"] = e
+            raise
+        finally:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        if state["error"] is not None:
+            raise state["error"]
+    finally:
+        await pool.close()
+
+    seconds = time.perf_counter() - start
+    stats = {
+        "rows": state["rows"],
+        "chunks": len(tasks),
+        "duplicates": duplicates,
+        "seconds": round(seconds, 3),
+        "rows_per_sec": round(state["rows"] / seconds, 1) if seconds else None,
+    }
+    logger.info(f"Async ingest into '{table_name}' finished: {stats}")
+    return stats
+
+
+def ingest_to_postgres_async(csv_paths, table_name, **kwargs):
+    """Wrapper síncrono de ingest_files_async para uso em scripts"""
+    return asyncio.run(ingest_files_async(csv_paths, table_name, **kwargs))
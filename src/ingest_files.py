@@ -0,0 +1,211 @@
+# src/ingest_files.py
+
+import glob
+import hashlib
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from src.batching import batched_to_sql, log_batch_sizes
+from src.db import get_engine
+from src.ingest import load_csv
+from src.lazy import lazy_import
+from src.preflight import preflight_csv
+from src.schema import (add_default_columns_ddl, coerce_frame, create_table_ddl, csv_column_names, index_ddl,
+                        partition_ddl, sqlalchemy_dtypes)
+
+sa = lazy_import("sqlalchemy")
+
+logger = logging.getLogger(__name__)
+
+STATE_TABLE = "ingest_files"
+SOURCE_COLUMN = "source_file"
+INGEST_WORKERS = 4
+HASH_BLOCK_BYTES = 1 << 20
+
+PENDING, LOADED, FAILED = "pending", "loaded", "failed"
+
+
+# -----------------------------
+# DISCOVERY
+# -----------------------------
+
+def discover_files(sources, pattern="*.csv"):
+    """
+    Expande diretórios (arquivos `pattern`), globs e caminhos em uma lista sem
+    repetição de arquivos, ordenada do maior para o menor (os grandes começam antes
+    e os pequenos preenchem o fim da fila).
+    """
+    if isinstance(sources, str):
+        sources = [sources]
+    found = []
+    for source in sources:
+        if os.path.isdir(source):
+            found.extend(glob.glob(os.path.join(source, pattern)))
+        elif glob.has_magic(source):
+            found.extend(glob.glob(source))
+        else:
+            found.append(source)
+    paths = {os.path.abspath(path) for path in found if os.path.isfile(path)}
+    return sorted(paths, key=lambda path: (-os.path.getsize(path), path))
+
+
+def file_hash(path):
+    """SHA-256 do conteúdo, lido em blocos"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(HASH_BLOCK_BYTES), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+# -----------------------------
+# STATE TABLE
+# -----------------------------
+
+def ensure_tables_ddl(table_name, *state_tables):
+    """DDL que cria a tabela de destino (e as de estado) se faltarem, sem apagar cargas anteriores"""
+    statements = [create_table_ddl(t, if_not_exists=True) for t in state_tables]
+    return statements + [
+        create_table_ddl(table_name, if_not_exists=True),
+        *partition_ddl(table_name, if_not_exists=True),
+        # tabelas criadas antes das colunas de linhagem
+        f'ALTER TABLE "{table_name}" ADD COLUMN IF NOT EXISTS "{SOURCE_COLUMN}" TEXT',
+        *add_default_columns_ddl(table_name),
+        *index_ddl(table_name),
+    ]
+
+
+def _set_state(conn, path, content_hash, size, status, rows=None, error=None):
+    conn.execute(sa.text(f"""
+        INSERT INTO {STATE_TABLE} (source_file, content_hash, size_bytes, status, rows, error, updated_at)
+        VALUES (:path, :hash, :size, :status, :rows, :error, now())
+        ON CONFLICT (source_file) DO UPDATE SET content_hash = EXCLUDED.content_hash,
+            size_bytes = EXCLUDED.size_bytes, status = EXCLUDED.status, rows = EXCLUDED.rows,
+            error = EXCLUDED.error, updated_at = now()
+    """), {"path": path, "hash": content_hash, "size": size, "status": status, "rows": rows, "error": error})
+
+
+def load_file_states(engine=None):
+    """{source_file: (content_hash, status)} da tabela de estado"""
+    engine = engine or get_engine()
+    if not sa.inspect(engine).has_table(STATE_TABLE):
+        return {}
+    with engine.connect() as conn:
+        rows = conn.execute(sa.text(f"SELECT source_file, content_hash, status FROM {STATE_TABLE}"))
+        return {row.source_file: (row.content_hash, row.status) for row in rows}
+
+
+def record_replace(path, rows, table_name="netflix_raw", engine=None):
+    """
+    Após uma carga com replace (ingest_to_postgres), a tabela só tem as linhas de `path`:
+    o estado anterior (e os checkpoints da ingestão retomável) é descartado e só esse
+    arquivo fica como 'loaded'.
+    """
+    engine = engine or get_engine()
+    with engine.begin() as conn:
+        conn.execute(sa.text(create_table_ddl(STATE_TABLE, if_not_exists=True)))
+        conn.execute(sa.text(f"DELETE FROM {STATE_TABLE}"))
+        if sa.inspect(conn).has_table("ingest_checkpoints"):
+            conn.execute(sa.text("DELETE FROM ingest_checkpoints WHERE table_name = :table"), {"table": table_name})
+        _set_state(conn, path, file_hash(path), os.path.getsize(path), LOADED, rows=rows)
+
+
+# -----------------------------
+# WORKER
+# -----------------------------
+
+def _ingest_file(path, content_hash, size, table_name, engine, csv_engine):
+    """
+    Carrega um arquivo em `table_name` em uma transação: apaga as linhas de uma carga
+    anterior do mesmo arquivo, grava as novas com source_file e marca 'loaded'.
+    Em caso de erro a transação volta e o arquivo fica 'failed' com a mensagem (se o
+    próprio banco estiver fora, o estado fica 'pending' e o erro só vai para o log).
+    """
+    start = time.perf_counter()
+    try:
+        preflight = preflight_csv(path, csv_column_names(table_name))
+        df = load_csv(path, engine=csv_engine, **preflight["read_options"])
+        df[SOURCE_COLUMN] = path
+        df = coerce_frame(df, table_name)
+        with engine.begin() as conn:
+            conn.execute(sa.text(f'DELETE FROM "{table_name}" WHERE "{SOURCE_COLUMN}" = :path'), {"path": path})
+            batched_to_sql(df, table_name, conn, dtype=sqlalchemy_dtypes(table_name))
+            _set_state(conn, path, content_hash, size, LOADED, rows=len(df))
+    except Exception as e:
+        logger.error(f"❌ '{os.path.basename(path)}' failed: {e}")
+        try:
+            with engine.begin() as conn:
+                _set_state(conn, path, content_hash, size, FAILED, error=str(e)[:1000])
+        except Exception as state_error:  # conexão caída / banco fora: o arquivo ainda conta como falha
+            logger.error(f"❌ Could not mark '{os.path.basename(path)}' as failed: {state_error}")
+        return FAILED, 0, time.perf_counter() - start
+    seconds = time.perf_counter() - start
+    logger.info(f"✅ '{os.path.basename(path)}' loaded: {len(df)} rows in {seconds:.2f}s")
+    return LOADED, len(df), seconds
+
+
+# -----------------------------
+# MULTI-FILE INGEST
+# -----------------------------
+
+def ingest_catalog_files(sources, table_name="netflix_raw", workers=INGEST_WORKERS, csv_engine=None,
+                         force=False, pattern="*.csv", engine=None):
+    """
+    Ingestão de vários CSVs (diretório, glob ou lista) em `table_name`, com fila de
+    trabalho em um pool limitado de `workers` threads, maiores arquivos primeiro.
+    O estado de cada arquivo (pending/loaded/failed + hash do conteúdo) fica em
+    ingest_files: arquivos já carregados com o mesmo conteúdo são pulados (force=True
+    recarrega). Cada linha recebe o caminho de origem em source_file.
+    Retorna dict com loaded, skipped, failed, rows e seconds.
+    """
+    start = time.perf_counter()
+    engine = engine or get_engine()
+    paths = discover_files(sources, pattern)
+    if not paths:
+        raise FileNotFoundError(f"No CSV files found in {sources}")
+    with engine.begin() as conn:
+        for ddl in ensure_tables_ddl(table_name, STATE_TABLE):
+            conn.execute(sa.text(ddl))
+
+    states = load_file_states(engine)
+    loaded_hashes = {h for h, status in states.values() if status == LOADED}
+    queue, skipped = [], []
+    with engine.begin() as conn:
+        for path in paths:
+            size, content_hash = os.path.getsize(path), file_hash(path)
+            if content_hash in loaded_hashes and not force:
+                skipped.append(path)
+                continue
+            _set_state(conn, path, content_hash, size, PENDING)
+            loaded_hashes.add(content_hash)  # mesmo conteúdo em outro caminho não entra duas vezes
+            queue.append((path, content_hash, size))
+    logger.info(f"{len(paths)} files found: {len(queue)} queued, {len(skipped)} already loaded")
+
+    results = {LOADED: 0, FAILED: 0}
+    rows = 0
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(queue) or 1)),
+                            thread_name_prefix="ingest") as pool:
+        futures = {pool.submit(_ingest_file, path, content_hash, size, table_name, engine, csv_engine): path
+                   for path, content_hash, size in queue}
+        for future in as_completed(futures):
+            try:
+                status, file_rows, _ = future.result()
+            except Exception as e:  # um arquivo não interrompe os outros nem o resumo
+                logger.error(f"❌ '{os.path.basename(futures[future])}' failed: {e}")
+                status, file_rows = FAILED, 0
+            results[status] += 1
+            rows += file_rows
+
+    stats = {
+        "files": len(paths),
+        "loaded": results[LOADED],
+        "skipped": len(skipped),
+        "failed": results[FAILED],
+        "rows": rows,
+        "seconds": round(time.perf_counter() - start, 3),
+    }
+    logger.info(f"Multi-file ingest into '{table_name}' finished: {stats}")
+    log_batch_sizes()
+    return stats
@@ -0,0 +1,333 @@
+# src/ingest_resume.py
+
+import io
+import logging
+import os
+import time
+
+from src.db import get_engine
+from src.ingest_files import SOURCE_COLUMN, ensure_tables_ddl, file_hash
+from src.lazy import lazy_import
+from src.preflight import preflight_csv
+from src.schema import TABLES, coerce_frame, csv_column_names, get_columns
+
+pd = lazy_import("pandas")
+pa = lazy_import("pyarrow")
+pa_csv = lazy_import("pyarrow.csv")
+pc = lazy_import("pyarrow.compute")
+psycopg2 = lazy_import("psycopg2")
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_TABLE = "ingest_checkpoints"
+QUARANTINE_TABLE = "ingest_quarantine"
+CHUNK_BYTES = 8 << 20           # bytes do arquivo por chunk (cada chunk = uma transação)
+
+RUNNING, DONE = "running", "done"
+_INT_RANGES = {"smallint": 2 ** 15 - 1, "integer": 2 ** 31 - 1, "bigint": 2 ** 63 - 1}
+
+
+# -----------------------------
+# FILE CHUNKS
+# -----------------------------
+
+def _record_end(block):
+    """
+    Posição logo após o último fim de linha de `block` que fecha um registro: um \\n
+    com número par de aspas antes dele (\\n dentro de campo entre aspas não conta).
+    0 se o bloco não tem registro completo.
+    """
+    pos = len(block)
+    while True:
+        newline = block.rfind(b"\n", 0, pos)
+        if newline < 0:
+            return 0
+        if block.count(b'"', 0, newline) % 2 == 0:
+            return newline + 1
+        pos = newline
+
+
+def iter_file_chunks(path, start_offset, chunk_bytes=CHUNK_BYTES):
+    """
+    Gera (offset, bytes) a partir de `start_offset`, sempre cortando em fim de registro:
+    o offset de cada chunk é um ponto seguro para retomar a leitura com seek().
+    """
+    with open(path, "rb") as fh:
+        fh.seek(start_offset)
+        offset, carry = start_offset, b""
+        while True:
+            data = fh.read(chunk_bytes)
+            block = carry + data
+            if not block:
+                return
+            cut = len(block) if not data else _record_end(block)
+            if cut:
+                yield offset, block[:cut]
+                offset += cut
+            carry = block[cut:]
+            if not data:
+                return
+
+
+def _record_lines(data, first_line):
+    """
+    Linha do arquivo em que começa cada registro de `data`, na numeração de registros
+    do pyarrow ({2: linha, 3: linha, ...}; o cabeçalho do buffer é o registro 1 e está
+    na linha `first_line`). \n entre aspas não fecha registro e linhas vazias não contam.
+    """
+    lines, number, quotes, start_line = {}, 2, 0, None
+    for offset, text in enumerate(data.split(b"\n")):
+        if start_line is None and not text.strip(b"\r"):
+            continue
+        if start_line is None:
+            start_line = first_line + 1 + offset
+        quotes += text.count(b'"')
+        if quotes % 2 == 0:
+            lines[number] = start_line
+            number, quotes, start_line = number + 1, 0, None
+    if start_line is not None:  # aspas sem fechamento até o fim do chunk
+        lines[number] = start_line
+    return lines
+
+
+def check_ascii_compatible(encoding, path):
+    """
+    Os chunks são cortados em b"\n" e as aspas contadas nos bytes: só vale para encodings
+    em que os caracteres ASCII ocupam os mesmos bytes (UTF-8, Latin-1...), não UTF-16/32
+    """
+    ascii_bytes = bytes(range(128))
+    try:
+        compatible = ascii_bytes.decode(encoding or "utf-8") == ascii_bytes.decode("ascii")
+    except (UnicodeDecodeError, LookupError):
+        compatible = False
+    if not compatible:
+        raise ValueError(f"'{os.path.basename(path)}' is encoded as {encoding}, which the resumable ingest cannot "
+                         f"split at byte offsets; convert it to UTF-8 or use the multi-file ingest")
+
+
+def _read_header(path):
+    with open(path, "rb") as fh:
+        header = fh.readline()
+    return header, len(header)
+
+
+# -----------------------------
+# PARSE & VALIDATION
+# -----------------------------
+
+def _parse_chunk(header, data, read_options, columns):
+    """
+    Lê o chunk (com o cabeçalho) com todas as colunas como texto. Linhas com número de
+    campos errado vão para `bad` como (linha no chunk, texto, motivo) em vez de abortar.
+    """
+    bad = []
+
+    def on_invalid(row):
+        bad.append((row.number, row.text, f"expected {row.expected_columns} fields, got {row.actual_columns}"))
+        return "skip"
+
+    encoding = read_options.get("encoding")
+    table = pa_csv.read_csv(
+        io.BytesIO(header + data),
+        read_options=pa_csv.ReadOptions(use_threads=False,
+                                        encoding="utf8" if encoding in (None, "utf-8", "utf-8-sig") else encoding),
+        parse_options=pa_csv.ParseOptions(delimiter=read_options.get("sep", ","), newlines_in_values=True,
+                                          invalid_row_handler=on_invalid),
+        convert_options=pa_csv.ConvertOptions(column_types={c: pa.string() for c in columns},
+                                              include_columns=columns, strings_can_be_null=True),
+    )
+    return table.to_pandas(), bad
+
+
+def validate_rows(df, table_name):
+    """
+    Motivo de rejeição por linha (None = linha válida), pelas regras do registro:
+    NOT NULL, tamanho de VARCHAR e inteiros que não convertem ou estouram o tipo.
+    Inteiros válidos já ficam convertidos em `df`.
+    """
+    reasons = pd.Series(None, index=df.index, dtype=object)
+    for col in get_columns(table_name):
+        if col.name not in df.columns or col.generated:
+            continue
+        values = df[col.name]
+        if not col.nullable:
+            reasons = reasons.mask(reasons.isna() & values.isna(), f"{col.name} is null")
+        if col.kind == "varchar":
+            too_long = values.str.len() > col.length
+            reasons = reasons.mask(reasons.isna() & too_long.fillna(False), f"{col.name} longer than {col.length}")
+        elif col.kind in _INT_RANGES:
+            parsed = pd.to_numeric(values.str.strip(), errors="coerce")
+            invalid = values.notna() & (parsed.isna() | (parsed % 1 != 0) | (parsed.abs() > _INT_RANGES[col.kind]))
+            reasons = reasons.mask(reasons.isna() & invalid, f"invalid {col.kind} in {col.name}")
+            df[col.name] = parsed.where(~invalid)
+    return reasons
+
+
+# -----------------------------
+# COPY WITH BISECTION
+# -----------------------------
+
+def _to_csv_bytes(df, table_name):
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    for col in get_columns(table_name):
+        if col.kind == "date" and col.name in table.column_names:
+            i = table.column_names.index(col.name)
+            table = table.set_column(i, col.name, pc.cast(table[col.name], pa.date32()))
+    buffer = pa.BufferOutputStream()
+    pa_csv.write_csv(table, buffer, write_options=pa_csv.WriteOptions(include_header=False))
+    return buffer.getvalue()
+
+
+def _copy_rows(cur, df, table_name, rejected):
+    """
+    COPY de `df` dentro de um SAVEPOINT. Se o banco rejeitar (DataError/IntegrityError),
+    o lote é dividido ao meio até isolar as linhas ruins, que vão para `rejected`.
+    """
+    if df.empty:
+        return 0
+    column_list = ", ".join(f'"{c}"' for c in df.columns)
+    cur.execute("SAVEPOINT copy_rows")
+    try:
+        cur.copy_expert(f'COPY "{table_name}" ({column_list}) FROM STDIN WITH (FORMAT csv)',
+                        io.BytesIO(_to_csv_bytes(df, table_name).to_pybytes()))
+        cur.execute("RELEASE SAVEPOINT copy_rows")
+        return len(df)
+    except (psycopg2.DataError, psycopg2.IntegrityError) as e:
+        cur.execute("ROLLBACK TO SAVEPOINT copy_rows")
+        if len(df) == 1:
+            rejected.append((df.index[0], str(e).strip().splitlines()[0]))
+            return 0
+        middle = len(df) // 2
+        return (_copy_rows(cur, df.iloc[:middle], table_name, rejected)
+                + _copy_rows(cur, df.iloc[middle:], table_name, rejected))
+
+
+# -----------------------------
+# CHECKPOINTS
+# -----------------------------
+
+def load_checkpoint(cur, path, table_name):
+    cur.execute(f"SELECT fingerprint, byte_offset, line_number, rows_loaded, rows_quarantined, status "
+                f"FROM {CHECKPOINT_TABLE} WHERE source_file = %s AND table_name = %s", (path, table_name))
+    row = cur.fetchone()
+    keys = ("fingerprint", "byte_offset", "line_number", "rows_loaded", "rows_quarantined", "status")
+    return dict(zip(keys, row)) if row else None
+
+
+def _save_checkpoint(cur, path, table_name, state):
+    cur.execute(f"""
+        INSERT INTO {CHECKPOINT_TABLE} (source_file, table_name, fingerprint, byte_offset, line_number,
+                                        rows_loaded, rows_quarantined, status, updated_at)
+        VALUES (%(path)s, %(table)s, %(fingerprint)s, %(byte_offset)s, %(line_number)s,
+                %(rows_loaded)s, %(rows_quarantined)s, %(status)s, now())
+        ON CONFLICT (source_file, table_name) DO UPDATE SET fingerprint = EXCLUDED.fingerprint,
+            byte_offset = EXCLUDED.byte_offset, line_number = EXCLUDED.line_number,
+            rows_loaded = EXCLUDED.rows_loaded, rows_quarantined = EXCLUDED.rows_quarantined,
+            status = EXCLUDED.status, updated_at = now()
+    """, {"path": path, "table": table_name, **state})
+
+
+def _raw_row(df, index):
+    """Linha original (texto lido do CSV) para a quarentena"""
+    return df.loc[[index]].to_csv(header=False, index=False).rstrip("\r\n")
+
+
+def _quarantine(cur, path, table_name, offset, rows):
+    if rows:
+        cur.executemany(f"INSERT INTO {QUARANTINE_TABLE} (source_file, table_name, byte_offset, line_number, "
+                        f"raw_row, reason, created_at) VALUES (%s, %s, %s, %s, %s, %s, now())",
+                        [(path, table_name, offset, line, raw, reason) for line, raw, reason in rows])
+
+
+# -----------------------------
+# RESUMABLE INGEST
+# -----------------------------
+
+def ingest_resumable(csv_path, table_name="netflix_raw", chunk_bytes=CHUNK_BYTES, restart=False, engine=None):
+    """
+    Ingestão em chunks de bytes com commit por chunk. Cada commit grava, na mesma
+    transação, as linhas do chunk, as linhas rejeitadas (ingest_quarantine) e o
+    checkpoint (byte_offset, line_number) em ingest_checkpoints. Uma nova execução
+    do mesmo arquivo faz seek() direto para o último offset gravado; um arquivo
+    alterado (outra impressão digital) ou restart=True recomeça do zero, apagando
+    só as linhas daquele arquivo (source_file). Retorna as estatísticas da carga.
+    """
+    if table_name not in TABLES:
+        raise KeyError(f"Table '{table_name}' is not in the schema registry")
+    path = os.path.abspath(csv_path)
+    read_options = preflight_csv(path, csv_column_names(table_name))["read_options"]
+    check_ascii_compatible(read_options.get("encoding"), path)  # antes de qualquer checkpoint
+    header, header_end = _read_header(path)
+    columns = csv_column_names(table_name)
+    # SHA-256 do conteúdo inteiro (como ingest_files): um arquivo trocado por outro de
+    # mesmo tamanho e mesmo início não passa por DONE nem retoma de um offset antigo
+    file_fingerprint = file_hash(path)
+
+    conn = (engine or get_engine()).raw_connection()
+    start = time.perf_counter()
+    try:
+        with conn.cursor() as cur:
+            for ddl in ensure_tables_ddl(table_name, CHECKPOINT_TABLE, QUARANTINE_TABLE):
+                cur.execute(ddl)
+            state = load_checkpoint(cur, path, table_name)
+            if state and state["status"] == DONE and state["fingerprint"] == file_fingerprint and not restart:
+                conn.commit()
+                logger.info(f"'{os.path.basename(path)}' already loaded into '{table_name}', nothing to do")
+                return {**state, "chunks": 0, "resumed": False, "seconds": 0.0}
+            resumed = bool(state and state["fingerprint"] == file_fingerprint and not restart)
+            if not resumed:
+                cur.execute(f'DELETE FROM "{table_name}" WHERE "{SOURCE_COLUMN}" = %s', (path,))
+                cur.execute(f"DELETE FROM {QUARANTINE_TABLE} WHERE source_file = %s AND table_name = %s",
+                            (path, table_name))
+                state = {"fingerprint": file_fingerprint, "byte_offset": header_end, "line_number": 1,
+                         "rows_loaded": 0, "rows_quarantined": 0, "status": RUNNING}
+                _save_checkpoint(cur, path, table_name, state)
+            conn.commit()
+            if resumed:
+                logger.info(f"Resuming '{os.path.basename(path)}' at byte {state['byte_offset']} "
+                            f"(line {state['line_number']}, {state['rows_loaded']} rows already loaded)")
+
+            chunks = 0
+            for offset, data in iter_file_chunks(path, state["byte_offset"], chunk_bytes):
+                df, bad = _parse_chunk(header, data, read_options, columns)
+                # linha física no arquivo de cada registro: os rejeitados pelo pyarrow vêm com o
+                # número do registro; as linhas do DataFrame são os demais registros, em ordem
+                record_lines = _record_lines(data, state["line_number"])
+                skipped = {number for number, _, _ in bad}
+                row_lines = [line for number, line in record_lines.items() if number not in skipped]
+                quarantined = [(record_lines.get(number), text, reason) for number, text, reason in bad]
+
+                raw = df.copy()
+                reasons = validate_rows(df, table_name)
+                invalid = reasons.notna()
+                quarantined += [(row_lines[i], _raw_row(raw, i), reasons[i]) for i in df.index[invalid]]
+                good = coerce_frame(df[~invalid].copy(), table_name)
+                good[SOURCE_COLUMN] = path
+
+                rejected = []
+                loaded = _copy_rows(cur, good, table_name, rejected)
+                quarantined += [(row_lines[i], _raw_row(raw, i), reason) for i, reason in rejected]
+                _quarantine(cur, path, table_name, offset, quarantined)
+
+                state.update(byte_offset=offset + len(data),
+                             line_number=state["line_number"] + data.count(b"\n"),
+                             rows_loaded=state["rows_loaded"] + loaded,
+                             rows_quarantined=state["rows_quarantined"] + len(quarantined))
+                _save_checkpoint(cur, path, table_name, state)
+                conn.commit()
+                chunks += 1
+                logger.info(f"Chunk at byte {offset} committed: {loaded} rows, {len(quarantined)} quarantined")
+
+            state["status"] = DONE
+            _save_checkpoint(cur, path, table_name, state)
+            conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+    stats = {**state, "chunks": chunks, "resumed": resumed, "seconds": round(time.perf_counter() - start, 3)}
+    logger.info(f"✅ '{os.path.basename(path)}' loaded into '{table_name}': {state['rows_loaded']} rows, "
+                f"{state['rows_quarantined']} quarantined, {chunks} chunks in {stats['seconds']}s")
+    return stats
@@ -0,0 +1,27 @@
+# src/lazy.py
+
+import importlib
+import sys
+import types
+
+
+class _LazyModule(types.ModuleType):
+    """Módulo substituto: importa o módulo real no primeiro acesso a um atributo"""
+
+    def __getattr__(self, attr):
+        module = importlib.import_module(self.__name__)
+        # Copia os atributos para que os próximos acessos não passem por aqui
+        self.__dict__.update(module.__dict__)
+        return getattr(module, attr)
+
+
+def lazy_import(name):
+    """
+    Retorna o módulo `name` sem executá-lo: o import real acontece no primeiro
+    acesso a um atributo. Mantém o import dos módulos do pipeline livre de custo
+    (pandas, sqlalchemy, matplotlib...) até que a função que precisa deles rode.
+    Aceita submódulos ("pyarrow.compute") sem importar o pacote pai antes da hora.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    return _LazyModule(name)
@@ -0,0 +1,242 @@
+# src/pipeline.py
+
+import logging
+import queue
+import threading
+import time
+from collections import deque, namedtuple
+
+logger = logging.getLogger(__name__)
+
+PIPELINE_QUEUE_SIZE = 4   # itens em espera entre dois estágios (backpressure)
+_POLL_SECONDS = 0.1
+_DONE = object()
+
+# Processos filhos por forkserver (spawn onde não há): um fork feito com outras threads
+# rodando (fonte lendo do banco, logging) herda locks que podem estar presos e travar o filho
+PROCESS_START_METHOD = "forkserver"
+
+# kind: "thread" (I/O: leitura, banco) ou "process" (CPU: parse, clean_titles)
+# func precisa ser importável (nível de módulo) nos estágios "process"
+Stage = namedtuple("Stage", "name func kind workers", defaults=("thread", 1))
+
+
+class PipelineError(RuntimeError):
+    pass
+
+
+# -----------------------------
+# STAGE STATS
+# -----------------------------
+
+class _StageStats:
+    def __init__(self, name, workers):
+        self.name = name
+        self.workers = workers
+        self.items = 0
+        self.busy = 0.0
+        self.lock = threading.Lock()
+
+    def add(self, seconds):
+        with self.lock:
+            self.items += 1
+            self.busy += seconds
+
+    def as_dict(self, wall):
+        capacity = wall * self.workers
+        return {
+            "stage": self.name,
+            "workers": self.workers,
+            "items": self.items,
+            "busy_seconds": round(self.busy, 3),
+            "utilization": round(self.busy / capacity, 3) if capacity else None,
+        }
+
+
+def _timed(func, item):
+    """Executa func(item) e devolve (resultado, segundos); roda no processo filho nos estágios 'process'"""
+    start = time.perf_counter()
+    result = func(item)
+    return result, time.perf_counter() - start
+
+
+def process_pool(max_workers):
+    """ProcessPoolExecutor com PROCESS_START_METHOD; as funções enviadas precisam ser importáveis"""
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    method = PROCESS_START_METHOD if PROCESS_START_METHOD in multiprocessing.get_all_start_methods() else "spawn"
+    return ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context(method))
+
+
+# -----------------------------
+# EXECUTOR
+# -----------------------------
+
+class Pipeline:
+    """
+    Executor em estágios ligados por filas limitadas: cada estágio trabalha em paralelo
+    com os outros, e uma fila cheia segura o estágio anterior (backpressure). Com isso
+    a vazão fica limitada pelo estágio mais lento, e não pela soma dos estágios.
+    A ordem dos itens é preservada em estágios de 1 worker e nos estágios 'process'.
+    """
+
+    def __init__(self, stages, queue_size=PIPELINE_QUEUE_SIZE):
+        self.stages = list(stages)
+        self.queue_size = queue_size
+        self._failed = threading.Event()
+        self._error = None
+
+    # --- filas com parada em caso de erro ---
+    def _put(self, q, item):
+        while not self._failed.is_set():
+            try:
+                q.put(item, timeout=_POLL_SECONDS)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, q):
+        while not self._failed.is_set():
+            try:
+                return q.get(timeout=_POLL_SECONDS)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def _fail(self, stage_name, error):
+        if self._error is None:
+            self._error = PipelineError(f"Stage '{stage_name}' failed: {error}")
+            self._error.__cause__ = error
+        self._failed.set()
+
+    # --- estágios ---
+    def _run_source(self, source, out_q, stats):
+        try:
+            iterator = iter(source)
+            while True:
+                start = time.perf_counter()
+                item = next(iterator, _DONE)
+                if item is _DONE:
+                    break
+                stats.add(time.perf_counter() - start)
+                if not self._put(out_q, item):
+                    return
+        except Exception as e:
+            self._fail(stats.name, e)
+        finally:
+            self._put(out_q, _DONE)
+
+    def _run_thread_worker(self, stage, in_q, out_q, stats, finished):
+        try:
+            while True:
+                item = self._get(in_q)
+                if item is _DONE:
+                    in_q.put(_DONE)  # repassa o fim para os outros workers do estágio
+                    break
+                result, seconds = _timed(stage.func, item)
+                stats.add(seconds)
+                if out_q is not None and not self._put(out_q, result):
+                    break
+        except Exception as e:
+            self._fail(stage.name, e)
+        finally:
+            finished()
+
+    def _run_process_stage(self, stage, in_q, out_q, stats):
+        """Um thread alimenta o pool de processos, com no máximo `workers` itens em voo, em ordem"""
+        try:
+            with process_pool(stage.workers) as pool:
+                in_flight = deque()
+                done = False
+                while (not done or in_flight) and not self._failed.is_set():
+                    while not done and len(in_flight) < stage.workers:
+                        item = self._get(in_q)
+                        if item is _DONE:
+                            done = True
+                        else:
+                            in_flight.append(pool.submit(_timed, stage.func, item))
+                    if in_flight:
+                        result, seconds = in_flight.popleft().result()
+                        stats.add(seconds)
+                        if out_q is not None and not self._put(out_q, result):
+                            break
+                for future in in_flight:
+                    future.cancel()
+        except Exception as e:
+            self._fail(stage.name, e)
+        finally:
+            if out_q is not None:
+                self._put(out_q, _DONE)
+
+    def run(self, source, collect=True):
+        """
+        Processa os itens de `source` (iterável, consumido em um thread próprio) por
+        todos os estágios. Retorna (resultados do último estágio em lista, ou None com
+        collect=False; estatísticas por estágio com utilização = ocupado / (tempo * workers)).
+        """
+        start = time.perf_counter()
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in range(len(self.stages) + 1)]
+        stats = [_StageStats("source", 1)] + [_StageStats(s.name, s.workers) for s in self.stages]
+        threads = [threading.Thread(target=self._run_source, args=(source, queues[0], stats[0]),
+                                    name="pipeline-source", daemon=True)]
+
+        for i, stage in enumerate(self.stages):
+            in_q, out_q = queues[i], queues[i + 1]
+            if stage.kind == "process":
+                threads.append(threading.Thread(target=self._run_process_stage, args=(stage, in_q, out_q, stats[i + 1]),
+                                                name=f"pipeline-{stage.name}", daemon=True))
+            elif stage.kind == "thread":
+                remaining = [stage.workers]
+                lock = threading.Lock()
+
+                def finished(out_q=out_q, remaining=remaining, lock=lock):
+                    # o último worker do estágio sinaliza o fim para o próximo
+                    with lock:
+                        remaining[0] -= 1
+                        last = remaining[0] == 0
+                    if last:
+                        self._put(out_q, _DONE)
+
+                threads += [threading.Thread(target=self._run_thread_worker,
+                                             args=(stage, in_q, out_q, stats[i + 1], finished),
+                                             name=f"pipeline-{stage.name}-{w}", daemon=True)
+                            for w in range(stage.workers)]
+            else:
+                raise ValueError(f"Unknown stage kind '{stage.kind}' (use 'thread' or 'process')")
+
+        for thread in threads:
+            thread.start()
+
+        results = [] if collect else None
+        while True:
+            item = self._get(queues[-1])
+            if item is _DONE:
+                break
+            if collect:
+                results.append(item)
+        for thread in threads:
+            thread.join()
+        if self._error is not None:
+            raise self._error
+
+        wall = time.perf_counter() - start
+        report = {"seconds": round(wall, 3), "stages": [s.as_dict(wall) for s in stats]}
+        log_pipeline_report(report)
+        return results, report
+
+
+def log_pipeline_report(report):
+    """Uma linha por estágio; o estágio mais ocupado é o gargalo"""
+    bottleneck = max(report["stages"], key=lambda s: s["utilization"] or 0)
+    for s in report["stages"]:
+        marker = "  <- bottleneck" if s is bottleneck else ""
+        logger.info(f"  {s['stage']:<10} workers={s['workers']} items={s['items']:<5} "
+                    f"busy={s['busy_seconds']:.3f}s utilization={100 * (s['utilization'] or 0):5.1f}%{marker}")
+    logger.info(f"✅ Pipeline finished in {report['seconds']}s")
+
+
+def run_pipeline(source, stages, queue_size=PIPELINE_QUEUE_SIZE, collect=True):
+    """Atalho para Pipeline(stages, queue_size).run(source, collect)"""
+    return Pipeline(stages, queue_size).run(source, collect)
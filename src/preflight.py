@@ -0,0 +1,100 @@
+# src/preflight.py
+
+import codecs
+import csv
+import io
+import logging
+import os
+
+from src.ingest import validate_columns
+
+logger = logging.getLogger(__name__)
+
+PREFLIGHT_SAMPLE_BYTES = 1024 * 1024  # amostra lida do início do arquivo
+
+_BOMS = [
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+]
+# Tentadas em ordem quando não há BOM; latin1 nunca falha e fica por último
+_FALLBACK_ENCODINGS = ["utf-8", "cp1252", "latin1"]
+_DELIMITERS = ",;\t|"
+
+
+def _detect_encoding(sample, complete):
+    """Retorna (encoding, bom, texto decodificado) a partir da amostra de bytes"""
+    for bom, encoding in _BOMS:
+        if sample.startswith(bom):
+            decoder = codecs.getincrementaldecoder(encoding)()
+            return encoding, True, decoder.decode(sample, final=complete)
+
+    for encoding in _FALLBACK_ENCODINGS:
+        try:
+            # final=False: um caractere multibyte cortado no fim da amostra não é erro
+            decoder = codecs.getincrementaldecoder(encoding)()
+            return encoding, False, decoder.decode(sample, final=complete)
+        except UnicodeDecodeError:
+            continue
+    raise ValueError("Could not detect CSV encoding")
+
+
+def preflight_csv(csv_path, expected_columns=None, sample_bytes=PREFLIGHT_SAMPLE_BYTES):
+    """
+    Inspeciona o CSV lendo apenas os primeiros `sample_bytes`:
+    - detecta BOM/encoding e delimitador
+    - lê e valida o cabeçalho (validate_columns) sem parsear o corpo
+    - estima o número de linhas pelo tamanho médio das linhas da amostra
+    Retorna dict com os metadados e `read_options`, prontos para load_csv(**read_options),
+    para que o arquivo seja lido uma única vez.
+    """
+    if not os.path.exists(csv_path):
+        raise FileNotFoundError(f"CSV not found at {csv_path}")
+
+    file_size = os.path.getsize(csv_path)
+    with open(csv_path, "rb") as f:
+        sample = f.read(sample_bytes)
+    complete = len(sample) >= file_size
+
+    encoding, bom, text = _detect_encoding(sample, complete)
+    if not complete:
+        # descarta a última linha, possivelmente cortada pela amostra
+        text = text[: text.rfind("\n") + 1]
+
+    first_line = text.split("\n", 1)[0]
+    try:
+        delimiter = csv.Sniffer().sniff(first_line, delimiters=_DELIMITERS).delimiter
+    except csv.Error:
+        delimiter = ","
+
+    reader = csv.reader(io.StringIO(text, newline=""), delimiter=delimiter)
+    columns = [col.strip().replace("\ufeff", "") for col in next(reader)]
+    header_end = reader.line_num
+    sample_rows = sum(1 for _ in reader)
+
+    if complete:
+        estimated_rows = sample_rows
+    else:
+        # bytes do corpo da amostra / linhas da amostra = bytes médios por linha
+        header_bytes = len("\n".join(text.split("\n")[:header_end]).encode(encoding)) + 1
+        body_bytes = len(text.encode(encoding)) - header_bytes
+        estimated_rows = int((file_size - header_bytes) / (body_bytes / sample_rows)) if sample_rows else 0
+
+    if expected_columns:
+        validate_columns(columns, expected_columns)
+
+    info = {
+        "csv_path": csv_path,
+        "encoding": encoding,
+        "bom": bom,
+        "delimiter": delimiter,
+        "columns": columns,
+        "file_size": file_size,
+        "sample_rows": sample_rows,
+        "estimated_rows": estimated_rows,
+        "exact_row_count": complete,
+        "read_options": {"encoding": encoding, "sep": delimiter},
+    }
+    logger.info(f"Preflight '{csv_path}': encoding={encoding} bom={bom} delimiter={delimiter!r} "
+                f"columns={len(columns)} rows{'=' if complete else '~'}{estimated_rows}")
+    return info
@@ -0,0 +1,208 @@
+# src/quality.py
+
+import logging
+import uuid
+from datetime import date, datetime, timezone
+
+from src.db import get_engine
+from src.dedupe import StreamingDeduper, hash_keys
+from src.lazy import lazy_import
+from src.schema import TABLES, coerce_frame, create_table_ddl, sqlalchemy_dtypes
+
+pd = lazy_import("pandas")
+sa = lazy_import("sqlalchemy")
+
+logger = logging.getLogger(__name__)
+
+DQ_RESULTS_TABLE = "dq_results"
+
+# -----------------------------
+# DECLARATIVE RULES
+# -----------------------------
+
+# Regras por tabela. Tipos suportados:
+# - primary_key / unique: combinação de colunas sem nulos (PK) e sem duplicados
+# - not_null: colunas obrigatórias
+# - range: min/max inclusivos para colunas numéricas (callable = avaliado a cada execução)
+# - allowed_values: domínio fechado (após normalização do clean_titles)
+# - foreign_key: cobertura de chaves na PK da tabela referenciada
+DQ_RULES = {
+    "titles_clean": [
+        {"rule": "primary_key", "columns": ["show_id"]},
+        {"rule": "not_null", "columns": ["show_id", "type", "title"]},
+        {"rule": "range", "column": "release_year", "min": 1900, "max": lambda: date.today().year + 1},
+        {"rule": "allowed_values", "column": "type", "values": ["movie", "tv show"]},
+        {"rule": "allowed_values", "column": "rating", "values": [
+            "g", "pg", "pg-13", "r", "nc-17", "nr", "ur",
+            "tv-y", "tv-y7", "tv-y7-fv", "tv-g", "tv-pg", "tv-14", "tv-ma", "not_rated",
+        ]},
+    ],
+    "titles_by_country": [
+        {"rule": "not_null", "columns": ["show_id", "country"]},
+        {"rule": "unique", "columns": ["show_id", "country"]},
+        {"rule": "foreign_key", "column": "show_id", "references": "titles_clean"},
+    ],
+    "titles_by_genre": [
+        {"rule": "not_null", "columns": ["show_id", "genre"]},
+        {"rule": "unique", "columns": ["show_id", "genre"]},
+        {"rule": "foreign_key", "column": "show_id", "references": "titles_clean"},
+    ],
+}
+
+
+def _rule_label(rule):
+    columns = rule.get("columns") or [rule["column"]]
+    return rule["rule"], ",".join(columns)
+
+
+# -----------------------------
+# INCREMENTAL EVALUATION
+# -----------------------------
+
+class QualityRun:
+    """
+    Avalia as regras declaradas em DQ_RULES de forma incremental: cada chunk de cada
+    tabela é visitado uma única vez e todas as regras são calculadas sobre ele.
+
+    - sample_fraction: avalia as regras por linha (not_null, range, allowed_values,
+      foreign_key) em uma amostra de cada chunk. Unicidade/PK é sempre exata.
+    - Tabelas referenciadas por foreign_key devem ser processadas antes das filhas.
+    """
+
+    def __init__(self, rules=None, sample_fraction=None, random_state=42):
+        self.rules = rules or DQ_RULES
+        self.sample_fraction = sample_fraction
+        self.random_state = random_state
+        self.run_id = uuid.uuid4().hex
+        self._counts = {}     # (table, rule, columns) -> [checked_rows, failed_rows]
+        self._seen_keys = {}  # (table, columns) -> StreamingDeduper com as chaves já vistas
+
+    def _add(self, table, rule, checked, failed):
+        counts = self._counts.setdefault((table, *_rule_label(rule)), [0, 0])
+        counts[0] += int(checked)
+        counts[1] += int(failed)
+
+    def _parent_keys(self, table):
+        for rule in self.rules[table]:
+            if rule["rule"] == "primary_key":
+                return self._seen_keys.get((table, tuple(rule["columns"])))
+        raise ValueError(f"Table '{table}' has no primary_key rule to reference")
+
+    def update(self, table, chunk):
+        """Aplica todas as regras de `table` a um chunk (DataFrame)"""
+        rules = self.rules.get(table, [])
+        sample = chunk
+        if self.sample_fraction and self.sample_fraction < 1:
+            sample = chunk.sample(frac=self.sample_fraction, random_state=self.random_state)
+
+        # Nulos calculados uma única vez para todas as colunas usadas pelas regras
+        null_columns = sorted({c for r in rules if r["rule"] in ("not_null", "primary_key") for c in r["columns"]})
+        nulls = sample[null_columns].isna().sum() if null_columns else None
+
+        for rule in rules:
+            kind = rule["rule"]
+
+            if kind in ("primary_key", "unique"):
+                columns = tuple(rule["columns"])
+                seen = self._seen_keys.setdefault((table, columns), StreamingDeduper())
+                # chaves com nulo não entram no dedupe (não são duplicatas umas das outras);
+                # na PK elas já são falhas
+                null_keys = chunk[list(columns)].isna().any(axis=1)
+                failed = int(seen.flag(chunk[~null_keys], columns).sum())
+                if kind == "primary_key":
+                    failed += int(null_keys.sum())
+                self._add(table, rule, len(chunk), failed)
+
+            elif kind == "not_null":
+                self._add(table, rule, len(sample) * len(rule["columns"]), nulls[rule["columns"]].sum())
+
+            elif kind == "range":
+                values = pd.to_numeric(sample[rule["column"]], errors="coerce")
+                low, high = (bound() if callable(bound) else bound for bound in (rule["min"], rule["max"]))
+                outside = ~values.between(low, high) & values.notna()
+                self._add(table, rule, values.notna().sum(), outside.sum())
+
+            elif kind == "allowed_values":
+                values = sample[rule["column"]]
+                invalid = ~values.isin(rule["values"]) & values.notna()
+                self._add(table, rule, values.notna().sum(), invalid.sum())
+
+            elif kind == "foreign_key":
+                parent = rule["references"]
+                parent_keys = self._parent_keys(parent)
+                if parent_keys is None:
+                    # em streaming basta que os chunks pai já tenham sido vistos
+                    raise ValueError(f"'{parent}' must be checked before '{table}' (foreign key)")
+                missing = ~parent_keys.contains(hash_keys(sample, rule["column"]))
+                self._add(table, rule, len(sample), missing.sum())
+
+            else:
+                raise ValueError(f"Unknown data quality rule: {kind}")
+
+    def iter_update(self, table, chunks):
+        """Aplica update a cada chunk e o repassa (validação na mesma leitura de outra etapa)"""
+        for chunk in chunks:
+            self.update(table, chunk)
+            yield chunk
+
+    def results(self):
+        """DataFrame com uma linha por regra avaliada"""
+        checked_at = datetime.now(timezone.utc)
+        rows = []
+        for (table, rule, columns), (checked, failed) in self._counts.items():
+            rows.append({
+                "run_id": self.run_id,
+                "checked_at": checked_at,
+                "table_name": table,
+                "rule": rule,
+                "columns": columns,
+                "checked_rows": checked,
+                "failed_rows": failed,
+                "failure_rate": round(failed / checked, 6) if checked else 0.0,
+                "sampled": bool(self.sample_fraction and self.sample_fraction < 1 and rule not in ("primary_key", "unique")),
+                "passed": failed == 0,
+            })
+        return pd.DataFrame(rows)
+
+    def save(self, table_name=DQ_RESULTS_TABLE):
+        """Grava os resultados (append) na tabela de resultados de DQ"""
+        results = self.results()
+        try:
+            if table_name in TABLES:
+                # tipos do registro (src/schema.py) em vez dos inferidos pelo to_sql
+                with get_engine().begin() as conn:
+                    conn.execute(sa.text(create_table_ddl(table_name, if_not_exists=True)))
+                    coerce_frame(results, table_name).to_sql(table_name, conn, if_exists="append", index=False,
+                                                             dtype=sqlalchemy_dtypes(table_name))
+            else:
+                results.to_sql(table_name, get_engine(), if_exists="append", index=False)
+            logger.info(f"✅ {len(results)} DQ results saved in '{table_name}' (run_id={self.run_id})")
+        except sa.exc.SQLAlchemyError as e:
+            logger.error(f"❌ Failed to save DQ results: {e}")
+            raise
+        return results
+
+
+def run_quality_checks(tables, sample_fraction=None, save=True):
+    """
+    Executa as regras de DQ sobre {tabela: DataFrame ou iterável de chunks},
+    na ordem recebida (tabelas pai antes das filhas). Loga e grava os resultados.
+    """
+    logger.info("🔎 Running data quality checks...")
+    run = QualityRun(sample_fraction=sample_fraction)
+    for table, frames in tables.items():
+        chunks = [frames] if isinstance(frames, pd.DataFrame) else frames
+        for chunk in chunks:
+            run.update(table, chunk)
+
+    results = run.save() if save else run.results()
+    log_results(results)
+    return results
+
+
+def log_results(results):
+    """Loga uma linha por regra (✅ passou / ❌ falhou)"""
+    for row in results.itertuples(index=False):
+        status = "✅" if row.passed else "❌"
+        logger.info(f"{status} {row.table_name}.{row.rule}({row.columns}): "
+                    f"{row.failed_rows} failed of {row.checked_rows}")
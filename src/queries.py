@@ -0,0 +1,407 @@
+# src/queries.py
+
+import functools
+import inspect
+import logging
+import re
+import threading
+import time
+from typing import Optional
+
+from src import duck
+from src.config import get_backend
+from src.db import get_engine
+from src.lazy import lazy_import
+from src.schema import recreate_table
+
+pd = lazy_import("pandas")
+sa = lazy_import("sqlalchemy")
+
+logger = logging.getLogger(__name__)
+
+VERSION_TABLE = "dataset_version"
+QUERY_CACHE_TTL = 300        # segundos que um resultado fica em cache
+VERSION_POLL_SECONDS = 5     # intervalo mínimo entre leituras de dataset_version
+
+
+# -----------------------------
+# DATASET VERSION
+# -----------------------------
+
+def get_dataset_version(engine=None):
+    """(version, updated_at) publicados; (0, None) antes do primeiro run_transform"""
+    if engine is None and get_backend() == "duckdb":
+        return duck.get_dataset_version()
+    engine = engine or get_engine()
+    try:
+        with engine.connect() as conn:
+            row = conn.execute(sa.text(f"SELECT version, updated_at FROM {VERSION_TABLE} WHERE id = 1")).fetchone()
+    except sa.exc.ProgrammingError:
+        return 0, None
+    return (row.version, row.updated_at) if row else (0, None)
+
+
+def bump_dataset_version(engine=None):
+    """Incrementa a versão do dataset (fim do run_transform): caches de consulta são invalidados"""
+    engine = engine or get_engine()
+    with engine.begin() as conn:
+        if not sa.inspect(conn).has_table(VERSION_TABLE):
+            recreate_table(conn, VERSION_TABLE)
+        version = conn.execute(sa.text(f"""
+            INSERT INTO {VERSION_TABLE} (id, version, updated_at) VALUES (1, 1, now())
+            ON CONFLICT (id) DO UPDATE SET version = {VERSION_TABLE}.version + 1, updated_at = now()
+            RETURNING version
+        """)).scalar()
+    query_cache.clear()
+    logger.info(f"✅ Dataset version bumped to {version}")
+    return version
+
+
+# -----------------------------
+# TTL CACHE
+# -----------------------------
+
+class QueryCache:
+    """
+    Cache de resultados por (consulta, parâmetros) com TTL, compartilhado pelo processo.
+    A versão do dataset é relida no máximo a cada `version_poll` segundos; quando muda,
+    o cache inteiro é descartado.
+    """
+
+    def __init__(self, ttl=QUERY_CACHE_TTL, version_poll=VERSION_POLL_SECONDS):
+        self.ttl = ttl
+        self.version_poll = version_poll
+        self.hits = 0
+        self.misses = 0
+        self._entries = {}
+        self._version = None
+        self._version_checked = 0.0
+        self._lock = threading.Lock()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._version = None
+            self._version_checked = 0.0
+
+    def _check_version(self, engine):
+        now = time.monotonic()
+        if now - self._version_checked < self.version_poll:
+            return
+        version, _ = get_dataset_version(engine)
+        with self._lock:
+            if version != self._version:
+                self._entries.clear()
+                self._version = version
+            self._version_checked = now
+
+    def get_or_run(self, key, run, engine=None):
+        self._check_version(engine)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self.hits += 1
+                return entry[1].copy()
+        result = run()
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = (now + self.ttl, result)
+        return result.copy()
+
+
+query_cache = QueryCache()
+
+
+def cached_query(func):
+    """Executa a consulta pelo query_cache; a chave são o nome e os parâmetros já com defaults"""
+    signature = inspect.signature(func)
+
+    @functools.wraps(func)
+    def wrapper(*args, engine=None, **kwargs):
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        bound.arguments.pop("engine", None)
+        key = (func.__name__, tuple(bound.arguments.items()))
+        return query_cache.get_or_run(key, lambda: func(**bound.arguments, engine=engine), engine)
+    return wrapper
+
+
+def _read(sql, params, engine=None):
+    """Sem engine explícita, lê do backend configurado (DB_BACKEND: PostgreSQL ou DuckDB)"""
+    if engine is None and get_backend() == "duckdb":
+        return duck.read_sql(sql, params)
+    return pd.read_sql(sa.text(sql), engine or get_engine(), params=params)
+
+
+def _filters(year=None, type=None, month=None, alias="t"):
+    """WHERE + parâmetros dos filtros comuns (ano usa a chave de partição date_added_year)"""
+    where, params = [], {}
+    if year is not None:
+        where.append(f"{alias}.date_added_year = :year")
+        params["year"] = int(year)
+    if type:
+        where.append(f"{alias}.type = :type")
+        params["type"] = type.strip().lower()
+    if month is not None:
+        where.append(f"EXTRACT(MONTH FROM {alias}.date_added) = :month")
+        params["month"] = int(month)
+    return where, params
+
+
+def _where(clauses):
+    return (" WHERE " + " AND ".join(clauses)) if clauses else ""
+
+
+def to_positional(sql, params):
+    """
+    Converte parâmetros nomeados (:nome) em posicionais ($1, $2...) para o asyncpg:
+    as funções *_sql servem tanto o pandas/SQLAlchemy quanto a API (src/api.py).
+    """
+    names = []
+
+    def replace(match):
+        if match.group(1) not in names:
+            names.append(match.group(1))
+        return f"${names.index(match.group(1)) + 1}"
+
+    return re.sub(r"(?<!:):(\w+)", replace, sql), [params[name] for name in names]
+
+
+# -----------------------------
+# ANALYTICS
+# -----------------------------
+
+def monthly_trend_sql(start_year: Optional[int] = None, end_year: Optional[int] = None,
+                      type: Optional[str] = None):
+    """
+    SQL + parâmetros da evolução mensal. O filtro de anos usa date_added_year (chave
+    de partição de titles_clean), então só as partições pedidas são lidas.
+    """
+    where, params = _filters(type=type)
+    if start_year is not None:
+        where.append("t.date_added_year >= :start_year")
+        params["start_year"] = int(start_year)
+    if end_year is not None:
+        where.append("t.date_added_year <= :end_year")
+        params["end_year"] = int(end_year)
+    sql = ("SELECT DATE_TRUNC('month', t.date_added) AS month, COUNT(*) AS total_titles FROM titles_clean t"
+           + _where(where) + " GROUP BY month ORDER BY month")
+    return sql, params
+
+
+@cached_query
+def monthly_trend(start_year: Optional[int] = None, end_year: Optional[int] = None,
+                  type: Optional[str] = None, engine=None) -> "pd.DataFrame":
+    """Títulos adicionados por mês (month, total_titles)"""
+    return _read(*monthly_trend_sql(start_year, end_year, type), engine)
+
+
+TREND_GRANULARITIES = ("day", "week", "month")
+
+
+def trend_sql(granularity: str = "month", start=None, end=None, type: Optional[str] = None):
+    """
+    SQL + parâmetros da série de títulos adicionados por `granularity` (day/week/month)
+    em [start, end) de date_added. O intervalo também filtra date_added_year, então só
+    as partições da janela são lidas (gráficos com zoom, src/timeseries.py).
+    """
+    if granularity not in TREND_GRANULARITIES:
+        raise ValueError(f"Unknown granularity '{granularity}' (use one of {TREND_GRANULARITIES})")
+    where, params = _filters(type=type)
+    where.append("t.date_added IS NOT NULL")
+    if start is not None:
+        where += ["t.date_added >= :start", "t.date_added_year >= :start_year"]
+        params.update(start=pd.Timestamp(start).date(), start_year=pd.Timestamp(start).year)
+    if end is not None:
+        where += ["t.date_added < :end", "t.date_added_year <= :end_year"]
+        params.update(end=pd.Timestamp(end).date(), end_year=pd.Timestamp(end).year)
+    sql = (f"SELECT DATE_TRUNC('{granularity}', t.date_added) AS period, COUNT(*) AS total_titles "
+           "FROM titles_clean t" + _where(where) + " GROUP BY period ORDER BY period")
+    return sql, params
+
+
+@cached_query
+def trend(granularity: str = "month", start=None, end=None, type: Optional[str] = None,
+          engine=None) -> "pd.DataFrame":
+    """Títulos adicionados por dia/semana/mês em uma janela de datas (period, total_titles)"""
+    return _read(*trend_sql(granularity, start, end, type), engine)
+
+
+def monthly_trend_by_type_sql(year: Optional[int] = None):
+    where, params = _filters(year)
+    where.append("t.date_added IS NOT NULL")
+    sql = ("SELECT DATE_TRUNC('month', t.date_added) AS month, t.type, COUNT(*) AS total_titles "
+           "FROM titles_clean t" + _where(where) + " GROUP BY month, t.type ORDER BY month, t.type")
+    return sql, params
+
+
+@cached_query
+def monthly_trend_by_type(year: Optional[int] = None, engine=None) -> "pd.DataFrame":
+    """Títulos adicionados por mês e tipo (month, type, total_titles)"""
+    return _read(*monthly_trend_by_type_sql(year), engine)
+
+
+def top_countries_sql(limit: int = 10, year: Optional[int] = None, type: Optional[str] = None,
+                      month: Optional[int] = None):
+    where, params = _filters(year, type, month)
+    params["limit"] = int(limit)
+    sql = ("SELECT c.country, COUNT(*) AS total_titles FROM titles_by_country c "
+           "JOIN titles_clean t ON t.show_id = c.show_id AND t.date_added_year = c.date_added_year"
+           + _where(where) + " GROUP BY c.country ORDER BY total_titles DESC, c.country LIMIT :limit")
+    return sql, params
+
+
+@cached_query
+def top_countries(limit: int = 10, year: Optional[int] = None, type: Optional[str] = None,
+                  month: Optional[int] = None, engine=None) -> "pd.DataFrame":
+    """Países com mais títulos (country, total_titles)"""
+    return _read(*top_countries_sql(limit, year, type, month), engine)
+
+
+def genre_distribution_sql(limit: Optional[int] = None, year: Optional[int] = None,
+                           type: Optional[str] = None, month: Optional[int] = None):
+    where, params = _filters(year, type, month)
+    params["limit"] = None if limit is None else int(limit)
+    sql = ("SELECT g.genre, COUNT(*) AS total_titles FROM titles_by_genre g "
+           "JOIN titles_clean t ON t.show_id = g.show_id AND t.date_added_year = g.date_added_year"
+           + _where(where) + " GROUP BY g.genre ORDER BY total_titles DESC, g.genre LIMIT :limit")
+    return sql, params
+
+
+@cached_query
+def genre_distribution(limit: Optional[int] = None, year: Optional[int] = None, type: Optional[str] = None,
+                       month: Optional[int] = None, engine=None) -> "pd.DataFrame":
+    """Títulos por gênero (genre, total_titles)"""
+    return _read(*genre_distribution_sql(limit, year, type, month), engine)
+
+
+def type_distribution_sql(year: Optional[int] = None, month: Optional[int] = None):
+    where, params = _filters(year, month=month)
+    sql = "SELECT t.type, COUNT(*) AS total FROM titles_clean t" + _where(where) + " GROUP BY t.type ORDER BY t.type"
+    return sql, params
+
+
+@cached_query
+def type_distribution(year: Optional[int] = None, month: Optional[int] = None,
+                      engine=None) -> "pd.DataFrame":
+    """Filmes x séries (type, total)"""
+    return _read(*type_distribution_sql(year, month), engine)
+
+
+def top_cast_sql(limit: int = 20, year: Optional[int] = None, type: Optional[str] = None,
+                 month: Optional[int] = None):
+    where, params = _filters(year, type, month)
+    params["limit"] = int(limit)
+    sql = ("SELECT actor, COUNT(*) AS appearances FROM ("
+           "SELECT DISTINCT t.show_id, TRIM(a.actor) AS actor FROM titles_clean t "
+           "CROSS JOIN LATERAL unnest(string_to_array(t.\"cast\", ',')) AS a(actor)"
+           + _where(where) + ") s WHERE actor <> '' GROUP BY actor ORDER BY appearances DESC, actor LIMIT :limit")
+    return sql, params
+
+
+@cached_query
+def top_cast(limit: int = 20, year: Optional[int] = None, type: Optional[str] = None,
+             month: Optional[int] = None, engine=None) -> "pd.DataFrame":
+    """Atores/atrizes com mais títulos (actor, appearances), a partir de titles_clean.cast"""
+    return _read(*top_cast_sql(limit, year, type, month), engine)
+
+
+def catalog_summary_sql(year: Optional[int] = None):
+    where, params = _filters(year)
+    sql = ("SELECT COUNT(*) AS total_titles, "
+           "AVG(t.duration_value) FILTER (WHERE t.duration_unit = 'min') AS avg_movie_minutes, "
+           "AVG(t.duration_value) FILTER (WHERE LOWER(t.duration_unit) IN ('season', 'seasons')) AS avg_show_seasons "
+           "FROM titles_clean t" + _where(where))
+    return sql, params
+
+
+@cached_query
+def catalog_summary(year: Optional[int] = None, engine=None) -> "pd.DataFrame":
+    """Uma linha com total de títulos e duração média de filmes (min) e séries (temporadas)"""
+    return _read(*catalog_summary_sql(year), engine)
+
+
+def titles_per_year_sql():
+    sql = ("SELECT t.date_added_year AS year, COUNT(*) AS total_titles FROM titles_clean t "
+           "WHERE t.date_added_year > 0 GROUP BY year ORDER BY year")
+    return sql, {}
+
+
+@cached_query
+def titles_per_year(engine=None) -> "pd.DataFrame":
+    """Títulos adicionados por ano (year, total_titles), sem os sem data"""
+    return _read(*titles_per_year_sql(), engine)
+
+
+# -----------------------------
+# CUBES
+# -----------------------------
+
+# Contagens por (ano, mês, tipo[, valor]) sem filtro: o dashboard em modo clientside
+# (src/cube.py) refaz os filtros de ano/mês/tipo e os rankings no navegador.
+_CUBE_KEYS = "t.date_added_year AS year, CAST(EXTRACT(MONTH FROM t.date_added) AS INTEGER) AS month, t.type"
+CUBE_DIMENSIONS = ("titles", "country", "genre", "cast")
+
+
+def cube_sql(dimension: str):
+    """SQL do cubo: 'titles' (year, month, type, total) ou um dos fatos com a coluna value"""
+    if dimension == "titles":
+        sql = f"SELECT {_CUBE_KEYS}, COUNT(*) AS total FROM titles_clean t GROUP BY 1, 2, 3 ORDER BY 1, 2, 3"
+    elif dimension == "country":
+        sql = (f"SELECT {_CUBE_KEYS}, c.country AS value, COUNT(*) AS total FROM titles_by_country c "
+               "JOIN titles_clean t ON t.show_id = c.show_id AND t.date_added_year = c.date_added_year "
+               "GROUP BY 1, 2, 3, 4 ORDER BY 1, 2, 3, 4")
+    elif dimension == "genre":
+        sql = (f"SELECT {_CUBE_KEYS}, g.genre AS value, COUNT(*) AS total FROM titles_by_genre g "
+               "JOIN titles_clean t ON t.show_id = g.show_id AND t.date_added_year = g.date_added_year "
+               "GROUP BY 1, 2, 3, 4 ORDER BY 1, 2, 3, 4")
+    elif dimension == "cast":
+        # mesma regra de top_cast: cada título conta uma vez por ator
+        sql = ("SELECT year, month, type, actor AS value, COUNT(*) AS total FROM ("
+               f"SELECT DISTINCT t.show_id, {_CUBE_KEYS}, TRIM(a.actor) AS actor FROM titles_clean t "
+               "CROSS JOIN LATERAL unnest(string_to_array(t.\"cast\", ',')) AS a(actor)"
+               ") s WHERE actor <> '' GROUP BY 1, 2, 3, 4 ORDER BY 1, 2, 3, 4")
+    else:
+        raise ValueError(f"Unknown cube dimension '{dimension}' (use one of {CUBE_DIMENSIONS})")
+    return sql, {}
+
+
+@cached_query
+def cube(dimension: str, engine=None) -> "pd.DataFrame":
+    """Cubo de contagens de uma dimensão (ver cube_sql)"""
+    return _read(*cube_sql(dimension), engine)
+
+
+# -----------------------------
+# LISTINGS
+# -----------------------------
+
+# Colunas da listagem de títulos (sem search_vector)
+TITLE_COLUMNS = ["show_id", "type", "title", "director", "cast", "country", "date_added", "release_year",
+                 "rating", "duration", "duration_value", "duration_unit", "listed_in", "description"]
+
+
+def titles_page_sql(after: Optional[str] = None, limit: int = 50, year: Optional[int] = None,
+                    type: Optional[str] = None, country: Optional[str] = None, genre: Optional[str] = None):
+    """
+    Página de titles_clean por keyset em show_id (WHERE show_id > :after ORDER BY show_id),
+    sem OFFSET: o custo de cada página não cresce com a posição. Busca limit + 1 linhas
+    para saber se existe próxima página.
+    """
+    where, params = _filters(year, type)
+    if after:
+        where.append("t.show_id > :after")
+        params["after"] = after
+    if country:
+        where.append("EXISTS (SELECT 1 FROM titles_by_country c WHERE c.show_id = t.show_id "
+                     "AND c.date_added_year = t.date_added_year AND c.country = :country)")
+        params["country"] = country
+    if genre:
+        where.append("EXISTS (SELECT 1 FROM titles_by_genre g WHERE g.show_id = t.show_id "
+                     "AND g.date_added_year = t.date_added_year AND g.genre = :genre)")
+        params["genre"] = genre
+    params["limit"] = int(limit) + 1
+    columns = ", ".join(f't."{c}"' for c in TITLE_COLUMNS)
+    sql = f"SELECT {columns} FROM titles_clean t" + _where(where) + " ORDER BY t.show_id LIMIT :limit"
+    return sql, params
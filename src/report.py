@@ -0,0 +1,202 @@
+# src/report.py
+
+import hashlib
+import html
+import json
+import logging
+import os
+import time
+from collections import namedtuple
+
+from src import queries, timeseries
+from src.lazy import lazy_import
+
+pd = lazy_import("pandas")
+sns = lazy_import("seaborn")
+
+logger = logging.getLogger(__name__)
+
+REPORT_FORMATS = ("png", "svg")
+MANIFEST_FILE = "manifest.json"
+HTML_FILE = "report.html"
+FIGSIZE = (10, 6)
+DPI = 120
+LINE_MAX_POINTS = FIGSIZE[0] * DPI  # um ponto por pixel de largura basta para a linha
+MARKER_MAX_POINTS = 200             # acima disso os marcadores viram um borrão
+
+# query: função de src/queries.py; draw(df, ax, title) desenha em um Axes (sem plt.show)
+Chart = namedtuple("Chart", "name title query kwargs draw")
+
+
+# -----------------------------
+# DRAW FUNCTIONS
+# -----------------------------
+
+def draw_bar(df, ax, title, x, y, palette="viridis"):
+    sns.barplot(data=df, x=x, y=y, hue=y, palette=palette, legend=False, ax=ax)
+    ax.set_title(title)
+
+
+def draw_line(df, ax, title, x, y, max_points=LINE_MAX_POINTS):
+    # séries longas (diárias, por título) são reduzidas à largura da figura (min/max por bucket)
+    df = timeseries.downsample(df, x, y, max_points, method="minmax")
+    sns.lineplot(data=df, x=x, y=y, marker="o" if len(df) <= MARKER_MAX_POINTS else None, ax=ax)
+    ax.set_title(title)
+    ax.tick_params(axis="x", labelrotation=45)
+
+
+def draw_pie(df, ax, title, values, labels):
+    ax.pie(df[values], labels=df[labels], autopct="%1.1f%%", startangle=90)
+    ax.set_title(title)
+
+
+TREND_TITLES = {"month": "Evolução Mensal de Lançamentos", "week": "Evolução Semanal de Lançamentos",
+                "day": "Evolução Diária de Lançamentos"}
+
+
+def trend_chart(start_year=None, end_year=None, granularity="month"):
+    """Evolução de lançamentos; dia/semana usam queries.trend na janela dos anos pedidos"""
+    if granularity == "month":
+        return Chart("monthly_trend", TREND_TITLES[granularity], queries.monthly_trend,
+                     {"start_year": start_year, "end_year": end_year}, ("line", {"x": "month", "y": "total_titles"}))
+    window = {"start": f"{start_year}-01-01" if start_year else None,
+              "end": f"{end_year + 1}-01-01" if end_year else None}
+    return Chart("monthly_trend", TREND_TITLES[granularity], queries.trend,
+                 {"granularity": granularity, **window}, ("line", {"x": "period", "y": "total_titles"}))
+
+
+def analysis_charts(start_year=None, end_year=None, country_limit=10, cast_limit=20, granularity="month"):
+    """Gráficos da análise (os mesmos do modo interativo de run_analysis.py)"""
+    return [
+        Chart("top_countries", f"Top {country_limit} Países com Mais Títulos", queries.top_countries,
+              {"limit": country_limit}, ("bar", {"x": "total_titles", "y": "country"})),
+        trend_chart(start_year, end_year, granularity),
+        Chart("type_distribution", "Distribuição Filmes x Séries", queries.type_distribution,
+              {}, ("pie", {"values": "total", "labels": "type"})),
+        Chart("top_cast", f"Top {cast_limit} Atores/Atrizes", queries.top_cast,
+              {"limit": cast_limit}, ("bar", {"x": "appearances", "y": "actor"})),
+    ]
+
+
+DRAW_FUNCTIONS = {"bar": draw_bar, "line": draw_line, "pie": draw_pie}
+
+
+def draw_chart(chart, df, ax):
+    kind, options = chart.draw
+    DRAW_FUNCTIONS[kind](df, ax, chart.title, **options)
+
+
+# -----------------------------
+# RENDERING (WORKERS)
+# -----------------------------
+
+def _render(chart, df, output_dir, formats):
+    """Executado no pool de processos: desenha com o backend Agg e salva os arquivos"""
+    start = time.perf_counter()
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=FIGSIZE)
+    try:
+        draw_chart(chart, df, ax)
+        fig.tight_layout()
+        files = []
+        for fmt in formats:
+            path = os.path.join(output_dir, f"{chart.name}.{fmt}")
+            fig.savefig(path, format=fmt, dpi=DPI)
+            files.append(os.path.basename(path))
+    finally:
+        plt.close(fig)
+    return chart.name, files, time.perf_counter() - start
+
+
+def data_hash(chart, df, formats):
+    """Hash do resultado da consulta + definição do gráfico (título, tipo, formatos)"""
+    digest = hashlib.sha256()
+    digest.update(repr((chart.title, chart.draw, tuple(formats), list(df.columns))).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+    return digest.hexdigest()
+
+
+def _load_manifest(output_dir):
+    path = os.path.join(output_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def _write_html(output_dir, charts, manifest):
+    """Página única com todos os gráficos (SVG embutido quando disponível, senão PNG)"""
+    sections = []
+    for chart in charts:
+        files = manifest[chart.name]["files"]
+        if f"{chart.name}.svg" in files:
+            with open(os.path.join(output_dir, f"{chart.name}.svg"), encoding="utf-8") as fh:
+                svg = fh.read()
+            figure = svg[svg.index("<svg"):]
+        else:
+            figure = f'<img src="{html.escape(files[0])}" alt="{html.escape(chart.title)}">'
+        sections.append(f"<section><h2>{html.escape(chart.title)}</h2>\n{figure}\n</section>")
+    page = ("<!DOCTYPE html>\n<html lang=\"pt-BR\">\n<head><meta charset=\"utf-8\">"
+            "<title>Análise de Dados Netflix</title>"
+            "<style>body{font-family:sans-serif;max-width:1100px;margin:auto}svg,img{max-width:100%;height:auto}</style>"
+            "</head>\n<body>\n<h1>Análise de Dados Netflix</h1>\n" + "\n".join(sections) + "\n</body>\n</html>\n")
+    path = os.path.join(output_dir, HTML_FILE)
+    with open(path, "w", encoding="utf-8") as fh:
+        fh.write(page)
+    return path
+
+
+# -----------------------------
+# REPORT
+# -----------------------------
+
+def render_report(output_dir, charts=None, formats=REPORT_FORMATS, workers=None, force=False):
+    """
+    Renderiza os gráficos sem janela (Agg) em PNG/SVG + report.html, em paralelo em um
+    pool de processos. As consultas rodam no processo principal (query_cache); gráficos
+    cujo hash do resultado não mudou desde o último relatório (manifest.json) são pulados.
+    Retorna as estatísticas do relatório.
+    """
+    start = time.perf_counter()
+    charts = charts or analysis_charts()
+    os.makedirs(output_dir, exist_ok=True)
+    manifest = _load_manifest(output_dir)
+
+    jobs, skipped = [], []
+    for chart in charts:
+        df = chart.query(**chart.kwargs)
+        digest = data_hash(chart, df, formats)
+        entry = manifest.get(chart.name, {})
+        files_exist = all(os.path.exists(os.path.join(output_dir, f)) for f in entry.get("files", []))
+        if not force and entry.get("hash") == digest and files_exist:
+            skipped.append(chart.name)
+        else:
+            jobs.append((chart, df, digest))
+
+    rendered = {}
+    if jobs:
+        from src.pipeline import process_pool  # multiprocessing só quando há o que desenhar
+
+        with process_pool(min(len(jobs), workers or os.cpu_count() or 1)) as pool:
+            futures = [(digest, pool.submit(_render, chart, df, output_dir, formats)) for chart, df, digest in jobs]
+            for digest, future in futures:
+                name, files, seconds = future.result()
+                manifest[name] = {"hash": digest, "files": files}
+                rendered[name] = round(seconds, 3)
+
+    with open(os.path.join(output_dir, MANIFEST_FILE), "w", encoding="utf-8") as fh:
+        json.dump(manifest, fh, indent=2)
+    html_path = _write_html(output_dir, charts, manifest)
+
+    stats = {
+        "rendered": rendered,
+        "skipped": skipped,
+        "html": html_path,
+        "seconds": round(time.perf_counter() - start, 3),
+    }
+    logger.info(f"✅ Report written to '{output_dir}': {len(rendered)} rendered, {len(skipped)} unchanged "
+                f"in {stats['seconds']}s")
+    return stats
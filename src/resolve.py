@@ -0,0 +1,195 @@
+# src/resolve.py
+
+import contextlib
+import difflib
+import logging
+import re
+import unicodedata
+from collections import Counter, defaultdict
+
+from src.db import get_engine
+from src.lazy import lazy_import
+from src.schema import recreate_table
+from src.strings import split_flatten
+
+pa = lazy_import("pyarrow")
+pc = lazy_import("pyarrow.compute")
+sa = lazy_import("sqlalchemy")
+
+logger = logging.getLogger(__name__)
+
+MAPPING_TABLE = "value_mapping"
+
+SIMILARITY_THRESHOLD = 0.9  # difflib ratio mínimo entre as chaves normalizadas
+TOKEN_THRESHOLD = 0.8       # cada palavra também precisa ser parecida ("east" x "west" não)
+NGRAM_SIZE = 3
+BLOCK_MIN_DICE = 0.5        # n-gramas em comum (Dice) para um par virar candidato
+MAX_BLOCK_SIZE = 500        # n-gramas mais comuns que isso não geram candidatos
+
+
+# -----------------------------
+# KEYS & BLOCKING
+# -----------------------------
+
+def normalize_value(value):
+    """Chave de comparação: sem acentos, minúsculas, só letras/dígitos e espaços simples"""
+    value = unicodedata.normalize("NFKD", value)
+    value = "".join(ch for ch in value if not unicodedata.combining(ch)).casefold()
+    return " ".join(re.sub(r"[^\w]+", " ", value).split())
+
+
+def _ngrams(key, n=NGRAM_SIZE):
+    padded = f" {key} "
+    return {padded[i:i + n] for i in range(max(len(padded) - n + 1, 1))}
+
+
+def _similar(a, b, threshold, token_threshold):
+    tokens_a, tokens_b = a.split(), b.split()
+    if len(tokens_a) != len(tokens_b):
+        return False
+    if any(difflib.SequenceMatcher(None, x, y).ratio() < token_threshold for x, y in zip(tokens_a, tokens_b)):
+        return False
+    return difflib.SequenceMatcher(None, a, b).ratio() >= threshold
+
+
+def _candidate_pairs(keys, min_dice):
+    """
+    Pares (i, j) de chaves que compartilham n-gramas suficientes (índice invertido
+    de n-gramas): só esses pares passam pela comparação difflib, em vez de todos x todos.
+    """
+    grams = [_ngrams(key) for key in keys]
+    postings = defaultdict(list)
+    for i, key_grams in enumerate(grams):
+        for gram in key_grams:
+            postings[gram].append(i)
+
+    for i, key_grams in enumerate(grams):
+        shared = Counter()
+        for gram in key_grams:
+            block = postings[gram]
+            if len(block) <= MAX_BLOCK_SIZE:
+                shared.update(j for j in block if j > i)
+        for j, count in shared.items():
+            if 2 * count / (len(key_grams) + len(grams[j])) >= min_dice:
+                yield i, j
+
+
+# -----------------------------
+# CLUSTERING
+# -----------------------------
+
+def cluster_values(counts, existing=None, threshold=SIMILARITY_THRESHOLD, token_threshold=TOKEN_THRESHOLD):
+    """
+    Agrupa variantes de um mesmo valor e retorna {valor: canônico} para os valores
+    de `counts` ({valor: frequência}) ainda fora de `existing` ({valor: canônico}).
+    - mesma chave normalizada (caixa, espaços, acentos, pontuação) -> mesmo grupo
+    - chaves parecidas (bloqueio por n-gramas + difflib) -> mesmo grupo (union-find)
+    - canônico: o já persistido, se o grupo tiver um; senão a variante mais frequente
+    Valores vazios mapeiam para None (descartados na explosão).
+    """
+    existing = existing or {}
+    unseen = [value for value in counts if value not in existing]
+    mapping = {value: None for value in unseen if not normalize_value(value)}
+    new_values = [value for value in unseen if value not in mapping]
+    anchors = sorted(set(c for c in existing.values() if c is not None))
+
+    # um nó por chave normalizada sem espaços ("hong kong" = "hongkong");
+    # canônicos já persistidos entram como âncoras
+    key_members = defaultdict(list)
+    for value in anchors + new_values:
+        key_members[normalize_value(value).replace(" ", "")].append(value)
+    nodes = list(key_members)
+    keys = [normalize_value(key_members[node][0]) for node in nodes]
+    parent = list(range(len(keys)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i, j in _candidate_pairs(keys, BLOCK_MIN_DICE):
+        if find(i) != find(j) and _similar(keys[i], keys[j], threshold, token_threshold):
+            parent[find(i)] = find(j)
+
+    clusters = defaultdict(list)
+    for i, node in enumerate(nodes):
+        clusters[find(i)].extend(key_members[node])
+
+    anchor_set = set(anchors)
+    for members in clusters.values():
+        anchored = [m for m in members if m in anchor_set]
+        canonical = anchored[0] if anchored else max(members, key=lambda m: (counts.get(m, 0), -len(m), m))
+        for member in members:
+            if member not in anchor_set:
+                mapping[member] = canonical
+    return mapping
+
+
+# -----------------------------
+# PERSISTED MAPPING
+# -----------------------------
+
+def _transaction(engine=None, conn=None):
+    """Transação já aberta pelo chamador (`conn`) ou uma nova no engine"""
+    return contextlib.nullcontext(conn) if conn is not None else (engine or get_engine()).begin()
+
+
+def load_mapping(domain, engine=None, conn=None):
+    """{raw_value: canonical} persistido para o domínio (vazio se a tabela não existir)"""
+    with _transaction(engine, conn) as conn:
+        if not sa.inspect(conn).has_table(MAPPING_TABLE):
+            return {}
+        rows = conn.execute(sa.text(f"SELECT raw_value, canonical FROM {MAPPING_TABLE} WHERE domain = :domain"),
+                            {"domain": domain})
+        return dict(rows.fetchall())
+
+
+def save_mapping(domain, mapping, engine=None, conn=None):
+    """
+    Grava (upsert) novos pares raw_value -> canonical do domínio; com `conn`, na
+    transação do chamador (some junto se ela for desfeita)
+    """
+    if not mapping:
+        return 0
+    with _transaction(engine, conn) as conn:
+        if not sa.inspect(conn).has_table(MAPPING_TABLE):
+            recreate_table(conn, MAPPING_TABLE)
+        conn.execute(sa.text(f"""
+            INSERT INTO {MAPPING_TABLE} (domain, raw_value, canonical)
+            VALUES (:domain, :raw_value, :canonical)
+            ON CONFLICT (domain, raw_value) DO UPDATE SET canonical = EXCLUDED.canonical
+        """), [{"domain": domain, "raw_value": raw, "canonical": canonical} for raw, canonical in mapping.items()])
+    return len(mapping)
+
+
+def count_values(series, sep=","):
+    """{valor: frequência} de uma coluna multivalorada (após split/trim); somável entre chunks"""
+    _, flat = split_flatten(pa.array(series, type=pa.string(), from_pandas=True), sep)
+    value_counts = pc.value_counts(flat.drop_null())
+    return Counter(dict(zip(value_counts.field("values").to_pylist(), value_counts.field("counts").to_pylist())))
+
+
+def resolve_counts(counts, domain, engine=None, conn=None, **kwargs):
+    """
+    Canonicaliza os valores de `counts` ({valor: frequência}, de count_values):
+    valores já vistos são resolvidos pelo mapeamento persistido (lookup em dict);
+    só os novos passam pelo agrupamento e são gravados em value_mapping (na
+    transação de `conn`, se informada).
+    Retorna o dict {raw_value: canonical} para iter_bridge_batches(mapping=...).
+    """
+    existing = load_mapping(domain, engine, conn)
+    new_mapping = cluster_values(counts, existing, **kwargs)
+    save_mapping(domain, new_mapping, engine, conn)
+
+    mapping = {**existing, **new_mapping}
+    changed = sum(1 for raw in counts if mapping.get(raw, raw) != raw)
+    canonical = len({mapping.get(raw, raw) for raw in counts} - {None})
+    logger.info(f"✅ '{domain}' resolved: {len(counts)} distinct values -> {canonical} canonical "
+                f"({changed} remapped, {len(new_mapping)} new mappings saved)")
+    return mapping
+
+
+def resolve_values(series, domain, sep=",", engine=None, **kwargs):
+    """resolve_counts de uma coluna inteira em memória"""
+    return resolve_counts(count_values(series, sep), domain, engine, **kwargs)
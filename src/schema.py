@@ -0,0 +1,373 @@
+# src/schema.py
+
+from collections import namedtuple
+
+from src.lazy import lazy_import
+
+pd = lazy_import("pandas")
+pa = lazy_import("pyarrow")
+sa = lazy_import("sqlalchemy")
+
+# kind: varchar | text | smallint | integer | bigint | double | boolean | date | timestamptz | tsvector
+# low_cardinality: lida como dictionary/Categorical no engine pyarrow
+# date_format: formato do texto no CSV bruto (colunas date)
+# generated: expressão de coluna GENERATED ALWAYS ... STORED (não é escrita pelo pandas)
+# default: expressão DEFAULT preenchida pelo banco (coluna fora do CSV e das escritas)
+Column = namedtuple("Column", "name kind length nullable low_cardinality date_format generated default",
+                    defaults=(None, True, False, None, None, None))
+
+# Busca textual: título pesa mais que direção/elenco, que pesam mais que a descrição
+SEARCH_CONFIG = "english"
+_SEARCH_VECTOR = Column("search_vector", "tsvector", generated=(
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(\"title\", '')), 'A') || "
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(\"director\", '') || ' ' || coalesce(\"cast\", '')), 'B') || "
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(\"description\", '')), 'C')"
+))
+
+DATE_ADDED_FORMAT = "%B %d, %Y"
+
+# Particionamento por ano de date_added (RANGE em date_added_year):
+# 0 = sem data, [1, 2000) = anteriores a 2000, uma partição por ano em
+# PARTITION_YEARS e DEFAULT para anos futuros.
+UNDATED_YEAR = 0
+PARTITION_YEARS = range(2000, 2031)
+
+_PARTITION_KEY = Column("date_added_year", "smallint", nullable=False)
+
+_RAW_COLUMNS = [
+    Column("show_id", "varchar", 10, nullable=False),
+    Column("type", "varchar", 16, low_cardinality=True),
+    Column("title", "text"),
+    Column("director", "text"),
+    Column("cast", "text"),
+    Column("country", "text"),
+    Column("date_added", "date", date_format=DATE_ADDED_FORMAT),
+    Column("release_year", "smallint"),
+    Column("rating", "varchar", 16, low_cardinality=True),
+    Column("duration", "varchar", 16, low_cardinality=True),
+    Column("listed_in", "text"),
+    Column("description", "text"),
+]
+
+# Linhagem: colunas preenchidas pela ingestão, que não existem no CSV
+_LINEAGE_COLUMNS = [Column("source_file", "text")]
+# Momento da carga de cada linha da raw: entre linhas repetidas de um show_id vale a
+# carregada por último (raw_select_sql em src/transform.py)
+_INGESTED_AT = Column("ingested_at", "timestamptz", nullable=False, default="now()")
+
+# -----------------------------
+# REGISTRY
+# -----------------------------
+# Fonte única do formato das tabelas: DDL, dtypes de leitura e dtype= do to_sql.
+# Texto livre e colunas multivaloradas ficam TEXT (no PostgreSQL não ocupa mais
+# que VARCHAR); chaves e códigos curtos recebem VARCHAR(n).
+
+TABLES = {
+    # tabela de pouso: sem PK (arquivos regionais repetem show_id); o transform lê uma
+    # linha por show_id, a de ingested_at mais recente
+    "netflix_raw": {
+        "columns": _RAW_COLUMNS + _LINEAGE_COLUMNS + [_INGESTED_AT],
+        "primary_key": None,
+        # transform incremental: linhas novas por ingested_at, releitura dos títulos por show_id
+        "indexes": [("btree", ["ingested_at"]), ("btree", ["show_id"])],
+    },
+    # a PK de tabela particionada precisa incluir a chave de partição;
+    # a unicidade de show_id sozinho é verificada pelo DQ (src/quality.py)
+    "titles_clean": {
+        "columns": _RAW_COLUMNS + [
+            Column("duration_value", "smallint"),
+            Column("duration_unit", "varchar", 16, low_cardinality=True),
+            _PARTITION_KEY,
+            *_LINEAGE_COLUMNS,
+            _SEARCH_VECTOR,
+        ],
+        "primary_key": ["show_id", "date_added_year"],
+        "partition_by": "date_added_year",
+        "indexes": [("gin", ["search_vector"])],
+    },
+    # tabelas ponte particionadas igual a titles_clean (FK composta por partição)
+    "titles_by_country": {
+        "columns": [
+            Column("show_id", "varchar", 10, nullable=False),
+            _PARTITION_KEY,
+            Column("country", "text"),
+        ],
+        "primary_key": None,
+        "partition_by": "date_added_year",
+        # show_id: apagar as linhas de um título (transform incremental, FK ON DELETE CASCADE)
+        "indexes": [("btree", ["country", "show_id"]), ("btree", ["show_id"])],
+    },
+    "titles_by_genre": {
+        "columns": [
+            Column("show_id", "varchar", 10, nullable=False),
+            _PARTITION_KEY,
+            Column("listed_in", "text"),
+            Column("genre", "text"),
+        ],
+        "primary_key": None,
+        "partition_by": "date_added_year",
+        "indexes": [("btree", ["genre", "show_id"]), ("btree", ["show_id"])],
+    },
+    # mapeamento persistido variante -> canônico (src/resolve.py); canonical NULL = descartar
+    "value_mapping": {
+        "columns": [
+            Column("domain", "varchar", 32, nullable=False),
+            Column("raw_value", "text", nullable=False),
+            Column("canonical", "text"),
+        ],
+        "primary_key": ["domain", "raw_value"],
+    },
+    # linha única com a versão do dataset publicado; invalida caches (src/queries.py)
+    "dataset_version": {
+        "columns": [
+            Column("id", "smallint", nullable=False),
+            Column("version", "integer", nullable=False),
+            Column("updated_at", "timestamptz", nullable=False),
+        ],
+        "primary_key": ["id"],
+    },
+    # estado de cada arquivo da ingestão multi-arquivo (src/ingest_files.py)
+    "ingest_files": {
+        "columns": [
+            Column("source_file", "text", nullable=False),
+            Column("content_hash", "varchar", 64, nullable=False),
+            Column("size_bytes", "bigint"),
+            Column("status", "varchar", 16, nullable=False),
+            Column("rows", "integer"),
+            Column("error", "text"),
+            Column("updated_at", "timestamptz", nullable=False),
+        ],
+        "primary_key": ["source_file"],
+    },
+    # checkpoint da ingestão retomável (src/ingest_resume.py): até onde o arquivo já foi gravado
+    "ingest_checkpoints": {
+        "columns": [
+            Column("source_file", "text", nullable=False),
+            Column("table_name", "varchar", 63, nullable=False),
+            Column("fingerprint", "varchar", 64, nullable=False),
+            Column("byte_offset", "bigint", nullable=False),
+            Column("line_number", "bigint", nullable=False),
+            Column("rows_loaded", "bigint", nullable=False),
+            Column("rows_quarantined", "bigint", nullable=False),
+            Column("status", "varchar", 16, nullable=False),
+            Column("updated_at", "timestamptz", nullable=False),
+        ],
+        "primary_key": ["source_file", "table_name"],
+    },
+    # maior ingested_at da raw já transformado (watermark do transform incremental, src/transform.py)
+    "transform_state": {
+        "columns": [
+            Column("table_name", "varchar", 63, nullable=False),
+            Column("watermark", "timestamptz"),
+            Column("updated_at", "timestamptz", nullable=False),
+        ],
+        "primary_key": ["table_name"],
+    },
+    # show_ids apagados da raw desde a última transformação (gatilho instalado por src/transform.py)
+    "raw_deletions": {
+        "columns": [
+            Column("table_name", "varchar", 63, nullable=False),
+            Column("show_id", "varchar", 10, nullable=False),
+            Column("deleted_at", "timestamptz", nullable=False),
+        ],
+        "primary_key": None,
+    },
+    # resultado de cada regra de DQ por execução (src/quality.py), append
+    "dq_results": {
+        "columns": [
+            Column("run_id", "varchar", 32, nullable=False),
+            Column("checked_at", "timestamptz", nullable=False),
+            Column("table_name", "varchar", 63, nullable=False),
+            Column("rule", "varchar", 32, nullable=False),
+            Column("columns", "text", nullable=False),
+            Column("checked_rows", "bigint"),
+            Column("failed_rows", "bigint"),
+            Column("failure_rate", "double"),
+            Column("sampled", "boolean"),
+            Column("passed", "boolean"),
+        ],
+        "primary_key": ["run_id", "table_name", "rule", "columns"],
+    },
+    # linhas rejeitadas na ingestão retomável, com o motivo
+    "ingest_quarantine": {
+        "columns": [
+            Column("source_file", "text", nullable=False),
+            Column("table_name", "varchar", 63, nullable=False),
+            Column("byte_offset", "bigint", nullable=False),
+            Column("line_number", "bigint"),
+            Column("raw_row", "text"),
+            Column("reason", "text"),
+            Column("created_at", "timestamptz", nullable=False),
+        ],
+        "primary_key": None,
+    },
+}
+
+
+def get_columns(table_name):
+    """Colunas (Column) registradas para a tabela"""
+    try:
+        return TABLES[table_name]["columns"]
+    except KeyError:
+        raise KeyError(f"Table '{table_name}' is not in the schema registry") from None
+
+
+def column_names(table_name):
+    return [col.name for col in get_columns(table_name)]
+
+
+def csv_column_names(table_name):
+    """Colunas esperadas no CSV de origem (sem linhagem nem colunas geradas ou com DEFAULT)"""
+    lineage = {col.name for col in _LINEAGE_COLUMNS}
+    return [col.name for col in get_columns(table_name)
+            if col.name not in lineage and not col.generated and not col.default]
+
+
+# -----------------------------
+# DDL
+# -----------------------------
+
+def _sql_type(col):
+    if col.kind == "varchar":
+        return f"VARCHAR({col.length})"
+    if col.kind == "double":
+        return "DOUBLE PRECISION"
+    return col.kind.upper()
+
+
+def create_table_ddl(table_name, with_primary_key=True, if_not_exists=False):
+    """CREATE TABLE gerado a partir do registro (identificadores entre aspas: "cast" é reservado)"""
+    lines = [f'"{col.name}" {_sql_type(col)}{"" if col.nullable else " NOT NULL"}'
+             + (f" GENERATED ALWAYS AS ({col.generated}) STORED" if col.generated else "")
+             + (f" DEFAULT {col.default}" if col.default else "")
+             for col in get_columns(table_name)]
+    primary_key = TABLES[table_name]["primary_key"]
+    if with_primary_key and primary_key:
+        lines.append("PRIMARY KEY (" + ", ".join(f'"{c}"' for c in primary_key) + ")")
+    exists = "IF NOT EXISTS " if if_not_exists else ""
+    ddl = f'CREATE TABLE {exists}"{table_name}" (\n    ' + ",\n    ".join(lines) + "\n)"
+    partition_by = TABLES[table_name].get("partition_by")
+    if partition_by:
+        ddl += f' PARTITION BY RANGE ("{partition_by}")'
+    return ddl
+
+
+def add_default_columns_ddl(table_name):
+    """ALTER TABLE das colunas com DEFAULT (tabelas criadas antes delas; linhas antigas recebem o default)"""
+    return [f'ALTER TABLE "{table_name}" ADD COLUMN IF NOT EXISTS "{col.name}" {_sql_type(col)}'
+            f'{"" if col.nullable else " NOT NULL"} DEFAULT {col.default}'
+            for col in get_columns(table_name) if col.default]
+
+
+def partition_name(table_name, year):
+    """Partição que guarda `year` (date_added_year); None = partição DEFAULT"""
+    if year is None:
+        return f"{table_name}_default"
+    if year == UNDATED_YEAR:
+        return f"{table_name}_undated"
+    if year < PARTITION_YEARS.start:
+        return f"{table_name}_pre{PARTITION_YEARS.start}"
+    if year in PARTITION_YEARS:
+        return f"{table_name}_y{year}"
+    return f"{table_name}_default"
+
+
+def partition_bounds(year):
+    """Intervalo [início, fim) de date_added_year da partição que guarda `year` (fim None = DEFAULT)"""
+    if year == UNDATED_YEAR:
+        return UNDATED_YEAR, UNDATED_YEAR + 1
+    if year < PARTITION_YEARS.start:
+        return UNDATED_YEAR + 1, PARTITION_YEARS.start
+    if year in PARTITION_YEARS:
+        return year, year + 1
+    return PARTITION_YEARS.stop, None
+
+
+def partition_ddl(table_name, if_not_exists=False):
+    """CREATE TABLE ... PARTITION OF para todas as partições da tabela"""
+    if not TABLES[table_name].get("partition_by"):
+        return []
+    exists = "IF NOT EXISTS " if if_not_exists else ""
+    years = [UNDATED_YEAR, UNDATED_YEAR + 1, *PARTITION_YEARS]
+    statements = [f'CREATE TABLE {exists}"{partition_name(table_name, year)}" PARTITION OF "{table_name}" '
+                  f'FOR VALUES FROM ({partition_bounds(year)[0]}) TO ({partition_bounds(year)[1]})'
+                  for year in years]
+    statements.append(f'CREATE TABLE {exists}"{partition_name(table_name, None)}" '
+                      f'PARTITION OF "{table_name}" DEFAULT')
+    return statements
+
+
+def index_ddl(table_name):
+    """CREATE INDEX das colunas indexadas da tabela (em tabela particionada, vale para todas as partições)"""
+    statements = []
+    for method, columns in TABLES[table_name].get("indexes", []):
+        name = f"idx_{table_name}_" + "_".join(columns)
+        column_list = ", ".join(f'"{c}"' for c in columns)
+        statements.append(f'CREATE INDEX IF NOT EXISTS "{name}" ON "{table_name}" USING {method.upper()} ({column_list})')
+    return statements
+
+
+def render_sql(header=""):
+    """Script SQL com o DDL de todas as tabelas registradas (e suas partições)"""
+    statements = []
+    for table_name in TABLES:
+        statements.append(create_table_ddl(table_name) + ";")
+        for group in (partition_ddl(table_name), index_ddl(table_name)):
+            if group:
+                statements.append("\n".join(ddl + ";" for ddl in group))
+    return header + "\n\n".join(statements) + "\n"
+
+
+def recreate_table(conn, table_name, with_primary_key=True):
+    """DROP ... CASCADE + CREATE (com partições) em uma conexão SQLAlchemy; as FKs são recriadas depois"""
+    conn.execute(sa.text(f'DROP TABLE IF EXISTS "{table_name}" CASCADE'))
+    conn.execute(sa.text(create_table_ddl(table_name, with_primary_key)))
+    for ddl in partition_ddl(table_name):
+        conn.execute(sa.text(ddl))
+
+
+# -----------------------------
+# DTYPES
+# -----------------------------
+
+def sqlalchemy_dtypes(table_name):
+    """Mapeamento para to_sql(dtype=...)"""
+    types = {"text": sa.Text, "smallint": sa.SmallInteger, "integer": sa.Integer, "bigint": sa.BigInteger,
+             "double": sa.Double, "boolean": sa.Boolean, "date": sa.Date,
+             "timestamptz": lambda: sa.DateTime(timezone=True)}
+    return {col.name: sa.String(col.length) if col.kind == "varchar" else types[col.kind]()
+            for col in get_columns(table_name) if not col.generated}
+
+
+def arrow_csv_types(table_name):
+    """column_types do pyarrow.csv; datas ficam texto e são convertidas após o parse"""
+    types = {"smallint": pa.int16(), "integer": pa.int32(), "bigint": pa.int64()}
+    return {col.name: pa.dictionary(pa.int32(), pa.string()) if col.low_cardinality
+            else types.get(col.kind, pa.string())
+            for col in get_columns(table_name)}
+
+
+def date_formats(table_name):
+    """{coluna: formato} das colunas de data lidas como texto"""
+    return {col.name: col.date_format for col in get_columns(table_name) if col.kind == "date"}
+
+
+def coerce_frame(df, table_name):
+    """
+    Ajusta as colunas do DataFrame aos tipos do registro antes da escrita:
+    datas em texto -> datetime (strip + formato, inválidas viram NaT),
+    inteiros -> Int16/Int32/Int64 nullable. Colunas fora do registro são mantidas.
+    """
+    int_dtypes = {"smallint": "Int16", "integer": "Int32", "bigint": "Int64"}
+    for col in get_columns(table_name):
+        if col.name not in df.columns:
+            continue
+        values = df[col.name]
+        if col.kind == "date" and not pd.api.types.is_datetime64_any_dtype(values.dtype):
+            if pd.api.types.infer_dtype(values, skipna=True) in ("string", "empty"):
+                values = pd.to_datetime(values.astype("string").str.strip(), format=col.date_format,
+                                        errors="coerce")
+            df[col.name] = pd.to_datetime(values, errors="coerce")
+        elif col.kind in int_dtypes and values.dtype != int_dtypes[col.kind]:
+            df[col.name] = values.astype(int_dtypes[col.kind])
+    return df
@@ -0,0 +1,75 @@
+# src/search.py
+
+import logging
+
+from src.db import get_engine
+from src.lazy import lazy_import
+from src.schema import SEARCH_CONFIG
+
+sa = lazy_import("sqlalchemy")
+
+logger = logging.getLogger(__name__)
+
+MAX_PAGE_SIZE = 100
+
+
+def _search_query(type_=None, country=None, genre=None):
+    """SQL da busca com os filtros opcionais (as tabelas ponte entram via EXISTS, sem duplicar títulos)"""
+    filters = ["t.search_vector @@ q.tsq"]
+    if type_:
+        filters.append("t.type = :type")
+    if country:
+        filters.append("""EXISTS (SELECT 1 FROM titles_by_country c
+                   WHERE c.country = :country AND c.show_id = t.show_id
+                     AND c.date_added_year = t.date_added_year)""")
+    if genre:
+        filters.append("""EXISTS (SELECT 1 FROM titles_by_genre g
+                   WHERE g.genre = :genre AND g.show_id = t.show_id
+                     AND g.date_added_year = t.date_added_year)""")
+    # total vem de um count(*) sobre todos os resultados, independente do OFFSET:
+    # uma página depois da última volta sem linhas de resultado, mas com o total real
+    return f"""
+        WITH q AS (SELECT websearch_to_tsquery('{SEARCH_CONFIG}', :query) AS tsq),
+        matches AS (
+            SELECT t.show_id, t.title, t.type, t.release_year, t.date_added, t.description,
+                   ts_rank_cd(t.search_vector, q.tsq) AS rank
+            FROM titles_clean t, q
+            WHERE {' AND '.join(filters)}
+        )
+        SELECT n.total, p.*
+        FROM (SELECT COUNT(*) AS total FROM matches) n
+        LEFT JOIN LATERAL (
+            SELECT * FROM matches ORDER BY rank DESC, show_id LIMIT :limit OFFSET :offset
+        ) p ON true
+    """
+
+
+def search_titles(query, type=None, country=None, genre=None, page=1, page_size=20, engine=None):
+    """
+    Busca textual no catálogo (título, direção, elenco e descrição) usando o
+    tsvector gerado de titles_clean e o índice GIN.
+    - query: sintaxe de busca web ("frase exata", -termo, or)
+    - type/country/genre: filtros exatos (valores normalizados em minúsculas)
+    - page/page_size: paginação a partir de 1
+    Retorna dict com total, page, page_size e results (ordenados por relevância).
+    """
+    page = max(int(page), 1)
+    page_size = min(max(int(page_size), 1), MAX_PAGE_SIZE)
+    params = {
+        "query": query,
+        "type": type.strip().lower() if type else None,
+        "country": country.strip().lower() if country else None,
+        "genre": genre.strip().lower() if genre else None,
+        "limit": page_size,
+        "offset": (page - 1) * page_size,
+    }
+    sql = _search_query(params["type"], params["country"], params["genre"])
+    with (engine or get_engine()).connect() as conn:
+        rows = [dict(row) for row in conn.execute(sa.text(sql), params).mappings()]
+
+    total = rows[0]["total"] if rows else 0
+    rows = [row for row in rows if row["show_id"] is not None]  # página vazia: só a linha do total
+    for row in rows:
+        row.pop("total")
+    logger.info(f"Search '{query}' page {page}: {len(rows)} of {total} results")
+    return {"total": total, "page": page, "page_size": page_size, "results": rows}
@@ -0,0 +1,66 @@
+# src/strings.py
+
+from src.lazy import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+pa = lazy_import("pyarrow")
+pc = lazy_import("pyarrow.compute")
+
+
+def is_arrow_string(series):
+    """True quando a Series é uma coluna de texto Arrow (dtype_backend='pyarrow')"""
+    return isinstance(series.dtype, pd.ArrowDtype) and pa.types.is_string(series.dtype.pyarrow_dtype)
+
+
+def _to_arrow(series):
+    return pa.array(series)
+
+
+def _from_arrow(array, index):
+    return pd.Series(array, index=index, dtype=pd.ArrowDtype(array.type))
+
+
+def normalize_text(series):
+    """lower + strip; em colunas Arrow usa os kernels utf8_lower/utf8_trim_whitespace"""
+    if is_arrow_string(series):
+        lowered = pc.utf8_lower(_to_arrow(series))
+        return _from_arrow(pc.utf8_trim_whitespace(lowered), series.index)
+    return series.str.lower().str.strip()
+
+
+def split_flatten(values, sep=","):
+    """
+    Split + trim vetorizado (kernels Arrow) de um pa.Array de texto.
+    Retorna (parents, flat): para cada valor gerado, o índice da linha de origem.
+    Linhas nulas geram um único valor nulo, como o explode do pandas.
+    """
+    lists = pc.split_pattern(values, pattern=sep)
+    flat = pc.utf8_trim_whitespace(pc.list_flatten(lists))
+    parents = pc.list_parent_indices(lists).to_numpy()
+
+    null_rows = np.flatnonzero(pc.is_null(lists).to_numpy(zero_copy_only=False))
+    if len(null_rows):
+        parents = np.concatenate([parents, null_rows])
+        flat = pa.concat_arrays([flat, pa.nulls(len(null_rows), flat.type)])
+        order = np.argsort(parents, kind="stable")
+        parents, flat = parents[order], flat.take(pa.array(order))
+    return parents, flat
+
+
+def split_explode(frame, source, target, sep=","):
+    """
+    Equivalente a frame.assign(target=frame[source].str.split(sep)).explode(target)
+    seguido de strip nos valores. Em colunas Arrow o split/flatten/trim é feito com
+    kernels Arrow, sem criar listas Python.
+    """
+    values = frame[source]
+    if not is_arrow_string(values):
+        exploded = frame.assign(**{target: values.str.split(sep)}).explode(target)
+        exploded[target] = exploded[target].str.strip()
+        return exploded
+
+    parents, flat = split_flatten(_to_arrow(values), sep)
+    exploded = frame.take(parents)
+    exploded[target] = _from_arrow(flat, exploded.index)
+    return exploded
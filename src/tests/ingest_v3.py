@@ -5,6 +5,8 @@ from sqlalchemy.exc import SQLAlchemyError
 import difflib
 import re
 from typing import List, Dict, Optional, Tuple
+from src.batching import batched_to_sql, log_batch_sizes
+from src.dedupe import StreamingDeduper
 
 # -------------------------
 # Leitura do CSV (robusta)
@@ -172,16 +174,21 @@ def validate_and_coerce_types(df: pd.DataFrame,
 # -------------------------
 # Checagens simples de integridade
 # -------------------------
-def check_primary_key(df: pd.DataFrame, pk: str) -> Dict[str, int]:
+def check_primary_key(df: pd.DataFrame, pk: str, deduper: Optional[StreamingDeduper] = None) -> Dict[str, int]:
     """
     Verifica nulls e duplicados na coluna pk.
+    - deduper: StreamingDeduper compartilhado entre chunks; detecta também
+      duplicados que aparecem em chunks diferentes.
     Retorna dict {'nulls': int, 'duplicates': int}
     """
     if pk not in df.columns:
         raise KeyError(f"Primary key column '{pk}' not found in dataframe.")
 
     nulls = int(df[pk].isna().sum())
-    duplicates = int(df.duplicated(subset=[pk]).sum())
+    if deduper is not None:
+        duplicates = int(deduper.flag(df, pk).sum())
+    else:
+        duplicates = int(df.duplicated(subset=[pk]).sum())
 
     if nulls > 0 or duplicates > 0:
         msg = f"Primary key '{pk}' integrity issue -> nulls: {nulls}, duplicates: {duplicates}"
@@ -195,9 +202,17 @@ def check_primary_key(df: pd.DataFrame, pk: str) -> Dict[str, int]:
 # Ingestão para PostgreSQL (melhor performance com chunks)
 # -------------------------
 def ingest_to_postgres(df: pd.DataFrame, engine, table_name: str,
-                       if_exists: str = 'replace', chunksize: int = 5000, method: Optional[str] = 'multi'):
+                       if_exists: str = 'replace', chunksize: Optional[int] = None, method: Optional[str] = 'multi'):
+    """
+    chunksize=None: lote ajustado pela vazão medida (src/batching.py), limitado ao
+    número de parâmetros por INSERT quando method='multi'.
+    """
     try:
-        df.to_sql(table_name, engine, if_exists=if_exists, index=False, chunksize=chunksize, method=method)
+        if chunksize is None:
+            batched_to_sql(df, table_name, engine, if_exists=if_exists, method=method)
+            log_batch_sizes()
+        else:
+            df.to_sql(table_name, engine, if_exists=if_exists, index=False, chunksize=chunksize, method=method)
         logging.info(f"Data ingested into table '{table_name}' (rows: {len(df)})")
     except SQLAlchemyError as e:
         logging.exception(f"Error ingesting data: {e}")
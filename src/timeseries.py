@@ -0,0 +1,152 @@
+# src/timeseries.py
+
+import logging
+
+from src import queries
+from src.lazy import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+logger = logging.getLogger(__name__)
+
+# Pontos enviados ao renderizador por série: perto da largura do gráfico em pixels,
+# mais pontos que isso não aparecem na tela e só pesam na serialização
+MAX_POINTS = 1000
+# Acima disso as séries do plotly usam WebGL (scattergl) em vez de SVG
+WEBGL_THRESHOLD = 5000
+DOWNSAMPLE_METHODS = ("lttb", "minmax")
+
+# Duração aproximada de cada granularidade de queries.trend, em dias
+GRANULARITY_DAYS = {"day": 1, "week": 7, "month": 30.44}
+
+
+# -----------------------------
+# DOWNSAMPLING
+# -----------------------------
+
+def _as_float(values):
+    """Eixo x numérico (datas viram nanossegundos) para as contas de área/bucket"""
+    values = pd.Series(values)
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values.astype("int64").to_numpy(dtype=float)
+    return values.to_numpy(dtype=float)
+
+
+def lttb_indices(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets: mantém o primeiro e o último ponto e, em cada um
+    dos n_out - 2 buckets, o ponto que forma o maior triângulo com o ponto escolhido
+    no bucket anterior e a média do próximo. Preserva a forma visual (picos e vales).
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x, y = _as_float(x), np.asarray(y, dtype=float)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)  # n_out - 2 buckets entre as pontas
+    selected = np.empty(n_out, dtype=int)
+    selected[0], selected[-1] = 0, n - 1
+    prev = 0
+    for i in range(n_out - 2):
+        start, stop = edges[i], edges[i + 1]
+        next_start, next_stop = stop, edges[i + 2] if i + 2 < len(edges) else n
+        avg_x, avg_y = x[next_start:next_stop].mean(), y[next_start:next_stop].mean()
+        area = np.abs((x[prev] - avg_x) * (y[start:stop] - y[prev])
+                      - (x[prev] - x[start:stop]) * (avg_y - y[prev]))
+        prev = start + int(area.argmax())
+        selected[i + 1] = prev
+    return selected
+
+
+def minmax_indices(y, n_out):
+    """
+    Primeiro e último ponto mais o mínimo e o máximo de cada um de (n_out - 2) / 2 buckets,
+    em ordem: mantém todos os extremos (bom para picos isolados e para desenhar na
+    largura exata do gráfico) e, como no LTTB, as pontas da série.
+    """
+    n = len(y)
+    if n_out >= n or n_out < 2:
+        return np.arange(n)
+    y = np.asarray(y, dtype=float)
+    edges = np.unique(np.linspace(0, n, (n_out - 2) // 2 + 1).astype(int))
+    picked = [0, n - 1]
+    for start, stop in zip(edges[:-1], edges[1:]):
+        bucket = y[start:stop]
+        picked += [start + int(bucket.argmin()), start + int(bucket.argmax())]
+    return np.unique(picked)
+
+
+def downsample(df, x, y, max_points=MAX_POINTS, method="lttb"):
+    """Linhas de `df` (ordenado por x) reduzidas a no máximo ~max_points pelo método escolhido"""
+    if max_points is None or len(df) <= max_points:
+        return df
+    if method == "lttb":
+        indices = lttb_indices(df[x], df[y], max_points)
+    elif method == "minmax":
+        indices = minmax_indices(df[y], max_points)
+    else:
+        raise ValueError(f"Unknown downsample method '{method}' (use one of {DOWNSAMPLE_METHODS})")
+    return df.iloc[indices]
+
+
+# -----------------------------
+# VIEWPORT
+# -----------------------------
+
+def pick_granularity(start, end, max_points=MAX_POINTS):
+    """Granularidade mais fina (dia, semana, mês) cuja série na janela cabe em max_points"""
+    if start is None or end is None:
+        return "month"
+    days = (pd.Timestamp(end) - pd.Timestamp(start)).days
+    for granularity, bucket_days in GRANULARITY_DAYS.items():
+        if days / bucket_days <= max_points:
+            return granularity
+    return "month"
+
+
+def parse_relayout(relayout):
+    """
+    Janela do eixo x a partir do relayoutData do dcc.Graph: (início, fim) após zoom/pan,
+    (None, None) quando o eixo volta ao autorange e None se o evento não mexe no eixo x.
+    """
+    if not relayout:
+        return None
+    if relayout.get("xaxis.autorange"):
+        return None, None
+    if "xaxis.range[0]" in relayout and "xaxis.range[1]" in relayout:
+        return pd.Timestamp(relayout["xaxis.range[0]"]), pd.Timestamp(relayout["xaxis.range[1]"])
+    if "xaxis.range" in relayout:
+        start, end = relayout["xaxis.range"]
+        return pd.Timestamp(start), pd.Timestamp(end)
+    return None
+
+
+def viewport_trend(start=None, end=None, type=None, max_points=MAX_POINTS, method="lttb", granularity=None):
+    """
+    Série de títulos adicionados (queries.trend) para a janela visível: a granularidade
+    segue o tamanho da janela (zoom re-consulta em resolução mais fina) e o resultado
+    passa por downsample se ainda tiver mais que max_points.
+    Retorna (DataFrame period/total_titles, granularidade usada).
+    """
+    granularity = granularity or pick_granularity(start, end, max_points)
+    series = queries.trend(granularity, start, end, type)
+    reduced = downsample(series, "period", "total_titles", max_points, method)
+    if len(reduced) < len(series):
+        logger.info(f"Trend downsampled ({method}): {len(series)} -> {len(reduced)} points at '{granularity}'")
+    return reduced, granularity
+
+
+# -----------------------------
+# PLOTLY TRACES
+# -----------------------------
+
+def trace_type(n_points, threshold=WEBGL_THRESHOLD):
+    """'scattergl' (WebGL) acima de `threshold` pontos, senão 'scatter' (SVG)"""
+    return "scattergl" if n_points > threshold else "scatter"
+
+
+def line_trace(df, x, y, threshold=WEBGL_THRESHOLD, **kwargs):
+    """Trace do plotly (dict) de uma série já reduzida, em WebGL quando grande"""
+    trace = {"type": trace_type(len(df), threshold), "mode": "lines", "x": df[x].tolist(), "y": df[y].tolist()}
+    trace.update(kwargs)
+    return trace
@@ -1,49 +1,200 @@
 # src/transform.py
 
-import pandas as pd
-from sqlalchemy import text
-from sqlalchemy.exc import SQLAlchemyError
-from src.db import create_engine_postgres
-from src.config import load_env
+import functools
+import logging
+import os
+import time
+from collections import Counter
+from src.batching import batched_to_sql, log_batch_sizes
+from src.bridge import copy_bridge_batches, write_bridge_table
+from src.config import get_dtype_backend
+from src.db import get_engine
+from src.lazy import lazy_import
 from src.logger import setup_logger
+from src.pipeline import Stage, run_pipeline
+from src.quality import QualityRun, log_results
+from src.queries import bump_dataset_version
+from src.resolve import count_values, resolve_counts
+from src.schema import (DATE_ADDED_FORMAT, TABLES, UNDATED_YEAR, add_default_columns_ddl, coerce_frame, create_table_ddl,
+                        get_columns, index_ddl, partition_bounds, partition_name, recreate_table, sqlalchemy_dtypes)
+from src.strings import normalize_text
 
 # -------------------------------------
 # INITIAL SETUP
 # -------------------------------------
 
-logger = setup_logger()
-load_env()
-engine = create_engine_postgres()
+# Import sem efeitos colaterais: .env, logging e engine só são
+# inicializados quando uma função do pipeline é executada.
+pd = lazy_import("pandas")
+sa = lazy_import("sqlalchemy")
 
-chunk_size = 10000  # tamanho do chunk para ingestão escalável
+logger = logging.getLogger(__name__)
+
+chunk_size = 10000  # linhas por chunk lido da raw (o lote de escrita é adaptativo: src/batching.py)
 
 # -----------------------------
 # AUXILIARY FUNCTIONS
 # -----------------------------
 
-def load_raw_table(table_name="netflix_raw"):
-    """Carrega a tabela raw do PostgreSQL"""
-    df = pd.read_sql(f"SELECT * FROM {table_name}", engine)
+def raw_select_sql(table_name="netflix_raw", where=None):
+    """
+    SELECT da raw com uma linha por show_id: a raw não tem PK e arquivos regionais
+    repetem títulos, então vale a linha carregada por último (ingested_at, depois
+    source_file). `where` filtra depois da escolha, para um filtro por data não trazer
+    uma versão antiga do título. ingested_at não faz parte de titles_clean e fica de fora.
+    """
+    registered = table_name if table_name in TABLES else "netflix_raw"
+    columns = ", ".join(f'"{col.name}"' for col in get_columns(registered) if not col.default)
+    latest = (f"SELECT DISTINCT ON (show_id) {columns} FROM {table_name} "
+              f"ORDER BY show_id, ingested_at DESC, source_file DESC NULLS LAST")
+    return f"SELECT * FROM ({latest}) r" + (f" WHERE {where}" if where else "")
+
+
+def ensure_raw_columns(raw_table="netflix_raw"):
+    """
+    Raw carregada antes de ingested_at: a coluna é criada (linhas antigas recebem o default),
+    com os índices de ingested_at e show_id usados pelo transform incremental
+    """
+    if raw_table in TABLES:
+        with get_engine().begin() as conn:
+            for ddl in [*add_default_columns_ddl(raw_table), *index_ddl(raw_table)]:
+                conn.execute(sa.text(ddl))
+
+
+def load_raw_table(table_name="netflix_raw", dtype_backend=None, where=None, params=None):
+    """
+    Carrega a tabela raw do PostgreSQL, uma linha por show_id (raw_select_sql).
+    dtype_backend='pyarrow' lê as colunas de texto como strings Arrow (padrão: DTYPE_BACKEND).
+    where/params: filtro opcional com parâmetros (ex: recarga de uma partição).
+    """
+    dtype_backend = dtype_backend or get_dtype_backend()
+    read_kwargs = {"dtype_backend": dtype_backend} if dtype_backend else {}
+    df = pd.read_sql(sa.text(raw_select_sql(table_name, where)), get_engine(), params=params, **read_kwargs)
     logger.info(f"✅ Loaded raw table with {df.shape[0]} rows and {df.shape[1]} columns")
     return df
 
 
-def clean_titles(df):
-    """Executa padronização de colunas e tratamento de valores"""
+# -----------------------------
+# FACTORIZE-THEN-TRANSFORM
+# -----------------------------
+
+CLEAN_CACHE_MAX_SIZE = 50000  # valores distintos guardados por coluna entre chunks
+
+_NA_KEY = ("__na__",)  # chave de cache para valores nulos (NaN != NaN)
+
+
+class TransformCache:
+    """
+    Cache limitado valor -> resultado de uma transformação, compartilhado entre chunks.
+    Ao passar de max_size, descarta as entradas mais antigas (FIFO).
+    """
+
+    def __init__(self, max_size=CLEAN_CACHE_MAX_SIZE):
+        self.max_size = max_size
+        self.columns = None  # colunas do resultado quando a transformação devolve DataFrame
+        self.dtypes = None
+        self._data = {}
+
+    def __len__(self):
+        return len(self._data)
+
+    def lookup(self, keys):
+        found = {}
+        for key in keys:
+            if key in self._data:
+                found[key] = self._data[key]
+        return found
+
+    def store(self, values):
+        self._data.update(values)
+        while len(self._data) > self.max_size:
+            del self._data[next(iter(self._data))]
+
+
+def factorized_transform(series, func, cache=None):
+    """
+    Aplica `func` (vetorizada, Series -> Series/DataFrame) uma vez por valor distinto
+    de `series` e devolve o resultado para todas as linhas via take nos códigos.
+    Com `cache`, valores já vistos em chunks anteriores não são recalculados.
+    """
+    cache = cache if cache is not None else TransformCache(max_size=float("inf"))
+    codes, uniques = pd.factorize(series)
+    keys = list(uniques) + [_NA_KEY]
+
+    results = cache.lookup(keys)
+    missing = [key for key in keys if key not in results]
+    if missing:
+        dtype = series.dtype.categories.dtype if isinstance(series.dtype, pd.CategoricalDtype) else series.dtype
+        inputs = pd.Series([None if key is _NA_KEY else key for key in missing], dtype=dtype)
+        computed = func(inputs)
+        if isinstance(computed, pd.DataFrame):
+            cache.columns = list(computed.columns)
+            cache.dtypes = computed.dtypes.to_dict()
+            new_values = dict(zip(missing, computed.itertuples(index=False, name=None)))
+        else:
+            cache.dtypes = computed.dtype
+            new_values = dict(zip(missing, computed.tolist()))
+        results.update(new_values)
+        cache.store(new_values)
+
+    ordered = [results[key] for key in keys]
+    codes = codes.copy()
+    codes[codes == -1] = len(uniques)  # nulos apontam para o resultado de _NA_KEY
+    if cache.columns is not None:
+        table = pd.DataFrame(ordered, columns=cache.columns).astype(cache.dtypes)
+        return table.take(codes).set_axis(series.index)
+    return pd.Series(ordered, dtype=cache.dtypes).take(codes).set_axis(series.index).rename(series.name)
+
+
+def new_clean_caches(max_size=CLEAN_CACHE_MAX_SIZE):
+    """Caches por coluna do clean_titles, para reaproveitar entre chunks de um stream"""
+    columns = ['date_added', 'duration', 'country', 'rating', 'type', 'listed_in']
+    return {column: TransformCache(max_size) for column in columns}
+
+
+def _parse_date_added(values):
+    """
+    Texto do CSV ('January 11, 2019', às vezes com espaço na frente) com formato fixo:
+    sem inferência pelo primeiro valor, o resultado não depende de onde o chunk é cortado.
+    Valores já tipados (coluna DATE da raw) só são convertidos.
+    """
+    if pd.api.types.infer_dtype(values, skipna=True) in ("string", "empty"):
+        return pd.to_datetime(values.astype("string").str.strip(), format=DATE_ADDED_FORMAT, errors='coerce')
+    return pd.to_datetime(values, errors='coerce')
+
+
+def _extract_duration(values):
+    extracted = values.str.extract(r'(?P<duration_value>\d+)\s*(?P<duration_unit>\w+)')
+    extracted['duration_value'] = extracted['duration_value'].astype('Int64')
+    return extracted
+
+
+def clean_titles(df, caches=None):
+    """
+    Executa padronização de colunas e tratamento de valores.
+    As transformações rodam uma vez por valor distinto (factorized_transform);
+    em streaming, passe o mesmo `caches` (new_clean_caches) para todos os chunks.
+    """
+    caches = caches or {}
     df.columns = [col.lower() for col in df.columns]
     logger.info("✅ Column names converted to snake_case")
 
-    df['date_added'] = pd.to_datetime(df['date_added'], errors='coerce')
+    df['date_added'] = factorized_transform(df['date_added'], _parse_date_added, caches.get('date_added'))
     logger.info("✅ date_added converted to datetime")
 
-    df[['duration_value', 'duration_unit']] = df['duration'].str.extract(r'(\d+)\s*(\w+)')
-    df['duration_value'] = df['duration_value'].astype('Int64')
+    # chave de partição de titles_clean: ano de date_added, UNDATED_YEAR (0) quando sem data
+    df['date_added_year'] = df['date_added'].dt.year.fillna(UNDATED_YEAR).astype('int16')
+
+    df[['duration_value', 'duration_unit']] = factorized_transform(
+        df['duration'], _extract_duration, caches.get('duration'))
     logger.info("✅ duration split into duration_value and duration_unit")
 
-    df['country'] = df['country'].fillna('not_specified').str.lower().str.strip()
-    df['rating'] = df['rating'].fillna('not_rated').str.lower().str.strip()
-    df['type'] = df['type'].str.lower().str.strip()
-    df['listed_in'] = df['listed_in'].str.lower().str.strip()
+    df['country'] = factorized_transform(
+        df['country'], lambda v: normalize_text(v.fillna('not_specified')), caches.get('country'))
+    df['rating'] = factorized_transform(
+        df['rating'], lambda v: normalize_text(v.fillna('not_rated')), caches.get('rating'))
+    df['type'] = factorized_transform(df['type'], normalize_text, caches.get('type'))
+    df['listed_in'] = factorized_transform(df['listed_in'], normalize_text, caches.get('listed_in'))
     logger.info("✅ Missing values filled and categorical columns normalized")
 
     logger.info("✅ Columns cleaned and normalized")
@@ -53,68 +204,156 @@ def clean_titles(df):
 def save_clean_table(df, table_name="titles_clean"):
     """Salva tabela limpa no PostgreSQL"""
     try:
-        df.to_sql(table_name, engine, if_exists='replace', index=False, chunksize=chunk_size)
+        # DROP ... CASCADE: as FKs das tabelas ponte são recriadas em create_foreign_keys
+        with get_engine().begin() as conn:
+            recreate_table(conn, table_name, with_primary_key=False)
+        batched_to_sql(coerce_frame(df, table_name), table_name, get_engine(), dtype=sqlalchemy_dtypes(table_name))
         logger.info(f"✅ '{table_name}' saved in PostgreSQL with {df.shape[0]} records")
-    except SQLAlchemyError as e:
+    except sa.exc.SQLAlchemyError as e:
         logger.error(f"❌ Failed to save '{table_name}': {e}")
         raise
 
 
+# -----------------------------
+# PIPELINED LOAD -> CLEAN -> SAVE
+# -----------------------------
+
+TRANSFORM_WRITE_WORKERS = 2
+_worker_caches = None  # caches do clean_titles por processo do estágio "clean"
+
+
+def _iter_query_chunks(query, chunk_rows=chunk_size, dtype_backend=None):
+    dtype_backend = dtype_backend or get_dtype_backend()
+    read_kwargs = {"dtype_backend": dtype_backend} if dtype_backend else {}
+    with get_engine().connect().execution_options(stream_results=True) as conn:
+        yield from pd.read_sql(sa.text(query), conn, chunksize=chunk_rows, **read_kwargs)
+
+
+def iter_raw_chunks(table_name="netflix_raw", chunk_rows=chunk_size, dtype_backend=None):
+    """Lê a raw (uma linha por show_id) em chunks com cursor no servidor, sem carregá-la inteira"""
+    yield from _iter_query_chunks(raw_select_sql(table_name), chunk_rows, dtype_backend)
+
+
+def iter_clean_chunks(table_name="titles_clean", chunk_rows=chunk_size, dtype_backend=None):
+    """
+    Relê a tabela limpa em chunks com cursor no servidor (sem search_vector): após o
+    transform em pipeline, DQ e tabelas ponte trabalham sobre ela sem carregá-la inteira
+    """
+    columns = ", ".join(f'"{col.name}"' for col in get_columns(table_name) if not col.generated)
+    yield from _iter_query_chunks(f"SELECT {columns} FROM {table_name}", chunk_rows, dtype_backend)
+
+
+def _clean_chunk(df):
+    global _worker_caches
+    if _worker_caches is None:
+        _worker_caches = new_clean_caches()
+    return clean_titles(df, _worker_caches)
+
+
+def _write_clean_chunk(df, table_name):
+    return batched_to_sql(coerce_frame(df, table_name), table_name, get_engine(), dtype=sqlalchemy_dtypes(table_name))
+
+
+def clean_and_save_pipelined(raw_table="netflix_raw", table_name="titles_clean", chunk_rows=chunk_size,
+                             clean_workers=None, write_workers=TRANSFORM_WRITE_WORKERS):
+    """
+    Leitura da raw, clean_titles e gravação em titles_clean como estágios paralelos
+    (src/pipeline.py): leitura em thread, limpeza em processos e escrita em threads,
+    ligados por filas limitadas. Cada chunk é descartado após a gravação: o estágio de
+    escrita devolve só as linhas gravadas (para reler a tabela: iter_clean_chunks).
+    Retorna (linhas gravadas, relatório de utilização).
+    """
+    with get_engine().begin() as conn:
+        recreate_table(conn, table_name, with_primary_key=False)
+    stages = [
+        Stage("clean", _clean_chunk, "process", clean_workers or max(1, (os.cpu_count() or 2) - 1)),
+        Stage("write", functools.partial(_write_clean_chunk, table_name=table_name), "thread", write_workers),
+    ]
+    written, report = run_pipeline(iter_raw_chunks(raw_table, chunk_rows), stages)
+    rows = sum(written)
+    logger.info(f"✅ '{table_name}' saved in PostgreSQL with {rows} records (pipelined)")
+    return rows, report
+
+
 # -----------------------------
 # PRIMARY KEY
 # -----------------------------
 
 def create_primary_key_titles_clean():
-    """Cria PK em titles_clean(show_id) com commit explícito"""
-    query = "ALTER TABLE titles_clean ADD CONSTRAINT pk_titles_clean_show PRIMARY KEY (show_id);"
+    """
+    Cria PK em titles_clean com commit explícito. Em tabela particionada a PK
+    inclui a chave de partição: (show_id, date_added_year).
+    """
+    columns = ", ".join(TABLES["titles_clean"]["primary_key"])
+    query = f"ALTER TABLE titles_clean ADD CONSTRAINT pk_titles_clean_show PRIMARY KEY ({columns});"
     try:
-        with engine.begin() as conn:  # commit explícito
-            conn.execute(text(query))
-        logger.info("✅ Primary key created on titles_clean(show_id)")
-    except SQLAlchemyError as e:
+        with get_engine().begin() as conn:  # commit explícito
+            conn.execute(sa.text(query))
+        logger.info(f"✅ Primary key created on titles_clean({columns})")
+    except sa.exc.SQLAlchemyError as e:
         logger.warning(f"⚠️ Primary key creation skipped or failed: {e}")
 
 
 # -----------------------------
-# NORMALIZATIONS
+# INDEXES
 # -----------------------------
 
-def create_titles_by_country(df, table_name="titles_by_country"):
-    """Cria tabela título × país"""
-    countries = df[['show_id','country']].copy()
-    countries = countries.assign(country=countries['country'].str.split(','))
-    countries = countries.explode('country')
-    countries['country'] = countries['country'].str.strip()
-
-    # Remove duplicados para não quebrar FK
-    countries = countries.drop_duplicates(subset=['show_id', 'country'])
-
+def create_indexes(tables=("titles_clean", "titles_by_country", "titles_by_genre")):
+    """Cria os índices do registro (GIN da busca textual, filtros das tabelas ponte) após a carga"""
     try:
-        countries.to_sql(table_name, engine, if_exists='replace', index=False, chunksize=chunk_size)
-        logger.info(f"✅ '{table_name}' saved in PostgreSQL with {countries.shape[0]} records")
-    except SQLAlchemyError as e:
-        logger.error(f"❌ Failed to save '{table_name}': {e}")
-        raise
-    return countries
+        with get_engine().begin() as conn:
+            for table_name in tables:
+                for ddl in index_ddl(table_name):
+                    conn.execute(sa.text(ddl))
+        logger.info(f"✅ Indexes created on {', '.join(tables)}")
+    except sa.exc.SQLAlchemyError as e:
+        logger.warning(f"⚠️ Index creation skipped or failed: {e}")
 
 
-def create_titles_by_genre(df, table_name="titles_by_genre"):
+# -----------------------------
+# NORMALIZATIONS
+# -----------------------------
+
+# Tabelas ponte: (coluna de origem, kwargs de write_bridge_table/copy_bridge_batches).
+# date_added_year acompanha show_id para particionar igual a titles_clean.
+BRIDGE_TABLES = {
+    "titles_by_country": ("country", {"carry_columns": ["date_added_year"]}),
+    # mantém listed_in, usada pelo modelo do Power BI
+    "titles_by_genre": ("listed_in", {"value_name": "genre", "carry_columns": ["date_added_year", "listed_in"]}),
+}
+
+
+def resolve_bridge_values(df, conn=None):
+    """
+    Canonicaliza os valores das tabelas ponte (src/resolve.py): variantes de caixa,
+    espaço e grafia viram um único valor e vazios são descartados.
+    `df`: DataFrame ou iterável de chunks, lido uma vez (frequências somadas por chunk).
+    `conn`: conexão com transação aberta em que value_mapping é lido e gravado.
+    Retorna {tabela: mapping} para create_titles_by_* / copy_bridge_batches.
+    """
+    counts = {table_name: Counter() for table_name in BRIDGE_TABLES}
+    for chunk in [df] if isinstance(df, pd.DataFrame) else df:
+        for table_name, (column, _) in BRIDGE_TABLES.items():
+            counts[table_name].update(count_values(chunk[column]))
+    return {table_name: resolve_counts(counts[table_name], kwargs.get("value_name", column), conn=conn)
+            for table_name, (column, kwargs) in BRIDGE_TABLES.items()}
+
+
+def create_titles_by_country(df, table_name="titles_by_country", on_batch=None, mapping=None):
+    """Cria tabela título × país (split/trim/dedupe por linha, gravada via COPY em lotes)"""
+    column, kwargs = BRIDGE_TABLES["titles_by_country"]
+    return write_bridge_table(df, column, table_name, on_batch=on_batch, mapping=mapping, **kwargs)
+
+
+def create_titles_by_genre(df, table_name="titles_by_genre", on_batch=None, mapping=None):
     """Cria tabela título × gênero"""
-    genres = df[['show_id','listed_in']].copy()
-    genres = genres.assign(genre=genres['listed_in'].str.split(','))
-    genres = genres.explode('genre')
-    genres['genre'] = genres['genre'].str.strip()
+    column, kwargs = BRIDGE_TABLES["titles_by_genre"]
+    return write_bridge_table(df, column, table_name, on_batch=on_batch, mapping=mapping, **kwargs)
 
-    # Remove duplicados para não quebrar FK
-    genres = genres.drop_duplicates(subset=['show_id', 'genre'])
 
-    try:
-        genres.to_sql(table_name, engine, if_exists='replace', index=False, chunksize=chunk_size)
-        logger.info(f"✅ '{table_name}' saved in PostgreSQL with {genres.shape[0]} records")
-    except SQLAlchemyError as e:
-        logger.error(f"❌ Failed to save '{table_name}': {e}")
-        raise
-    return genres
+def preview_table(table_name, limit=5):
+    """Primeiros registros de uma tabela, para os logs de verificação"""
+    return pd.read_sql(f"SELECT * FROM {table_name} LIMIT {int(limit)}", get_engine()).to_dict(orient="records")
 
 
 # -----------------------------
@@ -127,75 +366,349 @@ def create_foreign_keys():
         """
         ALTER TABLE titles_by_country
         ADD CONSTRAINT fk_titles_by_country_show
-        FOREIGN KEY (show_id)
-        REFERENCES titles_clean(show_id)
+        FOREIGN KEY (show_id, date_added_year)
+        REFERENCES titles_clean(show_id, date_added_year)
         ON DELETE CASCADE;
         """,
         """
         ALTER TABLE titles_by_genre
         ADD CONSTRAINT fk_titles_by_genre_show
-        FOREIGN KEY (show_id)
-        REFERENCES titles_clean(show_id)
+        FOREIGN KEY (show_id, date_added_year)
+        REFERENCES titles_clean(show_id, date_added_year)
         ON DELETE CASCADE;
         """
     ]
     try:
-        with engine.begin() as conn:  # commit explícito
+        with get_engine().begin() as conn:  # commit explícito
             for query in queries:
-                conn.execute(text(query))
+                conn.execute(sa.text(query))
         logger.info("✅ Foreign keys created successfully")
-    except SQLAlchemyError as e:
+    except sa.exc.SQLAlchemyError as e:
         logger.warning(f"⚠️ FK creation skipped or failed: {e}")
 
 
 # -----------------------------
-# VALIDATIONS
+# VIEWS
+# -----------------------------
+
+VIEWS_SQL_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'sql', 'create_views.sql')
+
+
+def create_views(sql_path=VIEWS_SQL_PATH):
+    """(Re)cria as views de análise, removidas pelo DROP ... CASCADE das tabelas"""
+    with open(sql_path, encoding="utf-8") as f:
+        statements = [stmt for stmt in f.read().split(";") if "CREATE" in stmt.upper()]
+    try:
+        with get_engine().begin() as conn:
+            for statement in statements:
+                conn.execute(sa.text(statement))
+        logger.info(f"✅ {len(statements)} views created")
+    except sa.exc.SQLAlchemyError as e:
+        logger.warning(f"⚠️ View creation skipped or failed: {e}")
+
+
+# -----------------------------
+# PARTITION RELOAD
 # -----------------------------
 
-def validate_tables(df_clean, titles_by_country, titles_by_genre):
-    """Valida registros, nulos e duplicados"""
-    logger.info("🔎 Running post-transformation validations...")
+def reload_partition(year, raw_table="netflix_raw"):
+    """
+    Reprocessa só a partição de titles_clean (e das tabelas ponte) que guarda `year`
+    (date_added_year; 0 = sem data). As linhas da partição são apagadas e regravadas
+    a partir da raw em uma única transação; as demais partições não são tocadas.
+    Retorna o número de linhas recarregadas em titles_clean.
+    """
+    start, end = partition_bounds(year)
+    if start == UNDATED_YEAR:
+        raw_where = "date_added IS NULL"
+    else:
+        raw_where = "EXTRACT(YEAR FROM date_added) >= :start" + (" AND EXTRACT(YEAR FROM date_added) < :end" if end else "")
+    key_where = "date_added_year >= :start" + (" AND date_added_year < :end" if end else "")
+    params = {"start": start, "end": end}
+
+    ensure_raw_columns(raw_table)
+    df_clean = clean_titles(load_raw_table(raw_table, where=raw_where, params=params))
+
+    dq = QualityRun()
+    dq.update("titles_clean", df_clean)
+    with get_engine().begin() as conn:
+        mappings = resolve_bridge_values(df_clean, conn)
+        for table_name in [*BRIDGE_TABLES, "titles_clean"]:
+            conn.execute(sa.text(f"DELETE FROM {table_name} WHERE {key_where}"), params)
+        batched_to_sql(coerce_frame(df_clean, "titles_clean"), "titles_clean", conn,
+                       dtype=sqlalchemy_dtypes("titles_clean"))
+
+        # COPY das tabelas ponte na mesma transação (cursor psycopg2 da conexão)
+        cur = conn.connection.cursor()
+        for table_name, (column, kwargs) in BRIDGE_TABLES.items():
+            copy_bridge_batches(cur, df_clean, column, table_name, mapping=mappings[table_name],
+                                on_batch=lambda batch, t=table_name: dq.update(t, batch), **kwargs)
+
+    logger.info(f"✅ Partition '{partition_name('titles_clean', year)}' reloaded with {len(df_clean)} records")
+    log_results(dq.save())
+    log_batch_sizes()
+    bump_dataset_version()
+    return len(df_clean)
 
-    logger.info(f"titles_clean: {df_clean.shape[0]} records, {df_clean.isnull().sum().to_dict()} nulls, {df_clean.duplicated().sum()} duplicates")
-    logger.info(f"titles_by_country: {titles_by_country.shape[0]} records, {titles_by_country.isnull().sum().to_dict()} nulls, {titles_by_country.duplicated().sum()} duplicates")
-    logger.info(f"titles_by_genre: {titles_by_genre.shape[0]} records, {titles_by_genre.isnull().sum().to_dict()} nulls, {titles_by_genre.duplicated().sum()} duplicates")
+
+# -----------------------------
+# INCREMENTAL TRANSFORM
+# -----------------------------
+
+STATE_TABLE = "transform_state"
+DELETIONS_TABLE = "raw_deletions"
+DELETION_TRIGGER = "trg_log_raw_deletions"
+
+
+def deletion_log_ddl(raw_table="netflix_raw"):
+    """
+    Gatilho que anota em raw_deletions os show_ids apagados da raw (recarga de um arquivo em
+    src/ingest_files.py e src/ingest_resume.py): linhas novas aparecem por ingested_at, mas
+    uma remoção não deixa rastro na raw. É por comando, com a tabela de transição, para o
+    DELETE de um arquivo inteiro não virar um INSERT por linha.
+    """
+    return [
+        create_table_ddl(DELETIONS_TABLE, if_not_exists=True),
+        f"""CREATE OR REPLACE FUNCTION log_raw_deletions() RETURNS trigger LANGUAGE plpgsql AS $$
+            BEGIN
+                INSERT INTO {DELETIONS_TABLE} (table_name, show_id, deleted_at)
+                SELECT DISTINCT TG_TABLE_NAME, show_id, now() FROM deleted_rows;
+                RETURN NULL;
+            END $$""",
+        f'DROP TRIGGER IF EXISTS {DELETION_TRIGGER} ON "{raw_table}"',
+        f'CREATE TRIGGER {DELETION_TRIGGER} AFTER DELETE ON "{raw_table}" REFERENCING OLD TABLE AS deleted_rows '
+        f"FOR EACH STATEMENT EXECUTE FUNCTION log_raw_deletions()",
+    ]
+
+
+def _state_is_outdated(inspector):
+    """transform_state no layout antigo (hash por show_id), anterior ao watermark"""
+    return "watermark" not in {col["name"] for col in inspector.get_columns(STATE_TABLE)}
+
+
+def commit_horizon(conn):
+    """
+    Instante abaixo do qual nenhuma carga ainda aberta pode gravar na raw: ingested_at e
+    deleted_at são now(), o início da transação, e uma transação longa (ex: um arquivo
+    de ingest_catalog_files) pode fazer commit depois de outra mais nova ter subido o
+    watermark. É o início da transação aberta mais antiga do banco (ou o relógio atual)
+    menos 1 µs; as linhas acima dele voltam na próxima execução em vez de serem perdidas.
+    Consultado antes da leitura da raw. Requer ver xact_start das outras sessões
+    (mesmo usuário ou pg_read_all_stats).
+    """
+    return conn.execute(sa.text("""
+        SELECT least(clock_timestamp(), min(xact_start)) - interval '1 microsecond'
+        FROM pg_stat_activity
+        WHERE datname = current_database() AND pid <> pg_backend_pid() AND xact_start IS NOT NULL
+    """)).scalar()
+
+
+def begin_transform_state(raw_table="netflix_raw"):
+    """
+    Início de uma transformação completa: instala o gatilho de remoções e anota até onde a
+    raw vai ser lida (maior ingested_at, limitado por commit_horizon). Linhas carregadas
+    durante a transformação ficam acima do watermark e voltam no próximo incremental.
+    Retorna (watermark, horizon).
+    """
+    with get_engine().begin() as conn:
+        for ddl in deletion_log_ddl(raw_table):
+            conn.execute(sa.text(ddl))
+        horizon = commit_horizon(conn)
+        watermark = conn.execute(sa.text(f"SELECT max(ingested_at) FROM {raw_table}")).scalar()
+    return (min(watermark, horizon) if watermark is not None else None), horizon
+
+
+def save_transform_state(watermark, horizon, raw_table="netflix_raw"):
+    """
+    Grava o watermark da transformação completa (base do modo incremental) e descarta as
+    remoções anotadas até o horizonte do início dela, que titles_clean já reflete
+    """
+    with get_engine().begin() as conn:
+        inspector = sa.inspect(conn)
+        if inspector.has_table(STATE_TABLE) and _state_is_outdated(inspector):
+            conn.execute(sa.text(f"DROP TABLE {STATE_TABLE}"))
+        conn.execute(sa.text(create_table_ddl(STATE_TABLE, if_not_exists=True)))
+        conn.execute(sa.text(f"""
+            INSERT INTO {STATE_TABLE} (table_name, watermark, updated_at) VALUES (:table, :watermark, now())
+            ON CONFLICT (table_name) DO UPDATE SET watermark = EXCLUDED.watermark, updated_at = now()
+        """), {"table": raw_table, "watermark": watermark})
+        conn.execute(sa.text(f"DELETE FROM {DELETIONS_TABLE} WHERE table_name = :table AND deleted_at <= :horizon"),
+                     {"table": raw_table, "horizon": horizon})
+    logger.info(f"✅ Transform state saved for '{raw_table}' (watermark {watermark})")
+
+
+def load_transform_state(conn, raw_table="netflix_raw"):
+    """
+    Linha de transform_state da raw (watermark None = raw vazia na última transformação).
+    None se não há base para o incremental: sem estado, estado no layout antigo, sem
+    titles_clean ou sem o gatilho de remoções (raw recriada por ingest_to_postgres).
+    """
+    inspector = sa.inspect(conn)
+    if not all(inspector.has_table(t) for t in ("titles_clean", STATE_TABLE, DELETIONS_TABLE)):
+        return None
+    if _state_is_outdated(inspector):
+        return None
+    trigger = conn.execute(sa.text("SELECT 1 FROM pg_trigger WHERE tgname = :name AND tgrelid = to_regclass(:table)"),
+                           {"name": DELETION_TRIGGER, "table": raw_table}).first()
+    if trigger is None:
+        return None
+    return conn.execute(sa.text(f"SELECT watermark FROM {STATE_TABLE} WHERE table_name = :table"),
+                        {"table": raw_table}).first()
+
+
+def changed_show_ids(conn, state, raw_table="netflix_raw"):
+    """
+    Títulos a reprocessar desde a última transformação, sem varrer a raw: show_ids com
+    ingested_at acima do watermark (índice em ingested_at) e os anotados em raw_deletions.
+    O novo watermark não passa de commit_horizon, para não pular linhas de transações
+    que ainda vão fazer commit com um ingested_at menor.
+    Retorna (show_ids, novo watermark, remoções lidas {show_id: deleted_at}, horizonte).
+    """
+    horizon = commit_horizon(conn)
+    where = "ingested_at > :watermark" if state.watermark is not None else "true"
+    loaded = conn.execute(sa.text(f"SELECT show_id, max(ingested_at) AS ingested_at FROM {raw_table} "
+                                  f"WHERE {where} GROUP BY show_id"), {"watermark": state.watermark}).all()
+    deleted = conn.execute(sa.text(f"SELECT show_id, max(deleted_at) AS deleted_at FROM {DELETIONS_TABLE} "
+                                   f"WHERE table_name = :table GROUP BY show_id"), {"table": raw_table}).all()
+    watermark = max((row.ingested_at for row in loaded), default=state.watermark)
+    if watermark is not None:
+        watermark = min(watermark, horizon)
+    deletions = {row.show_id: row.deleted_at for row in deleted}
+    return {row.show_id for row in loaded} | set(deletions), watermark, deletions, horizon
+
+
+def run_incremental_transform(raw_table="netflix_raw"):
+    """
+    Reprocessa só os títulos que mudaram na raw desde a última transformação
+    (changed_show_ids: linhas acima do watermark e remoções anotadas pelo gatilho).
+    Eles são relidos da raw (uma linha por show_id) e limpos de novo e, em uma única
+    transação, saem de titles_clean e das tabelas ponte e voltam na versão atual
+    (delete + insert, que também cobre a troca de partição quando date_added muda);
+    os que não estão mais na raw só saem. Sem estado, roda run_transform completo.
+    Retorna dict com changed, removed, rows e seconds.
+    """
+    setup_logger()
+    start = time.perf_counter()
+    engine = get_engine()
+    ensure_raw_columns(raw_table)
+    with engine.connect() as conn:
+        state = load_transform_state(conn, raw_table)
+        if state is not None:
+            show_ids, watermark, deletions, horizon = changed_show_ids(conn, state, raw_table)
+    if state is None:
+        logger.warning("⚠️ No transform state found: running the full transform")
+        run_transform()
+        return {"changed": None, "removed": None, "rows": None, "seconds": round(time.perf_counter() - start, 3)}
+
+    logger.info("🚀 Starting incremental transform")
+    if not show_ids:
+        logger.info(f"✅ Nothing changed in '{raw_table}' since the last transform")
+        return {"changed": 0, "removed": 0, "rows": 0, "seconds": round(time.perf_counter() - start, 3)}
+
+    ids = {"ids": sorted(show_ids)}
+    df_raw = load_raw_table(raw_table, where="show_id = ANY(:ids)", params=ids)
+    df_clean = clean_titles(df_raw) if len(df_raw) else None
+    kept = set(df_raw["show_id"])
+    stats = {"changed": len(kept), "removed": len(show_ids - kept), "rows": len(df_raw)}
+
+    dq = QualityRun()
+    with engine.begin() as conn:
+        for table_name in [*BRIDGE_TABLES, "titles_clean"]:
+            conn.execute(sa.text(f"DELETE FROM {table_name} WHERE show_id = ANY(:ids)"), ids)
+        if df_clean is not None:
+            # load_raw_table já traz uma linha por show_id: o insert não repete a PK
+            # (value_mapping gravado na mesma transação)
+            mappings = resolve_bridge_values(df_clean, conn)
+            dq.update("titles_clean", df_clean)
+            batched_to_sql(coerce_frame(df_clean, "titles_clean"), "titles_clean", conn,
+                           dtype=sqlalchemy_dtypes("titles_clean"))
+            cur = conn.connection.cursor()
+            for table_name, (column, kwargs) in BRIDGE_TABLES.items():
+                copy_bridge_batches(cur, df_clean, column, table_name, mapping=mappings[table_name],
+                                    on_batch=lambda batch, t=table_name: dq.update(t, batch), **kwargs)
+        conn.execute(sa.text(f"UPDATE {STATE_TABLE} SET watermark = :watermark, updated_at = now() "
+                             f"WHERE table_name = :table"), {"table": raw_table, "watermark": watermark})
+        # só as remoções lidas e abaixo do horizonte: as de transações que ainda estavam
+        # abertas (ou anotadas depois) ficam para a próxima execução
+        conn.execute(sa.text(f"DELETE FROM {DELETIONS_TABLE} WHERE table_name = :table "
+                             f"AND show_id = ANY(:ids) AND deleted_at <= :until"),
+                     {"table": raw_table, "ids": list(deletions), "until": horizon})
+
+    if df_clean is not None:
+        log_results(dq.save())
+        log_batch_sizes()
+    bump_dataset_version()
+    stats["seconds"] = round(time.perf_counter() - start, 3)
+    logger.info(f"✅ Incremental transform: {stats['changed']} titles changed, {stats['removed']} removed "
+                f"({stats['rows']} rows rewritten) in {stats['seconds']}s")
+    return stats
 
 
 # -----------------------------
 # COMPLETE PIPELINE
 # -----------------------------
 
-def run_transform():
+def run_transform(pipelined=True, **pipeline_options):
+    """
+    pipelined=True: carga, limpeza e gravação de titles_clean em estágios sobrepostos
+    (clean_and_save_pipelined, opções em pipeline_options); False: um passo após o outro.
+    """
+    setup_logger()
     logger.info("🚀 Starting ETL: Transformation & Modeling")
+    ensure_raw_columns()
+    watermark, horizon = begin_transform_state()
 
-    # 1️⃣ Carregar raw
-    df_raw = load_raw_table()
+    if pipelined:
+        # 1️⃣-2.1️⃣ Carregar raw em chunks, limpar e salvar com os estágios sobrepostos
+        clean_and_save_pipelined(**pipeline_options)
+        # titles_clean não fica em memória: cada etapa seguinte a relê em chunks
+        clean_frames = functools.partial(iter_clean_chunks, chunk_rows=pipeline_options.get("chunk_rows", chunk_size))
+    else:
+        # 1️⃣ Carregar raw (strings Arrow quando DTYPE_BACKEND=pyarrow)
+        df_raw = load_raw_table()
 
-    # 2️⃣ Limpeza e padronização
-    df_clean = clean_titles(df_raw)
+        # 2️⃣ Limpeza e padronização
+        df_clean = clean_titles(df_raw)
 
-    # 2.1️⃣ Salvar tabela limpa
-    save_clean_table(df_clean)
+        # 2.1️⃣ Salvar tabela limpa
+        save_clean_table(df_clean)
+        clean_frames = lambda: [df_clean]
 
     # 2.2️⃣ Criar PRIMARY KEY
     create_primary_key_titles_clean()
 
-    # 3️⃣ Criar tabelas normalizadas
-    titles_by_country = create_titles_by_country(df_clean)
-    titles_by_genre = create_titles_by_genre(df_clean)
-
-    # 4️⃣ Criar FKs
+    # 3️⃣ Criar tabelas normalizadas, validando cada lote gravado
+    # (regras declarativas em src/quality.py)
+    # (valores canonicalizados pelo mapeamento persistido em value_mapping)
+    # (DQ de titles_clean na mesma leitura da canonicalização)
+    dq = QualityRun()
+    mappings = resolve_bridge_values(dq.iter_update("titles_clean", clean_frames()))
+    create_titles_by_country(clean_frames(), mapping=mappings["titles_by_country"],
+                             on_batch=lambda batch: dq.update("titles_by_country", batch))
+    create_titles_by_genre(clean_frames(), mapping=mappings["titles_by_genre"],
+                           on_batch=lambda batch: dq.update("titles_by_genre", batch))
+
+    # 4️⃣ Criar índices, FKs e views
+    create_indexes()
     create_foreign_keys()
+    create_views()
 
     # 5️⃣ Validações pós-transformação
-    validate_tables(df_clean, titles_by_country, titles_by_genre)
+    log_results(dq.save())
+    log_batch_sizes()
+
+    # 6️⃣ Publicar nova versão do dataset (invalida os caches de src/queries.py)
+    bump_dataset_version()
+
+    # 6.1️⃣ Watermark da raw transformada (base para run_incremental_transform)
+    save_transform_state(watermark, horizon)
 
     # Logs de verificação
     logger.info("✅ First 5 records in titles_by_country:")
-    logger.info(titles_by_country.head(5).to_dict(orient="records"))
+    logger.info(preview_table("titles_by_country"))
 
     logger.info("✅ First 5 records in titles_by_genre:")
-    logger.info(titles_by_genre.head(5).to_dict(orient="records"))
+    logger.info(preview_table("titles_by_genre"))
 
     logger.info("✅ ETL: Transformation & Modeling completed successfully!")
 
@@ -0,0 +1,117 @@
+# tests/test_dedupe.py
+
+import numpy as np
+import pandas as pd
+
+from src.dedupe import StreamingDeduper, hash_keys
+
+
+def _chunk(*ids):
+    return pd.DataFrame({"show_id": list(ids), "n": range(len(ids))})
+
+
+# -----------------------------
+# DUPLICADOS
+# -----------------------------
+
+def test_duplicates_within_one_chunk():
+    deduper = StreamingDeduper()
+    mask = deduper.flag(_chunk("s1", "s2", "s1", "s3", "s2"), "show_id")
+    # a primeira ocorrência fica, as repetições são marcadas
+    assert mask.tolist() == [False, False, True, False, True]
+    assert len(deduper) == 3
+
+
+def test_duplicates_across_chunks():
+    deduper = StreamingDeduper()
+    assert not deduper.flag(_chunk("s1", "s2"), "show_id").any()
+    assert deduper.flag(_chunk("s3", "s1", "s4", "s2"), "show_id").tolist() == [False, True, False, True]
+    assert len(deduper) == 4
+
+
+def test_duplicates_found_after_runs_are_merged():
+    deduper = StreamingDeduper()
+    deduper.flag(_chunk("a", "b", "c", "d"), "show_id")
+    deduper.flag(_chunk("e"), "show_id")  # run pequena: ainda não funde
+    assert [run.size for run in deduper._runs] == [4, 1]
+
+    deduper.flag(_chunk("f"), "show_id")  # 1+1 -> 2, depois 4+2 -> 6
+    assert [run.size for run in deduper._runs] == [6]
+    assert all(np.all(run[:-1] < run[1:]) for run in deduper._runs)
+
+    # chaves de cada run original continuam visíveis depois da fusão
+    assert deduper.flag(_chunk("a", "e", "f", "g"), "show_id").tolist() == [True, True, True, False]
+
+
+def test_matches_pandas_duplicated_over_many_chunks():
+    rng = np.random.default_rng(0)
+    ids = pd.Series([f"s{i}" for i in rng.integers(0, 500, size=5_000)])
+    df = pd.DataFrame({"show_id": ids})
+
+    deduper = StreamingDeduper()
+    mask = np.concatenate([deduper.flag(df.iloc[i:i + 97], "show_id") for i in range(0, len(df), 97)])
+    assert mask.tolist() == df["show_id"].duplicated().tolist()
+    assert len(deduper) == df["show_id"].nunique()
+    assert len(deduper._runs) <= int(np.log2(len(deduper))) + 1
+
+
+def test_composite_keys():
+    df = pd.DataFrame({"show_id": ["s1", "s1", "s2", "s1"], "country": ["BR", "US", "BR", "BR"]})
+    assert StreamingDeduper().flag(df, ["show_id", "country"]).tolist() == [False, False, False, True]
+
+
+# -----------------------------
+# CHAVES NULAS
+# -----------------------------
+
+def test_null_keys_share_one_hash():
+    # None e NaN viram a mesma chave: quem não quer isso filtra os nulos antes (ver quality.py)
+    df = _chunk(None, np.nan, "s1", None)
+    hashes = hash_keys(df, "show_id")
+    assert hashes[0] == hashes[1] == hashes[3] != hashes[2]
+    assert StreamingDeduper().flag(df, "show_id").tolist() == [False, True, False, True]
+
+
+def test_null_keys_do_not_collide_with_their_string_forms():
+    values = pd.Series([None, np.nan, pd.NA, pd.NaT, "None", "nan", "<NA>", "NaT", ""], dtype=object)
+    hashes = hash_keys(pd.DataFrame({"show_id": values}), "show_id").tolist()
+    assert len(set(hashes[:4])) == 1  # todo tipo de nulo é a mesma chave
+    assert len(set(hashes)) == 6
+
+
+# -----------------------------
+# DROP x FLAG
+# -----------------------------
+
+def test_drop_keeps_first_occurrence_rows():
+    deduper = StreamingDeduper()
+    first = deduper.drop(_chunk("s1", "s2", "s1"), "show_id")
+    assert first["show_id"].tolist() == ["s1", "s2"]
+    assert first["n"].tolist() == [0, 1]  # linhas originais, índice preservado
+
+    second = deduper.drop(_chunk("s2", "s3"), "show_id")
+    assert second["show_id"].tolist() == ["s3"]
+    assert second.index.tolist() == [1]
+
+
+def test_flag_and_drop_register_the_same_keys():
+    chunks = [_chunk("s1", "s2", "s1"), _chunk("s2", "s3"), _chunk("s3", "s4", "s4")]
+    flagger, dropper = StreamingDeduper(), StreamingDeduper()
+    for chunk in chunks:
+        mask = flagger.flag(chunk, "show_id")
+        assert dropper.drop(chunk, "show_id").equals(chunk[~mask])
+    assert len(flagger) == len(dropper) == 4
+
+
+def test_contains_does_not_register_keys():
+    deduper = StreamingDeduper()
+    deduper.flag(_chunk("s1"), "show_id")
+    hashes = hash_keys(_chunk("s1", "s2"), "show_id")
+    assert deduper.contains(hashes).tolist() == [True, False]
+    assert len(deduper) == 1
+
+
+def test_null_keys_in_composite_keys():
+    country = pd.Series([None, "nan", "None", np.nan, pd.NA], dtype=object)
+    df = pd.DataFrame({"show_id": ["s1"] * 5, "country": country})
+    assert StreamingDeduper().flag(df, ["show_id", "country"]).tolist() == [False, False, False, True, True]
@@ -0,0 +1,142 @@
+# tests/test_pipeline.py
+
+import threading
+import time
+
+import pytest
+
+from src.pipeline import Pipeline, PipelineError, Stage, run_pipeline
+
+# funções dos estágios "process" precisam ser importáveis (nível de módulo)
+
+
+def square(x):
+    return x * x
+
+
+def slow_square(x):
+    time.sleep(0.01 * (x % 3))  # itens terminam fora de ordem entre os processos
+    return x * x
+
+
+def fail_on_five(x):
+    if x == 5:
+        raise ValueError("bad item 5")
+    return x
+
+
+# -----------------------------
+# ORDERING
+# -----------------------------
+
+def test_process_stage_preserves_order():
+    results, _ = run_pipeline(range(30), [Stage("square", slow_square, "process", 3)])
+    assert results == [x * x for x in range(30)]
+
+
+def test_mixed_stages_preserve_order_with_single_thread_worker():
+    stages = [
+        Stage("square", square, "process", 2),
+        Stage("plus_one", lambda x: x + 1, "thread", 1),
+    ]
+    results, _ = run_pipeline(range(50), stages)
+    assert results == [x * x + 1 for x in range(50)]
+
+
+def test_multi_worker_thread_stage_keeps_every_item():
+    results, _ = run_pipeline(range(100), [Stage("square", square, "thread", 4)])
+    assert sorted(results) == [x * x for x in range(100)]
+
+
+def test_report_counts_items_per_stage():
+    stages = [Stage("square", square, "process", 2), Stage("noop", lambda x: x, "thread", 2)]
+    results, report = run_pipeline(range(10), stages)
+    assert len(results) == 10
+    assert [s["stage"] for s in report["stages"]] == ["source", "square", "noop"]
+    assert all(s["items"] == 10 for s in report["stages"])
+
+
+def test_collect_false_returns_no_results():
+    results, report = run_pipeline(range(5), [Stage("square", square)], collect=False)
+    assert results is None
+    assert report["stages"][1]["items"] == 5
+
+
+def test_empty_source():
+    results, _ = run_pipeline([], [Stage("square", square, "process", 2), Stage("noop", lambda x: x)])
+    assert results == []
+
+
+# -----------------------------
+# BACKPRESSURE
+# -----------------------------
+
+def test_bounded_queues_hold_back_the_source():
+    queue_size, n_items = 2, 40
+    lock = threading.Lock()
+    produced, processed, ahead = [0], [0], []
+
+    def source():
+        for i in range(n_items):
+            with lock:
+                produced[0] += 1
+                ahead.append(produced[0] - processed[0])
+            yield i
+
+    def slow(x):
+        time.sleep(0.005)
+        with lock:
+            processed[0] += 1
+        return x
+
+    results, _ = Pipeline([Stage("slow", slow, "thread", 1)], queue_size=queue_size).run(source())
+    assert results == list(range(n_items))
+    # fila de entrada cheia + item no worker + item esperando no put da fonte
+    assert max(ahead) <= queue_size + 2
+
+
+# -----------------------------
+# FAILURES
+# -----------------------------
+
+def test_process_stage_failure_is_raised():
+    stages = [Stage("check", fail_on_five, "process", 2), Stage("noop", lambda x: x)]
+    with pytest.raises(PipelineError, match="Stage 'check' failed") as excinfo:
+        run_pipeline(range(1000), stages)
+    assert isinstance(excinfo.value.__cause__, ValueError)
+
+
+def test_thread_stage_failure_is_raised():
+    stages = [Stage("abs", abs, "process", 2), Stage("check", fail_on_five, "thread", 3)]
+    with pytest.raises(PipelineError, match="Stage 'check' failed") as excinfo:
+        run_pipeline(range(1000), stages)
+    assert isinstance(excinfo.value.__cause__, ValueError)
+
+
+def test_source_failure_is_raised():
+    def source():
+        yield 1
+        raise OSError("read failed")
+
+    with pytest.raises(PipelineError, match="Stage 'source' failed") as excinfo:
+        run_pipeline(source(), [Stage("square", square, "process", 2)])
+    assert isinstance(excinfo.value.__cause__, OSError)
+
+
+def test_failure_stops_the_source():
+    consumed = []
+
+    def source():
+        for i in range(100_000):
+            consumed.append(i)
+            yield i
+
+    with pytest.raises(PipelineError):
+        run_pipeline(source(), [Stage("check", fail_on_five, "thread", 1)], queue_size=2)
+    # a fonte para logo após o erro em vez de ler tudo
+    assert len(consumed) < 100
+
+
+def test_unknown_stage_kind():
+    with pytest.raises(ValueError, match="Unknown stage kind"):
+        run_pipeline(range(3), [Stage("bad", square, "gpu")])
@@ -0,0 +1,104 @@
+# tests/test_timeseries.py
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.timeseries import downsample, lttb_indices, minmax_indices, parse_relayout
+
+
+def _series(n, spike_at=None, seed=0):
+    rng = np.random.default_rng(seed)
+    y = np.sin(np.linspace(0, 20, n)) + rng.normal(0, 0.05, n)
+    if spike_at is not None:
+        y[spike_at] = 100.0
+    return pd.DataFrame({"period": pd.date_range("2000-01-01", periods=n, freq="D"), "total_titles": y})
+
+
+def _indices(method, df, n_out):
+    if method == "lttb":
+        return lttb_indices(df["period"], df["total_titles"], n_out)
+    return minmax_indices(df["total_titles"], n_out)
+
+
+# -----------------------------
+# DOWNSAMPLING
+# -----------------------------
+
+@pytest.mark.parametrize("method", ["lttb", "minmax"])
+@pytest.mark.parametrize("n, n_out", [(10_000, 1000), (1001, 1000), (500, 7), (100, 3), (100, 4)])
+def test_keeps_endpoints_order_and_budget(method, n, n_out):
+    indices = _indices(method, _series(n), n_out)
+    assert indices[0] == 0 and indices[-1] == n - 1
+    assert len(indices) <= n_out
+    assert np.all(np.diff(indices) > 0)  # ordenados e sem repetição
+
+
+@pytest.mark.parametrize("method", ["lttb", "minmax"])
+@pytest.mark.parametrize("spike_at", [1, 4321, 9998])
+def test_isolated_spike_survives(method, spike_at):
+    df = _series(10_000, spike_at=spike_at)
+    assert spike_at in _indices(method, df, 200)
+
+
+@pytest.mark.parametrize("method", ["lttb", "minmax"])
+@pytest.mark.parametrize("n_out", [100, 150, 1])
+def test_small_outputs_pass_through(method, n_out):
+    # n_out >= n não tem o que reduzir; n_out pequeno demais devolve a série inteira
+    df = _series(100)
+    assert _indices(method, df, n_out).tolist() == list(range(100))
+
+
+def test_lttb_needs_three_points():
+    df = _series(100)
+    for n_out in (0, 1, 2):
+        assert lttb_indices(df["period"], df["total_titles"], n_out).tolist() == list(range(100))
+    assert len(lttb_indices(df["period"], df["total_titles"], 3)) == 3
+
+
+def test_lttb_accepts_numeric_x():
+    df = _series(1000)
+    by_date = lttb_indices(df["period"], df["total_titles"], 50)
+    by_number = lttb_indices(np.arange(1000), df["total_titles"], 50)
+    assert by_date.tolist() == by_number.tolist()  # datas igualmente espaçadas = eixo linear
+
+
+@pytest.mark.parametrize("method", ["lttb", "minmax"])
+def test_downsample_returns_original_rows(method):
+    df = _series(5000, spike_at=1234)
+    reduced = downsample(df, "period", "total_titles", max_points=300, method=method)
+    assert len(reduced) <= 300
+    assert reduced["period"].is_monotonic_increasing
+    assert reduced.equals(df.loc[reduced.index])
+    assert reduced["total_titles"].max() == 100.0
+
+
+def test_downsample_small_or_unlimited_series_is_untouched():
+    df = _series(300)
+    assert downsample(df, "period", "total_titles", max_points=300) is df
+    assert downsample(df, "period", "total_titles", max_points=None) is df
+
+
+def test_downsample_unknown_method():
+    with pytest.raises(ValueError, match="Unknown downsample method"):
+        downsample(_series(300), "period", "total_titles", max_points=10, method="average")
+
+
+# -----------------------------
+# VIEWPORT
+# -----------------------------
+
+def test_parse_relayout_explicit_range():
+    expected = (pd.Timestamp("2019-01-01"), pd.Timestamp("2020-06-30 12:00"))
+    assert parse_relayout({"xaxis.range[0]": "2019-01-01", "xaxis.range[1]": "2020-06-30 12:00"}) == expected
+    assert parse_relayout({"xaxis.range": ["2019-01-01", "2020-06-30 12:00"]}) == expected
+
+
+def test_parse_relayout_autorange_reset():
+    assert parse_relayout({"xaxis.autorange": True, "yaxis.autorange": True}) == (None, None)
+
+
+@pytest.mark.parametrize("relayout", [None, {}, {"yaxis.range[0]": 0, "yaxis.range[1]": 10},
+                                      {"dragmode": "pan"}, {"xaxis.range[0]": "2019-01-01"}])
+def test_parse_relayout_ignores_unrelated_events(relayout):
+    assert parse_relayout(relayout) is None